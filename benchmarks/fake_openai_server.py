@@ -0,0 +1,142 @@
+"""
+Scripted OpenAI-chat-completions-compatible server for offline benchmarks.
+
+Each request follows the same script: the model first calls the tools listed in
+`--tool-calls` (one per turn, skipping tools the agent does not expose), then streams
+a text answer. Delays are configurable so the server can mimic a slow remote model.
+
+Run standalone with:
+    python -m benchmarks.fake_openai_server --port 8765
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+DEFAULT_TOOL_ARGUMENTS = {
+    "resolve-library-id": {"libraryName": "fastapi"},
+    "get-library-docs": {"context7CompatibleLibraryID": "/tiangolo/fastapi", "topic": "jwt", "tokens": 5000},
+}
+
+
+class ScriptedModel:
+    """Decides the next response from the conversation and streams it with delays."""
+
+    def __init__(
+        self,
+        tool_calls: list[str],
+        answer_tokens: int,
+        first_token_delay: float,
+        token_delay: float,
+    ):
+        self.tool_calls = tool_calls
+        self.answer_tokens = answer_tokens
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+    def next_tool_call(self, body: dict) -> tuple[str, dict] | None:
+        available = {tool["function"]["name"] for tool in body.get("tools") or []}
+        script = [name for name in self.tool_calls if name in available]
+        done = sum(1 for message in body["messages"] if message["role"] == "tool")
+        if done < len(script):
+            name = script[done]
+            return name, DEFAULT_TOOL_ARGUMENTS.get(name, {})
+        return None
+
+    def answer_words(self) -> list[str]:
+        words = ["Here", "is", "the", "implementation:", "\n\n```python\n", "print('hello')", "\n```\n\n"]
+        filler = [f"word{i}" for i in range(max(0, self.answer_tokens - len(words)))]
+        return words + filler
+
+    async def handle(self, request: Request):
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        tool_call = self.next_tool_call(body)
+        usage = {"prompt_tokens": sum(len(str(m.get("content") or "")) for m in body["messages"]) // 4,
+                 "completion_tokens": 0 if tool_call else self.answer_tokens}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        if not body.get("stream"):
+            await asyncio.sleep(self.first_token_delay + self.token_delay * (0 if tool_call else self.answer_tokens))
+            if tool_call:
+                message = {"role": "assistant", "content": None, "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": tool_call[0], "arguments": json.dumps(tool_call[1])},
+                }]}
+            else:
+                message = {"role": "assistant", "content": " ".join(self.answer_words())}
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def stream():
+            await asyncio.sleep(self.first_token_delay)
+            if tool_call:
+                yield chunk({"role": "assistant", "tool_calls": [{
+                    "index": 0,
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": tool_call[0], "arguments": json.dumps(tool_call[1])},
+                }]})
+                yield chunk({}, "tool_calls")
+            else:
+                for word in self.answer_words():
+                    yield chunk({"content": word + " "})
+                    await asyncio.sleep(self.token_delay)
+                yield chunk({}, "stop")
+            final = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": body["model"], "choices": [], "usage": usage}
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def create_app(model: ScriptedModel) -> Starlette:
+    return Starlette(routes=[Route("/chat/completions", model.handle, methods=["POST"])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scripted OpenAI-compatible chat completions server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tool-calls", default="resolve-library-id,get-library-docs",
+                        help="Comma-separated tools to call, one per model turn, before answering.")
+    parser.add_argument("--answer-tokens", type=int, default=300)
+    parser.add_argument("--first-token-delay", type=float, default=0.3, help="Seconds before the first chunk.")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Seconds between streamed tokens.")
+    args = parser.parse_args()
+
+    model = ScriptedModel(
+        tool_calls=[name for name in args.tool_calls.split(",") if name],
+        answer_tokens=args.answer_tokens,
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+    )
+    uvicorn.run(create_app(model), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Offline end-to-end benchmark for AxiomAgent.
+
+Starts the scripted fake model server and the stub context7 MCP server, then drives
+`AxiomAgent.stream_events` / `run_with_summary` at the requested concurrency and reports
+throughput, latency percentiles, time to first token and memory. Nothing leaves
+the machine, so results are comparable between runs on the same box.
+
+Usage (from the project root):
+    python -m benchmarks.run_benchmark --requests 50 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+BENCHMARKS_DIR = Path(__file__).parent
+
+
+def latency_stats(values: list[float]) -> dict[str, Optional[float]]:
+    from src.axiom.batch import percentile
+
+    return {f"p{p}": percentile(values, p) for p in (50, 95, 99)}
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Fake model server did not start on port {port}")
+
+
+async def run_stream_request(agent, prompt: str) -> dict:
+    from src.axiom.events import RunSummary
+
+    started = time.perf_counter()
+    summary = None
+    async for event in agent.stream_events([{"role": "user", "content": prompt}]):
+        if isinstance(event, RunSummary):
+            summary = event
+    return {
+        "latency": time.perf_counter() - started,
+        "ttft": summary.time_to_first_token if summary else None,
+        "error": summary.error if summary else "no summary",
+    }
+
+
+async def run_blocking_request(agent, prompt: str) -> dict:
+    started = time.perf_counter()
+    summary = await agent.run_with_summary([{"role": "user", "content": prompt}])
+    return {"latency": time.perf_counter() - started, "ttft": None, "error": summary.error}
+
+
+async def drive(agent, mode: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    runner = run_stream_request if mode == "stream" else run_blocking_request
+
+    async def one(i: int) -> dict:
+        async with semaphore:
+            return await runner(agent, f"Request {i}: How do I add JWT auth to FastAPI?")
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    ok = [r for r in results if not r["error"]]
+    return {
+        "mode": mode,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(results) - len(ok),
+        "wall_seconds": elapsed,
+        "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+        "latency": latency_stats([r["latency"] for r in ok]),
+        "ttft": latency_stats([r["ttft"] for r in ok if r["ttft"] is not None]),
+        "rss_mb": current_rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_report(report: dict) -> None:
+    def fmt(stats: dict) -> str:
+        return "  ".join(f"{k}={v * 1000:.0f}ms" if v is not None else f"{k}=n/a" for k, v in stats.items())
+
+    print(f"\n== {report['mode']} ({report['requests']} requests, concurrency {report['concurrency']}) ==")
+    print(f"throughput : {report['throughput_rps']:.2f} req/s over {report['wall_seconds']:.2f}s, errors={report['errors']}")
+    print(f"latency    : {fmt(report['latency'])}")
+    if report["mode"] == "stream":
+        print(f"ttft       : {fmt(report['ttft'])}")
+    if "prefetch" in report:
+        prefetch = report["prefetch"]
+        print(
+            f"prefetch   : hit_rate={prefetch['hit_rate']:.0%} ({prefetch['hits']}/{prefetch['prefetched']}) "
+            f"saved={prefetch['time_saved']:.2f}s"
+        )
+    print(f"memory     : rss={report['rss_mb']:.0f}MB peak={report['peak_rss_mb']:.0f}MB")
+
+
+async def main(args: argparse.Namespace) -> int:
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_openai_server",
+        "--port", str(port),
+        "--tool-calls", args.tool_calls,
+        "--answer-tokens", str(args.answer_tokens),
+        "--first-token-delay", str(args.first_token_delay),
+        "--token-delay", str(args.token_delay),
+    ])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mcp_config = Path(tmp) / "mcp.json"
+        mcp_config.write_text(json.dumps({"mcpServers": {"context7": {
+            "command": sys.executable,
+            "args": [str(BENCHMARKS_DIR / "stub_mcp_server.py")],
+            "env": {"STUB_MCP_DELAY": str(args.tool_delay), "STUB_MCP_MAX_DOCS_TOKENS": str(args.docs_tokens)},
+        }}}))
+
+        # Settings are read on first use, so configure them before importing the agent
+        os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+        os.environ["BASE_URL"] = f"http://127.0.0.1:{port}/"
+        os.environ["MCP_CONFIG_PATH"] = str(mcp_config)
+        os.environ["TOOL_CACHE_ENABLED"] = "true" if args.tool_cache else "false"
+        # Keep every cache and index in the temp dir so runs start cold and leave .cache alone
+        os.environ["TOOL_CACHE_PATH"] = str(Path(tmp) / "tool_cache.sqlite3")
+        os.environ["DOC_INDEX_PATH"] = str(Path(tmp) / "doc_index.sqlite3")
+        os.environ["MCP_SCHEMA_CACHE_PATH"] = str(Path(tmp) / "mcp_tools.json")
+        os.environ["RESPONSE_CACHE_PATH"] = str(Path(tmp) / "response_cache.sqlite3")
+        os.environ["SESSION_STORE_PATH"] = str(Path(tmp) / "sessions.sqlite3")
+        os.environ["PREFETCH_ENABLED"] = "true" if args.prefetch else "false"
+        os.environ["RATE_LIMIT_ENABLED"] = "false"  # Measure the agent, not the Gemini quota
+
+        from src.axiom.agent import AxiomAgent
+        from src.axiom.config import load_mcp_servers_from_config
+        from src.axiom.mcp_pool import start_mcp_servers, stop_mcp_servers
+
+        # Keep per-request log lines out of the report
+        logging.getLogger().setLevel(logging.WARNING)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        handles = []
+        try:
+            await wait_for_port(port)
+            handles, _ = await start_mcp_servers(load_mcp_servers_from_config(mcp_config))
+            agent = AxiomAgent(mcp_servers=[handle.server for handle in handles])
+
+            modes = ["stream", "run"] if args.mode == "both" else [args.mode]
+            reports = []
+            for mode in modes:
+                # One warm-up request so connection setup is not counted
+                await drive(agent, mode, 1, 1)
+                report = await drive(agent, mode, args.requests, args.concurrency)
+                if agent.prefetcher is not None:
+                    report["prefetch"] = agent.prefetcher.stats()
+                reports.append(report)
+                print_report(report)
+
+            if args.json:
+                Path(args.json).write_text(json.dumps(reports, indent=2))
+            return 1 if any(r["errors"] for r in reports) else 0
+        finally:
+            await stop_mcp_servers(handles)
+            server.terminate()
+            server.wait()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline AxiomAgent benchmark.")
+    parser.add_argument("--mode", choices=["stream", "run", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--tool-calls", default="resolve-library-id,get-library-docs")
+    parser.add_argument("--answer-tokens", type=int, default=300)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--tool-delay", type=float, default=0.5, help="Stub MCP tool latency in seconds.")
+    parser.add_argument("--docs-tokens", type=int, default=5000, help="Maximum get-library-docs payload size.")
+    parser.add_argument("--tool-cache", action="store_true", help="Enable the tool result cache.")
+    parser.add_argument("--prefetch", action="store_true", help="Enable speculative library ID prefetch.")
+    parser.add_argument("--json", help="Write the report to this JSON file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,124 @@
+"""
+Startup-time budget for the CLI.
+
+Measures, in fresh interpreters, how long `import cli` takes and checks that the agent
+stack (the Agents SDK, OpenAI client, MCP and Chainlit) is not imported by it, then
+times how long `cli.py` takes to show its first prompt. Exits with status 1 if a budget
+is exceeded or a heavy module is imported eagerly, so it can gate changes to the
+startup path.
+
+Usage (from the project root):
+    python -m benchmarks.startup_budget --runs 7 --import-budget 0.6 --prompt-budget 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).parent
+PROJECT_DIR = BENCHMARKS_DIR.parent
+
+# Modules that must only be imported once the prompt is up
+HEAVY_MODULES = ["agents", "openai", "mcp", "chainlit", "rich.markdown", "src.axiom.agent"]
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import cli
+elapsed = time.perf_counter() - started
+heavy = [name for name in json.loads(sys.argv[1]) if name in sys.modules]
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def measure_import(env: dict[str, str]) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE, json.dumps(HEAVY_MODULES)],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_prompt(env: dict[str, str], timeout: float = 30.0) -> float:
+    """Seconds from spawning `cli.py` until it prints the `You:` prompt."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "cli.py"],
+        cwd=PROJECT_DIR, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        buffer = b""
+        while b"You:" not in buffer:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError("cli.py did not show its prompt in time")
+            chunk = process.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError("cli.py exited before showing its prompt")
+            buffer += chunk
+        elapsed = time.perf_counter() - started
+        process.stdin.write(b"exit\n")
+        process.stdin.flush()
+        process.wait(timeout=timeout)
+        return elapsed
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        mcp_config = Path(tmp) / "mcp.json"
+        mcp_config.write_text(json.dumps({"mcpServers": {"context7": {
+            "command": sys.executable,
+            "args": [str(BENCHMARKS_DIR / "stub_mcp_server.py")],
+        }}}))
+
+        env = {
+            **os.environ,
+            "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+            "MCP_CONFIG_PATH": str(mcp_config),
+            "MCP_SCHEMA_CACHE_PATH": str(Path(tmp) / "tool_schemas.json"),
+        }
+
+        # One untimed run so bytecode compilation is not counted
+        measure_import(env)
+        imports = [measure_import(env) for _ in range(args.runs)]
+        import_time = statistics.median(run["elapsed"] for run in imports)
+        heavy = sorted({name for run in imports for name in run["heavy"]})
+
+        failed = False
+        print(f"import cli : median={import_time:.3f}s budget={args.import_budget:.3f}s ({args.runs} runs)")
+        if import_time > args.import_budget:
+            failed = True
+            print("  over budget")
+        if heavy:
+            failed = True
+            print(f"  imported eagerly: {', '.join(heavy)}")
+
+        if not args.skip_prompt:
+            prompt_time = statistics.median(measure_prompt(env) for _ in range(args.runs))
+            print(f"prompt     : median={prompt_time:.3f}s budget={args.prompt_budget:.3f}s ({args.runs} runs)")
+            if prompt_time > args.prompt_budget:
+                failed = True
+                print("  over budget")
+
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CLI startup-time budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=0.6, help="Maximum median `import cli` time in seconds.")
+    parser.add_argument("--prompt-budget", type=float, default=1.5, help="Maximum median time to the first prompt in seconds.")
+    parser.add_argument("--skip-prompt", action="store_true", help="Only measure `import cli`.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,51 @@
+"""
+Stdio MCP server that mimics the context7 tools for offline benchmarks.
+
+`resolve-library-id` returns a short library listing and `get-library-docs` returns a
+documentation payload of roughly the requested number of tokens (capped by
+`STUB_MCP_MAX_DOCS_TOKENS`). Latency is set with `STUB_MCP_DELAY` (seconds).
+"""
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+DELAY = float(os.environ.get("STUB_MCP_DELAY", "0.5"))
+MAX_DOCS_TOKENS = int(os.environ.get("STUB_MCP_MAX_DOCS_TOKENS", "20000"))
+
+SNIPPET = (
+    "TITLE: Example snippet\n"
+    "DESCRIPTION: Shows how to configure the library for production use.\n"
+    "SOURCE: https://example.com/docs\n"
+    "LANGUAGE: python\n"
+    "CODE:\n```\nfrom library import Client\nclient = Client(api_key=...)\n```\n"
+    "----------------------------------------\n"
+)
+
+mcp = FastMCP("context7-stub", log_level="WARNING")
+
+
+@mcp.tool(name="resolve-library-id")
+async def resolve_library_id(libraryName: str) -> str:
+    """Resolves a package name to a Context7-compatible library ID."""
+    await asyncio.sleep(DELAY)
+    slug = libraryName.strip().lower().replace(" ", "-")
+    return (
+        f"- Title: {libraryName}\n"
+        f"- Context7-compatible library ID: /{slug}/{slug}\n"
+        f"- Description: Documentation for {libraryName}\n"
+        f"- Code Snippets: 1200\n"
+    )
+
+
+@mcp.tool(name="get-library-docs")
+async def get_library_docs(context7CompatibleLibraryID: str, topic: str = "", tokens: int = 10000) -> str:
+    """Fetches documentation for a library."""
+    await asyncio.sleep(DELAY)
+    target_chars = min(tokens, MAX_DOCS_TOKENS) * 4
+    header = f"Documentation for {context7CompatibleLibraryID} (topic: {topic or 'all'})\n\n"
+    return header + SNIPPET * max(1, target_chars // len(SNIPPET))
+
+
+if __name__ == "__main__":
+    mcp.run()
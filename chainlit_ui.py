@@ -1,23 +1,37 @@
 import chainlit as cl
 from chainlit.input_widget import Select, TextInput
+from dotenv import load_dotenv
 
+import asyncio
 import logging
+from contextlib import aclosing
 from typing import Optional
 
-from src.axiom.agent import AxiomAgent
-from src.axiom.config import settings, load_mcp_servers_from_config
+from src.axiom.agent import clear_axiom_agents, get_axiom_agent
+from src.axiom.clients import close_clients
+from src.axiom.config import settings
+from src.axiom.history import ChatHistory
+from src.axiom.session_store import get_session_manager
+from src.axiom.mcp_pool import get_mcp_pool
+from src.axiom.metrics import get_metrics, get_metrics_server
 from src.axiom.prompts import AXIOM_AGENT_PROMPT, AXIOM_ASSISTANT_PROMPT
+from src.axiom.rate_limit import current_session_id
+from src.axiom.response_cache import register_starter_prompts
+from src.axiom.streaming import coalesce_tokens
 
 from agents.mcp import MCPServer 
 
+load_dotenv()
+
 # Configure logging for the UI module
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # --- Constants ---
 SESSION_AGENT_KEY = "axiom_agent"
-SESSION_HISTORY_KEY = "chat_history"
+SESSION_HISTORY_KEY = "chat_history_id"
 SESSION_MCP_SERVERS_KEY = "mcp_servers"
+SESSION_MCP_LEASE_KEY = "mcp_lease"  # Whether the session holds a pool lease
 
 #################################
 # User Authentication
@@ -35,27 +49,31 @@ def oauth_callback(
 #################################
 # Quick Starter Questions
 #################################
+STARTERS = [
+    cl.Starter(
+        label="LangGraph Agents Creation",
+        message="Create a Multi-Agent customer support system using LangGraph swarm.",
+        icon="/public/msg_icons/chatbot.png",
+    ),
+    cl.Starter(
+        label="How to use Autogent",
+        message="How to use Autogen? Create some agents using Autogen",
+        icon="/public/msg_icons/usb.png",
+    ),
+    cl.Starter(
+        label="JWT Auth Implementation",
+        message="How to implement JWT authentication in FastAPi? Create a complete project.",
+        icon="/public/msg_icons/tools.png",
+    ),
+]
+
+# A starter typed with different casing still gets its cached answer
+register_starter_prompts(starter.message for starter in STARTERS)
+
 @cl.set_starters
 async def set_starters():
-    return [
-        cl.Starter(
-            label="LangGraph Agents Creation",
-            message="Create a Multi-Agent customer support system using LangGraph swarm.",
-            icon="/public/msg_icons/chatbot.png",
-            ),
-
-        cl.Starter(
-            label="How to use Autogent",
-            message="How to use Autogen? Create some agents using Autogen",
-            icon="/public/msg_icons/usb.png",
-            ),
-        cl.Starter(
-            label="JWT Auth Implementation",
-            message="How to implement JWT authentication in FastAPi? Create a complete project.",
-            icon="/public/msg_icons/tools.png",
-            ),
-
-        ]
+    return STARTERS
+
 #################################
 # Response modes for Axiom
 #################################
@@ -76,72 +94,99 @@ async def chat_profile():
 #################################
 # Chat Settings
 #################################
+@cl.on_app_startup
+async def on_app_startup():
+    if settings.METRICS_ENABLED:
+        try:
+            await get_metrics_server().start()
+        except OSError:
+            logger.exception("Failed to start the metrics server.")
+
+    # Start the shared MCP servers once for the whole process
+    try:
+        await get_mcp_pool().start()
+    except Exception:
+        # Chat sessions retry the start and report the error to the user
+        logger.exception("Failed to start the MCP server pool at app startup.")
+
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    await get_metrics_server().stop()
+    await get_mcp_pool().shutdown()
+    clear_axiom_agents()
+    await close_clients()
+
 @cl.on_chat_start
 async def on_chat_start():
     # Initialize chat history and MCP servers
-    cl.user_session.set(SESSION_HISTORY_KEY, [])
+    # Chat history lives in the session store; only its id is kept in the user session
+    cl.user_session.set(SESSION_HISTORY_KEY, cl.context.session.thread_id)
     cl.user_session.set(SESSION_MCP_SERVERS_KEY, [])
+    get_metrics().session_active(cl.context.session.id)
 
-    loaded_mcp_servers: list[MCPServer] = []
-    started_mcp_servers: list[MCPServer] = []
-
-    # 1. Load MCP Server configurations
+    # Lease the shared MCP servers (starts the pool on first use)
     try:
-        loaded_mcp_servers = load_mcp_servers_from_config()
+        leased_mcp_servers: list[MCPServer] = await get_mcp_pool().lease()
 
     except FileNotFoundError:
-        await cl.ErrorMessage(content=f"Fatal Error: MCP configuration file not found at '{settings.mcp_config_path}'. Agent cannot start.").send()
+        await cl.ErrorMessage(content=f"Fatal Error: MCP configuration file not found at '{settings.MCP_CONFIG_PATH}'. Agent cannot start.").send()
         return 
     except (ValueError, Exception) as e:
         logger.exception("Failed to load MCP server configurations.")
         await cl.ErrorMessage(content=f"Fatal Error: Could not load MCP configurations: {e}. Agent cannot start.").send()
         return 
 
-    # 2. Start the loaded MCP servers sequentially
-    if loaded_mcp_servers:
-        for server in loaded_mcp_servers:
-            try:
-                logger.info(f"Starting MCP Server: {server.name}...")
-                # The __aenter__ starts the server process
-                await server.__aenter__() 
-                started_mcp_servers.append(server)
-                logger.info(f"MCP Server '{server.name}' started successfully.")
-            except Exception as e:
-                logger.error(f"Failed to start MCP Server '{server.name}': {e}")
-
-        # Store only the successfully started servers for later cleanup
-        cl.user_session.set(SESSION_MCP_SERVERS_KEY, started_mcp_servers) 
+    # Store the leased servers so they are released when the chat ends
+    cl.user_session.set(SESSION_MCP_SERVERS_KEY, leased_mcp_servers)
+    cl.user_session.set(SESSION_MCP_LEASE_KEY, True)
 
 #################################
 # MCP Server Cleanup
 #################################
 async def cleanup_mcp_servers():
-    started_mcp_servers = cl.user_session.get(SESSION_MCP_SERVERS_KEY, [])
-    if not started_mcp_servers:
+    # A lease counts even if it holds no servers (e.g. none are configured)
+    if not cl.user_session.get(SESSION_MCP_LEASE_KEY):
         return
 
-    logger.info(f"Cleaning up {len(started_mcp_servers)} MCP server(s)...")
-    for server in started_mcp_servers:
-        try:
-            await server.__aexit__(None, None, None) 
-            logger.info(f"MCP Server '{server.name}' stopped.")
-        except Exception as e:
-            logger.error(f"Error stopping MCP Server '{server.name}': {e}", exc_info=True) 
-    
+    # The pool keeps the server processes running for other sessions
+    leased_mcp_servers = cl.user_session.get(SESSION_MCP_SERVERS_KEY) or []
+    logger.info(f"Releasing {len(leased_mcp_servers)} leased MCP server(s)...")
+    get_mcp_pool().release()
+
     cl.user_session.set(SESSION_MCP_SERVERS_KEY, []) # Clear the list
+    cl.user_session.set(SESSION_MCP_LEASE_KEY, False)
 
 @cl.on_chat_end
 async def on_chat_end():
     logger.info("Chat session ending.")
+    # Also called when the browser only disconnects; a reconnected session that sends
+    # a message is counted again in `on_message` (Chainlit does not rerun on_chat_start)
+    get_metrics().session_ended(cl.context.session.id)
     await cleanup_mcp_servers()
+    # A closed tab ends the chat without stopping the current task; cancel it so the
+    # agent run (model requests and tool calls) does not keep going for nobody
+    task = cl.context.session.current_task
+    if task is not None and not task.done():
+        logger.info("Cancelling the in-flight response of a disconnected session.")
+        task.cancel()
+    # Free the in-memory history; the messages stay in the session store
+    get_session_manager().evict(cl.user_session.get(SESSION_HISTORY_KEY))
+
+@cl.on_stop
+async def on_stop():
+    # Chainlit cancels the message task; `on_message` records the partial response
+    logger.info("Response stopped by the user.")
 
 #################################
 # User Message Handler
 #################################
 @cl.on_message
 async def on_message(message: cl.Message):
+    get_metrics().session_active(cl.context.session.id)
     started_mcp_servers = cl.user_session.get(SESSION_MCP_SERVERS_KEY)
-    chat_history: list[dict] = cl.user_session.get(SESSION_HISTORY_KEY, []) 
+    history_id = cl.user_session.get(SESSION_HISTORY_KEY) or cl.context.session.thread_id
+    chat_history: ChatHistory = get_session_manager().get_history(history_id)
+    current_session_id.set(history_id)  # Model requests are queued fairly per chat session
     
     # Initialize the Axiom Agent
     axiom_mode = cl.user_session.get("chat_profile")
@@ -154,34 +199,39 @@ async def on_message(message: cl.Message):
         # For Agent mode, use all MCP servers
         filtered_servers = started_mcp_servers
 
-    agent = AxiomAgent(
+    # Reuse the shared agent (and its pooled HTTP client) for this mode
+    agent = get_axiom_agent(
+        mode=axiom_mode,
         model=settings.DEFAULT_AGENT_MODEL if axiom_mode == "Agent✨" else settings.DEFAULT_ASSISTANT_MODEL,
         mcp_servers=filtered_servers,
         prompt=AXIOM_AGENT_PROMPT if axiom_mode == "Agent✨" else AXIOM_ASSISTANT_PROMPT,
         )
 
     # Add user message to history
-    chat_history.append({"role": "user", "content": message.content})
+    await chat_history.append({"role": "user", "content": message.content})
     
     msg = cl.Message(content="")
-    full_response = ""
+    response_parts: list[str] = []
 
     try:
-        response = agent.stream_agent(chat_history)
-        async for token in response:
-            full_response += token
-            await msg.stream_token(token) # Stream tokens to the UI
+        # Coalesce tiny deltas so each websocket frame carries a meaningful chunk.
+        # Closing the stream on exit cancels the agent run if the task is stopped.
+        async with aclosing(coalesce_tokens(agent.stream_agent(await chat_history.build_input()))) as response:
+            async for chunk in response:
+                response_parts.append(chunk)
+                await msg.stream_token(chunk) # Stream chunks to the UI
         # Send the final message
         await msg.send()
+    except asyncio.CancelledError:
+        # Stopped or disconnected: keep what was streamed so the history stays consistent
+        await chat_history.append({"role": "assistant", "content": "".join(response_parts) + "\n\n[Response stopped]"})
+        raise
     except Exception as e:
         logger.exception(f"Error during agent response streaming: {e}")
         # Update the message placeholder with an error
         await msg.update(content=f"Sorry, an error occurred while processing your request.") 
-        chat_history.append({"role": "assistant", "content": f"[Agent Error Occurred]"}) 
+        await chat_history.append({"role": "assistant", "content": f"[Agent Error Occurred]"}) 
     else:
         # Only append successful response if no exception occurred
-        chat_history.append({"role": "assistant", "content": full_response})
-    finally:
-        # Update session history
-        cl.user_session.set(SESSION_HISTORY_KEY, chat_history)
+        await chat_history.append({"role": "assistant", "content": "".join(response_parts)})
 
@@ -1,23 +1,185 @@
+import argparse
 import asyncio
-from typing import List, Dict, Optional
-
-from src.axiom.agent import AxiomAgent
-from src.axiom.config import settings, load_mcp_servers_from_config 
-from agents.mcp import MCPServer 
+import importlib
 import logging
+import re
+import signal
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
 
-# --- Configure Logging ---
-httpx_logger = logging.getLogger("httpx")
-httpx_logger.setLevel(logging.WARNING) 
-
-# Use Rich for pretty output
+from dotenv import load_dotenv
 from rich.console import Console
-from rich.markdown import Markdown
+from rich.markup import escape
 from rich.rule import Rule
 from rich.text import Text
 
+from src.axiom.config import get_settings, settings
+
+if TYPE_CHECKING:
+    from agents.mcp import MCPServer
+    from src.axiom.agent import AxiomAgent
+    from src.axiom.history import ChatHistory
+    from src.axiom.mcp_pool import MCPServerHandle
+
 console = Console()
 
+# Slow imports (agents SDK, OpenAI, MCP, Markdown rendering) are loaded in a worker
+# thread while the first prompt is shown; see `initialize_runtime`
+BACKGROUND_IMPORTS = (
+    "src.axiom.agent",
+    "src.axiom.history",
+    "src.axiom.supervisor",
+    "rich.live",
+    "rich.markdown",
+    "rich.spinner",
+)
+
+# Maximum number of times per second the streaming response is re-rendered
+RENDER_REFRESH_PER_SECOND = 8
+
+# A list item line: "- x", "* x", "+ x", "1. x" or "1) x"
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s")
+
+
+class MarkdownStream:
+    """
+    Renders a streamed Markdown response incrementally with `rich.live.Live`.
+
+    Chunks are buffered in a list and the display is refreshed at most
+    `refresh_per_second` times; chunks that arrive in between are rendered by a
+    trailing refresh at the end of the interval. Completed blocks (paragraphs, lists,
+    closed code fences) are printed once above the live area; only the trailing
+    unfinished block is re-rendered on each frame, so the cost stays flat for long answers.
+    """
+
+    def __init__(self, console: Console, refresh_per_second: int = RENDER_REFRESH_PER_SECOND):
+        from rich.live import Live
+        from rich.spinner import Spinner
+
+        self.console = console
+        self._interval = 1 / refresh_per_second
+        self._parts: list[str] = []  # Every chunk received, for the final response text
+        self._tail: list[str] = []  # Chunks of the trailing, not yet printed block
+        self._last_render = 0.0
+        self._pending_render: Optional[asyncio.TimerHandle] = None
+        self._spinner = Spinner("dots", text=Text("Thinking...", style="bold green"))
+        self._live = Live(
+            self._spinner,
+            console=console,
+            refresh_per_second=refresh_per_second,  # Keeps the spinner animating
+            transient=True,
+        )
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def __enter__(self) -> "MarkdownStream":
+        self._live.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+        self._live.stop()
+
+    def set_status(self, status: str) -> None:
+        """Updates the spinner text shown until the first chunk arrives."""
+        if not self._parts:
+            self._spinner.update(text=Text(status, style="bold green"))
+            self._live.refresh()
+
+    def append(self, chunk: str) -> None:
+        self._parts.append(chunk)
+        self._tail.append(chunk)
+        wait = self._last_render + self._interval - time.monotonic()
+        if wait <= 0:
+            self._render()
+        elif self._pending_render is None:
+            # Throttled: render at the end of the interval, so the chunk is not left
+            # off-screen if the stream pauses (e.g. while a tool runs)
+            self._pending_render = asyncio.get_running_loop().call_later(wait, self._render)
+
+    def _cancel_pending_render(self) -> None:
+        if self._pending_render is not None:
+            self._pending_render.cancel()
+            self._pending_render = None
+
+    def flush(self) -> None:
+        """Prints whatever is left of the response."""
+        from rich.markdown import Markdown
+
+        self._cancel_pending_render()
+        tail = "".join(self._tail)
+        self._tail = []
+        self._live.update(Text(""), refresh=True)
+        if tail.strip():
+            self._live.console.print(Markdown(tail))
+
+    @staticmethod
+    def _split_completed(text: str) -> int:
+        """
+        Returns the length of the prefix made of completed Markdown blocks.
+
+        A blank line only ends a block once the next block is known to start at the left
+        margin, so loose lists, indented continuations and code inside list items are
+        never split (which would renumber or break them). A closed top-level code fence
+        ends its block right away.
+        """
+        fence = ""  # Marker of the open code fence, if any
+        fence_indented = False
+        in_list = False
+        after_blank = False
+        completed = 0
+        position = 0
+        for line in text.splitlines(keepends=True):
+            start = position
+            position += len(line)
+            if not line.endswith("\n"):
+                break  # The last line is still being streamed
+            stripped = line.strip()
+            if fence:
+                if stripped.startswith(fence):
+                    fence = ""
+                    if not fence_indented and not in_list:
+                        completed = position
+                        after_blank = False
+                continue
+            if not stripped:
+                after_blank = True
+                continue
+
+            indented = line[0] in " \t"
+            is_item = bool(_LIST_ITEM.match(line))
+            is_fence = stripped.startswith(("```", "~~~"))
+            if after_blank and not indented and not (in_list and is_item):
+                completed = start  # The previous block ended at the blank line
+            if not indented:
+                if is_item:
+                    in_list = True
+                elif after_blank or is_fence:
+                    in_list = False  # Only a lazy continuation line keeps a list open
+            if is_fence:
+                fence, fence_indented = stripped[:3], indented
+            after_blank = False
+        return completed
+
+    def _render(self) -> None:
+        from rich.markdown import Markdown
+
+        self._cancel_pending_render()
+        self._last_render = time.monotonic()
+        tail = "".join(self._tail)
+        completed = self._split_completed(tail)
+        if completed:
+            done, tail = tail[:completed], tail[completed:]
+            if done.strip():
+                self._live.console.print(Markdown(done))
+        self._tail = [tail] if tail else []
+        self._live.update(Markdown(tail), refresh=True)
+
 async def get_user_input(prompt_text: str) -> str:
     """Gets user input asynchronously with a styled prompt."""
     # Render the prompt text using Rich
@@ -25,56 +187,151 @@ async def get_user_input(prompt_text: str) -> str:
     return await asyncio.to_thread(console.input, prompt_markup)
 
 
+@dataclass
+class Runtime:
+    """The agent and the MCP servers behind it, set up while the first prompt is shown."""
+    agent: "AxiomAgent"
+    chat_history: "ChatHistory"
+    handles: List["MCPServerHandle"] = field(default_factory=list)
+    startup_task: Optional[asyncio.Task] = None  # MCP servers still starting in the background
+    notices: List[str] = field(default_factory=list)  # Status messages not shown yet
+
+    def print_notices(self) -> None:
+        for notice in self.notices:
+            console.print(notice)
+        self.notices.clear()
+
+    async def stop(self) -> None:
+        from src.axiom.mcp_pool import stop_mcp_servers
+
+        if self.startup_task is not None:
+            # Do not wait out MCP_STARTUP_TIMEOUT on quit: cancelling the startup stops
+            # the servers that already connected
+            self.startup_task.cancel()
+            result = (await asyncio.gather(self.startup_task, return_exceptions=True))[0]
+            if isinstance(result, list):
+                self.handles = result
+            elif not isinstance(result, asyncio.CancelledError):
+                console.print(f"[yellow]MCP server startup failed:[/yellow] [red]{result}[/red]")
+            self.startup_task = None
+        if self.handles:
+            console.print(Rule("[dim]Stopping MCP servers[/dim]", style="blue"))
+            await stop_mcp_servers(self.handles)
+            for handle in self.handles:
+                console.print(f"  [dim]Stopped:[/dim] {handle.name}")
+
+
+def _import_modules(names: tuple[str, ...]) -> None:
+    for name in names:
+        importlib.import_module(name)
+
+
+async def start_servers_in_background(loaded_mcp_servers: List["MCPServer"], notices: List[str]) -> List["MCPServerHandle"]:
+    """Starts the servers while the user is already chatting and reports when they are ready."""
+    from src.axiom.mcp_pool import start_mcp_servers
+
+    handles, failures = await start_mcp_servers(loaded_mcp_servers)
+    notices.append(f"[dim]{len(handles)}/{len(loaded_mcp_servers)} MCP server(s) ready.[/dim]")
+    for name, reason in failures.items():
+        notices.append(f"  [yellow]Failed to start:[/yellow] {name} [dim]({escape(reason)})[/dim]")
+    return handles
+
+
+async def initialize_runtime() -> Runtime:
+    """
+    Loads the MCP configuration, starts the servers and creates the agent.
+
+    Runs in the background while the user types the first message. Status messages are
+    collected in `Runtime.notices` and shown before the first response, so they do not
+    interrupt the prompt.
+    """
+    # Importing in a worker thread keeps the event loop (and the prompt) responsive
+    await asyncio.to_thread(_import_modules, BACKGROUND_IMPORTS)
+
+    from src.axiom.agent import AxiomAgent
+    from src.axiom.config import load_mcp_servers_from_config
+    from src.axiom.history import ChatHistory
+    from src.axiom.mcp_pool import start_mcp_servers
+    from src.axiom.schema_cache import get_tool_schema_cache
+    from src.axiom.supervisor import load_supervised_mcp_servers
+
+    notices: List[str] = []
+    loaded_mcp_servers: List["MCPServer"] = []
+    started_mcp_servers: List["MCPServer"] = []
+    started_handles: List["MCPServerHandle"] = []
+    startup_task: Optional[asyncio.Task] = None
+
+    # 1. Load MCP Servers
+    try:
+        if settings.MCP_SUPERVISION_ENABLED:
+            loaded_mcp_servers = load_supervised_mcp_servers(schema_cache=get_tool_schema_cache())
+        else:
+            loaded_mcp_servers = load_mcp_servers_from_config(schema_cache=get_tool_schema_cache())
+        if not loaded_mcp_servers:
+             notices.append("[yellow]No MCP server configurations found or loaded.[/yellow]")
+
+    except Exception as e:
+        notices.append(f"[bold red]Error loading MCP config:[/bold red] [red]{e}[/red]")
+
+    # 2. Start MCP Servers (concurrently, each bounded by the startup timeout)
+    if loaded_mcp_servers and get_tool_schema_cache() is not None:
+        # Tool lists come from the schema cache, so chat can start while servers boot
+        startup_task = asyncio.create_task(start_servers_in_background(loaded_mcp_servers, notices))
+        started_mcp_servers = loaded_mcp_servers
+    elif loaded_mcp_servers:
+        started_handles, failures = await start_mcp_servers(loaded_mcp_servers)
+        started_mcp_servers = [handle.server for handle in started_handles]
+        for handle in started_handles:
+            notices.append(f"  [green]Started:[/green] {handle.name} [dim]({handle.startup_seconds:.2f}s)[/dim]")
+        for name, reason in failures.items():
+            notices.append(f"  [yellow]Failed to start:[/yellow] {name} [dim]({escape(reason)})[/dim]")
+        if not started_mcp_servers:
+            notices.append("[yellow]Warning: All configured MCP servers failed to start. Agent will operate without MCP tools.[/yellow]")
+
+    # 3. Initialize the Agent
+    try:
+        agent = AxiomAgent(mcp_servers=started_mcp_servers)
+    except BaseException:
+        if startup_task is not None:
+            startup_task.cancel()
+        from src.axiom.mcp_pool import stop_mcp_servers
+        await stop_mcp_servers(started_handles)
+        raise
+
+    return Runtime(
+        agent=agent,
+        chat_history=ChatHistory(),
+        handles=started_handles,
+        startup_task=startup_task,
+        notices=notices,
+    )
+
+
+async def wait_for_runtime(init_task: asyncio.Task) -> Optional[Runtime]:
+    """Waits for the background initialization, with a spinner if it is still running."""
+    if not init_task.done():
+        with console.status("[bold green]Starting the agent...[/bold green]"):
+            await asyncio.wait({init_task})
+    try:
+        runtime = init_task.result()
+    except Exception as e:
+        console.print(f"[bold red]Fatal Error: Could not initialize Agent:[/bold red] [red]{e}[/red]")
+        return None
+    console.print(f"[dim]{settings.AGENT_NAME} is ready.[/dim]")
+    return runtime
+
+
 async def main():
     console.print(Rule("[bold blue] Welcome to Axiom CLI [/bold blue]", style="blue"))
     console.print("[dim]Type 'quit' or 'exit' to end the chat.[/dim]")
     console.print("") # Blank line
 
-    loaded_mcp_servers: List[MCPServer] = []
-    started_mcp_servers: List[MCPServer] = []
-    agent: Optional[AxiomAgent] = None
-    chat_history: List[Dict[str, str]] = []
+    # The prompt is shown right away; the agent and MCP servers start behind it
+    init_task = asyncio.create_task(initialize_runtime())
+    runtime: Optional[Runtime] = None
 
     try:
-        # 1. Load MCP Servers
-        console.print("[bold]Loading MCP configurations...[/bold]")
-        try:
-            loaded_mcp_servers = load_mcp_servers_from_config()
-            if loaded_mcp_servers:
-                 console.print(f"[green]Loaded {len(loaded_mcp_servers)} server(s) config.[/green] Attempting to start...")
-            else:
-                 console.print("[yellow]No MCP server configurations found or loaded.[/yellow]")
-
-        except Exception as e:
-            console.print(f"[bold red]Error loading MCP config:[/bold red] [red]{e}[/red]")
-
-        # 2. Start MCP Servers
-        if loaded_mcp_servers:
-            for server in loaded_mcp_servers:
-                try:
-                    await server.__aenter__()
-                    started_mcp_servers.append(server)
-                    console.print(f"  [green]Started:[/green] {server.name}")
-                except Exception as e:
-                    console.print(f"  [yellow]Failed to start:[/yellow] {server.name} - [yellow]{e}[/yellow]")
-
-        if loaded_mcp_servers and not started_mcp_servers:
-             console.print("[yellow]Warning: All configured MCP servers failed to start. Agent will operate without MCP tools.[/yellow]")
-        elif started_mcp_servers:
-             console.print(f"[green]Successfully started {len(started_mcp_servers)} MCP server(s).[/green]")
-
-        # 3. Initialize the Agent
-        console.print("[bold]Initializing Agent...[/bold]")
-        try:
-            agent = AxiomAgent(mcp_servers=started_mcp_servers)
-            console.print(f"[bold green]{settings.AGENT_NAME} is ready![/bold green]")
-        except Exception as e:
-            console.print(f"[bold red]Fatal Error: Could not initialize Agent:[/bold red] [red]{e}[/red]")
-            raise
-
-        console.print(Rule(style="blue"))
-
-        # 4. Main chat loop
+        # Main chat loop
         while True:
             # Get user input with styled prompt
             user_input = await get_user_input("You: ")
@@ -82,32 +339,74 @@ async def main():
             if user_input.lower() in ['quit', 'exit']:
                 break
 
-            chat_history.append({"role": "user", "content": user_input})
+            if runtime is None:
+                runtime = await wait_for_runtime(init_task)
+                if runtime is None:
+                    break
+            runtime.print_notices()
+            agent, chat_history = runtime.agent, runtime.chat_history
 
+            from src.axiom.events import RunSummary, TextDelta, ToolCallStarted
+
+            await chat_history.append({"role": "user", "content": user_input})
             console.print("[bold green]Axiom:[/bold green]") # Print Agent prefix before response
 
-            full_response = ""
-            # Use Rich Status for the thinking indicator while streaming
-            with console.status("[bold green]Thinking...[/bold green]", spinner="dots", speed=0.5) as status:
+            # Render the response as it streams (spinner until the first token arrives)
+            stream = MarkdownStream(console)
+            summary: Optional[RunSummary] = None
+            chat_input = await chat_history.build_input()
+
+            async def consume_events() -> None:
+                nonlocal summary
+                async with aclosing(agent.stream_events(chat_input)) as event_stream:
+                    async for event in event_stream:
+                        if isinstance(event, TextDelta):
+                            stream.append(event.text)
+                        elif isinstance(event, ToolCallStarted):
+                            stream.set_status(f"Running {event.tool_name}...")
+                        elif isinstance(event, RunSummary):
+                            summary = event
+
+            with stream:
+                 # Ctrl-C stops this response (and the agent run behind it), not the CLI
+                 consumer = asyncio.create_task(consume_events())
+                 loop = asyncio.get_running_loop()
+                 try:
+                     loop.add_signal_handler(signal.SIGINT, consumer.cancel)
+                 except (NotImplementedError, RuntimeError):
+                     pass  # Signal handlers are not supported on this platform (e.g. Windows)
                  try:
-                    response_generator = agent.stream_agent(chat_history)
-                    async for token in response_generator:
-                        full_response += token
-                    status.stop()
+                    await consumer
+                    full_response = stream.text
+                    if summary is not None and summary.error:
+                        console.print(f"\n[bold red]Error during response:[/bold red] [red]{summary.error}[/red]")
+                        full_response = full_response or f"[Error: {summary.error}]"
 
+                 except asyncio.CancelledError:
+                     if asyncio.current_task().cancelling():
+                         raise  # The CLI itself is being cancelled
+                     console.print("\n[yellow]Response stopped.[/yellow]")
+                     full_response = stream.text + "\n\n[Response stopped]"
                  except Exception as e:
-                     status.stop()
                      console.print(f"\n[bold red]Error during response:[/bold red] [red]{e}[/red]", style="red")
                      full_response = f"[Error: {e}]"
+                 finally:
+                     try:
+                         loop.remove_signal_handler(signal.SIGINT)
+                     except (NotImplementedError, RuntimeError):
+                         pass
 
-
-            # Render the full response using Markdown
-            if full_response:
-                 console.print(Markdown(full_response)) # Renders code blocks, lists, etc.
-            else:
+            if not full_response:
                  console.print("[dim](No response generated)[/dim]")
+            elif summary is not None and summary.cached:
+                 console.print(f"[dim]{summary.model} · cached response[/dim]")
+            elif summary is not None:
+                 console.print(
+                     f"[dim]{summary.model} · {summary.total_seconds:.1f}s · {summary.model_turns} model turn(s) · "
+                     f"{summary.tool_calls} tool call(s)[/dim]"
+                 )
 
-            chat_history.append({"role": "assistant", "content": full_response})
+            await chat_history.append({"role": "assistant", "content": full_response})
             console.print(Rule(style="blue")) # Print a rule after each turn
 
     except Exception as e:
@@ -115,17 +414,89 @@ async def main():
         console.print(f"\n[bold red]An unhandled error occurred:[/bold red] [red]{e}[/red]", style="red", highlight=True)
 
     finally:
-        # 5. Cleanup: Stop MCP Servers
-        if started_mcp_servers:
-            console.print(Rule("[dim]Stopping MCP servers[/dim]", style="blue"))
-            for server in started_mcp_servers:
-                try:
-                    await server.__aexit__(None, None, None)
-                    console.print(f"  [dim]Stopped:[/dim] {server.name}")
-                except Exception as e:
-                    console.print(f"  [red]Error stopping:[/red] {server.name} - [red]{e}[/red]")
+        # Cleanup: abandon a startup still in progress, then stop the MCP servers
+        if not init_task.done():
+            init_task.cancel()
+        await asyncio.gather(init_task, return_exceptions=True)
+        if runtime is None and not init_task.cancelled() and init_task.exception() is None:
+            runtime = init_task.result()
+        if runtime is not None:
+            await runtime.stop()
 
         console.print(Rule("[bold blue] Chat ended. Goodbye! [/bold blue]", style="blue"))
 
+
+async def batch_main(args: argparse.Namespace):
+    """Runs a JSONL file of prompts through the agent without the interactive UI."""
+    from src.axiom.agent import AxiomAgent
+    from src.axiom.batch import run_batch
+    from src.axiom.config import load_mcp_servers_from_config
+    from src.axiom.mcp_pool import start_mcp_servers, stop_mcp_servers
+
+    loaded_mcp_servers = load_mcp_servers_from_config()
+    started_handles, failures = await start_mcp_servers(loaded_mcp_servers)
+    console.print(f"[dim]Started {len(started_handles)}/{len(loaded_mcp_servers)} MCP server(s).[/dim]")
+    for name, reason in failures.items():
+        console.print(f"  [yellow]Failed to start:[/yellow] {name} [dim]({escape(reason)})[/dim]")
+
+    try:
+        agent = AxiomAgent(model=args.model, mcp_servers=[handle.server for handle in started_handles])
+
+        def on_result(result: dict) -> None:
+            if result["error"]:
+                console.print(f"  [red]✗[/red] {result['id']} [dim]({result['latency']:.2f}s)[/dim] {result['error']}")
+            else:
+                console.print(f"  [green]✓[/green] {result['id']} [dim]({result['latency']:.2f}s)[/dim]")
+
+        report = await run_batch(
+            agent,
+            Path(args.prompts),
+            Path(args.output),
+            workers=args.workers,
+            resume=args.resume,
+            on_result=on_result,
+        )
+    finally:
+        await stop_mcp_servers(started_handles)
+
+    percentiles = report.latency_percentiles()
+    latency = " ".join(f"{name}={value:.2f}s" for name, value in percentiles.items() if value is not None)
+    console.print(Rule("[bold blue] Batch complete [/bold blue]", style="blue"))
+    console.print(
+        f"{report.completed} completed, {report.failed} failed, {report.skipped} skipped (of {report.total}) "
+        f"in {report.wall_seconds:.1f}s · {report.throughput:.2f} prompts/s"
+    )
+    if latency:
+        console.print(f"[dim]Latency: {latency}[/dim]")
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Axiom command line interface.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser("batch", help="Run a JSONL file of prompts headlessly.")
+    batch.add_argument("prompts", help="JSONL file with one {\"id\", \"prompt\"} (or \"messages\") object per line.")
+    batch.add_argument("-o", "--output", default="results.jsonl", help="JSONL file results are appended to.")
+    batch.add_argument("-w", "--workers", type=int, default=4, help="Maximum number of prompts running at once.")
+    batch.add_argument("--resume", action="store_true", help="Skip prompts that already succeeded in the output file.")
+    batch.add_argument("--model", default=None, help="Model to use (defaults to DEFAULT_AGENT_MODEL).")
+    return parser.parse_args()
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    logging.basicConfig(level=level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
 if __name__ == "__main__":
+    load_dotenv()
+    args = parse_args()
+    # Startup runs while the user types, so the chat only shows warnings and errors;
+    # status messages reach the user through `Runtime.notices` instead
+    configure_logging(logging.INFO if args.command == "batch" else logging.WARNING)
+    get_settings()  # Fail fast on configuration errors, before the prompt is shown
+    if args.command == "batch":
+        report = asyncio.run(batch_main(args))
+        raise SystemExit(1 if report.failed else 0)
     asyncio.run(main())
\ No newline at end of file
@@ -1,11 +1,15 @@
+import asyncio
+import logging
+import time
+from contextlib import aclosing
 from typing import Optional
 from typing_extensions import AsyncGenerator
 
 from openai import AsyncOpenAI
-from openai.types.responses import ResponseTextDeltaEvent
 
 from agents import (
     Agent,
+    ModelSettings,
     OpenAIChatCompletionsModel,
     RunConfig,
     Runner,
@@ -13,8 +17,26 @@ from agents import (
 )
 from agents.mcp import MCPServer
 
+from .clients import get_openai_client
 from .config import settings
+from .doc_index import IndexingMCPServer, get_doc_index, search_docs
+from .docs_fanout import make_fetch_docs_tool
+from .events import AgentEvent, RunSummary, RunTracker, TextDelta, ToolCallStarted, TurnCompleted
+from .metrics import get_metrics
+from .prefetch import DocPrefetcher, PrefetchTrackingMCPServer, get_prefetcher
 from .prompts import AXIOM_AGENT_PROMPT
+from .response_cache import ResponseCache, get_response_cache, make_response_key, replay_response
+from .routing import AUTO_MODEL, ModelRouter, get_model_router
+from .singleflight import CoalescingMCPServer, get_single_flight
+from .tool_cache import CachedMCPServer, ToolResultCache, get_tool_cache
+from .tool_outputs import CompactingChatCompletionsModel, expand_tool_output, get_tool_output_store
+
+logger = logging.getLogger(__name__)
+
+MAX_TURNS = 20
+
+# Prefix of the text `run_agent` returns when a run fails
+RUN_ERROR_PREFIX = "An error occurred during processing"
 
 class AxiomAgent:
     def __init__(
@@ -25,36 +47,113 @@ class AxiomAgent:
         mcp_servers: Optional[list[MCPServer]] = None,
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        router: Optional[ModelRouter] = None,
+        mode: Optional[str] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         self._api_key = api_key or settings.GOOGLE_API_KEY
         self.base_url = base_url or settings.BASE_URL
         self.model_name = model or settings.DEFAULT_AGENT_MODEL
+        self.mode = mode or "default"
+        self.prompt = prompt or AXIOM_AGENT_PROMPT
+
+        # With model="auto", each request is routed to the fastest model of the tier it needs
+        self.router = (router or get_model_router()) if self.model_name == AUTO_MODEL else None
         
-        self._client: AsyncOpenAI = AsyncOpenAI(
-            api_key=self._api_key,
-            base_url=self.base_url,
-        )
+        # Shared client: reuses pooled connections across agents and sessions
+        self._client: AsyncOpenAI = get_openai_client(self._api_key, self.base_url)
+        self._models: dict[str, OpenAIChatCompletionsModel] = {}
+
+        mcp_servers = mcp_servers or []
+
+        # Index fetched docs locally so later lookups can search them instead of re-fetching.
+        # Innermost, so only results actually fetched from the server are indexed (not cache hits)
+        tools = list(tools or [])
+        if settings.DOC_INDEX_ENABLED and any(server.name.lower() == "context7" for server in mcp_servers):
+            doc_index = get_doc_index()
+            mcp_servers = [
+                IndexingMCPServer(server, doc_index) if server.name.lower() == "context7" else server
+                for server in mcp_servers
+            ]
+            tools.append(search_docs)
+
+        # Concurrent identical tool calls (across runs and sessions) share one MCP request
+        if settings.SINGLE_FLIGHT_ENABLED:
+            single_flight = get_single_flight()
+            mcp_servers = [CoalescingMCPServer(server, single_flight) for server in mcp_servers]
+
+        # Answer repeated documentation lookups from the shared tool result cache
+        self.tool_cache = tool_cache or (get_tool_cache() if settings.TOOL_CACHE_ENABLED else None)
+        if self.tool_cache is not None:
+            mcp_servers = [CachedMCPServer(server, self.tool_cache) for server in mcp_servers]
+
+        # Replay answers to conversations seen before (starters, frequent questions)
+        self.response_cache = response_cache or (get_response_cache() if settings.RESPONSE_CACHE_ENABLED else None)
+
+        # Large tool outputs are truncated after the model has read them; it can expand them again
+        if settings.TOOL_OUTPUT_COMPACTION_ENABLED:
+            tools.append(expand_tool_output)
+
+        # The context7 server with caching and coalescing, but without prefetch tracking
+        docs_server = next((server for server in mcp_servers if server.name.lower() == "context7"), None)
+
+        # Optionally start resolving and fetching docs for libraries named in the message
+        # while the model is still planning, so its own calls are answered from the cache
+        self.prefetcher: Optional[DocPrefetcher] = None
+        self._docs_server: Optional[MCPServer] = None
+        if settings.PREFETCH_ENABLED and (self.tool_cache is not None or settings.SINGLE_FLIGHT_ENABLED):
+            self._docs_server = docs_server
+            if self._docs_server is not None:
+                self.prefetcher = get_prefetcher()
+                mcp_servers = [
+                    PrefetchTrackingMCPServer(server, self.prefetcher) if server is self._docs_server else server
+                    for server in mcp_servers
+                ]
+
+        # Resolve and fetch docs for several libraries in one concurrent tool call. Its calls
+        # are not the model's own `resolve-library-id` calls, so they bypass prefetch tracking
+        if settings.DOCS_FANOUT_ENABLED and docs_server is not None:
+            tools.append(make_fetch_docs_tool(docs_server))
 
         self.agent = Agent(
             name=settings.AGENT_NAME,
-            instructions=prompt or AXIOM_AGENT_PROMPT,
-            mcp_servers=mcp_servers or [],
-            tools=tools or [],
+            instructions=self.prompt,
+            mcp_servers=mcp_servers,
+            tools=tools,
         )
 
-    def _get_run_config(self) -> RunConfig:
+    def _get_model(self, model_name: str) -> OpenAIChatCompletionsModel:
+        model = self._models.get(model_name)
+        if model is None:
+            if settings.TOOL_OUTPUT_COMPACTION_ENABLED:
+                model = CompactingChatCompletionsModel(
+                    model=model_name, openai_client=self._client, store=get_tool_output_store()
+                )
+            else:
+                model = OpenAIChatCompletionsModel(model=model_name, openai_client=self._client)
+            self._models[model_name] = model
+        return model
 
-        # Create the specific model configuration
-        model_instance = OpenAIChatCompletionsModel(
-            model=self.model_name,
-            openai_client=self._client
-        )
+    def _candidate_models(self, chat_history: str | list[dict[str, str]]) -> list[str]:
+        """The models to try for a request: the routed model and its fallbacks, or the fixed model."""
+        if self.router is None:
+            return [self.model_name]
+        return self.router.route(chat_history)[:settings.ROUTING_MAX_ATTEMPTS]
 
+    def _get_run_config(self, model_name: Optional[str] = None) -> RunConfig:
         return RunConfig(
-            model=model_instance,
+            model=self._get_model(model_name or self.model_name),
+            # Ask for usage in streamed responses so runs can report token counts
+            model_settings=ModelSettings(include_usage=True),
             tracing_disabled=not settings.TRACING_ENABLED,
         )
 
+    def _response_key(self, chat_history: str | list[dict[str, str]]) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        return make_response_key(self.mode, self.model_name, self.prompt, chat_history)
+
     async def run_agent(self, chat_history: str | list[dict[str, str]]) -> str:
         """
         Runs the agent with the given chat history and returns the final response.
@@ -63,20 +162,296 @@ class AxiomAgent:
             chat_history: A list of message dictionaries (e.g., [{"role": "user", "content": "Hi"}]).
 
         Returns:
-            The final text output from the agent.
+            The final text output from the agent, or an error message starting with
+            `RUN_ERROR_PREFIX` if the run failed. Use `run_with_summary` to tell the two apart.
         """
-        config = self._get_run_config()
+        summary = await self.run_with_summary(chat_history)
+        if summary.error is not None:
+            return f"{RUN_ERROR_PREFIX}: {summary.error}"
+        return summary.final_output
 
+    async def run_with_summary(self, chat_history: str | list[dict[str, str]]) -> RunSummary:
+        """
+        Runs the agent without streaming and returns the run's summary.
+
+        Args:
+            chat_history: A list of message dictionaries.
+
+        Returns:
+            A `RunSummary` whose `final_output` holds the response, or whose `error` is
+            set if every candidate model failed.
+        """
+        cache_key = self._response_key(chat_history)
+        if cache_key is not None:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                summary = RunSummary(
+                    total_seconds=0.0, time_to_first_token=None, model_turns=0, tool_calls=0,
+                    model=self.model_name, cached=True, final_output=cached,
+                )
+                get_metrics().observe_run(summary)
+                return summary
+
+        prefetch = self._start_prefetch(chat_history)
         try:
-            result = await Runner.run(
-                starting_agent=self.agent,
-                input=chat_history,
-                run_config=config
+            return await self._run_candidates(chat_history, cache_key)
+        except asyncio.CancelledError:
+            self._cancel_prefetch(prefetch)
+            raise
+
+    async def _run_candidates(self, chat_history: str | list[dict[str, str]], cache_key: Optional[str]) -> RunSummary:
+        """Runs the request on each candidate model until one succeeds; see `run_with_summary`."""
+        candidates = self._candidate_models(chat_history)
+        for attempt, model_name in enumerate(candidates):
+            config = self._get_run_config(model_name)
+            # Times the tool calls, so router latency excludes them as in `stream_events`;
+            # the events it queues are not consumed
+            tracker = RunTracker(asyncio.Queue())
+            started = time.perf_counter()
+            try:
+                run = Runner.run(
+                    starting_agent=self.agent,
+                    input=chat_history,
+                    hooks=tracker,
+                    run_config=config
+                )
+                if self.router is not None:
+                    run = asyncio.wait_for(run, timeout=settings.ROUTING_RUN_TIMEOUT)
+                result = await run
+            except Exception as e:
+                summary = RunSummary(
+                    total_seconds=time.perf_counter() - started,
+                    time_to_first_token=None,
+                    model_turns=0,
+                    tool_calls=0,
+                    error=str(e) or type(e).__name__,
+                    model=model_name,
+                )
+                get_metrics().observe_run(summary)
+                if self.router is None:
+                    return summary
+                self.router.record(model_name, None, error=True)
+                if attempt == len(candidates) - 1:
+                    return summary
+                logger.warning(f"Model {model_name} failed ({e!r}); falling back to {candidates[attempt + 1]}.")
+                continue
+
+            summary = RunSummary(
+                total_seconds=time.perf_counter() - started,
+                time_to_first_token=None,
+                model_turns=len(result.raw_responses),
+                tool_calls=tracker.tool_calls,
+                tool_latency=dict(tracker.tool_latency),
+                input_tokens=sum(response.usage.input_tokens for response in result.raw_responses),
+                output_tokens=sum(response.usage.output_tokens for response in result.raw_responses),
+                model=model_name,
+                final_output=str(result.final_output),
             )
-            return result.final_output
+            get_metrics().observe_run(summary)
+            if self.router is not None:
+                self.router.record(model_name, self._turn_latency(summary), error=False)
+            if cache_key is not None:
+                await self.response_cache.set(cache_key, self.mode, self.model_name, summary.final_output)
+            return summary
+
+    async def stream_events(self, chat_history: str | list[dict[str, str]]) -> AsyncGenerator[AgentEvent, None]:
+        """
+        Runs the agent with the given chat history and streams typed events.
+
+        Args:
+            chat_history: A list of message dictionaries.
+
+        Yields:
+            `TextDelta`, `TurnStarted`/`TurnCompleted` and `ToolCallStarted`/`ToolCallCompleted`
+            events as they happen, followed by exactly one `RunSummary` with the run's
+            latency and usage metrics (and its error, if the run failed).
 
-        except Exception as e:
-            return f"An error occurred during processing: {e}"
+        With routing, a run that fails (or stays silent past `ROUTING_FIRST_TOKEN_TIMEOUT`)
+        before any text was streamed is retried on the next candidate model.
+
+        With the response cache, a conversation answered before is replayed from the
+        cache (ending in a `RunSummary` with `cached=True`) and the agent does not run.
+        """
+        cache_key = self._response_key(chat_history)
+        if cache_key is not None:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                async with aclosing(self._replay(cached)) as events:
+                    async for event in events:
+                        yield event
+                return
+
+        prefetch = self._start_prefetch(chat_history)
+        try:
+            async with aclosing(self._stream_candidates(chat_history, cache_key)) as events:
+                async for event in events:
+                    yield event
+        except (asyncio.CancelledError, GeneratorExit):
+            # The run was stopped; prefetches for it would only load the MCP server
+            self._cancel_prefetch(prefetch)
+            raise
+
+    async def _stream_candidates(
+        self, chat_history: str | list[dict[str, str]], cache_key: Optional[str]
+    ) -> AsyncGenerator[AgentEvent, None]:
+        """Streams the request on each candidate model until one succeeds; see `stream_events`."""
+        candidates = self._candidate_models(chat_history)
+        for attempt, model_name in enumerate(candidates):
+            streamed_text = False
+            async with aclosing(self._stream_run(chat_history, model_name)) as events:
+                async for event in events:
+                    if isinstance(event, RunSummary):
+                        if self.router is not None:
+                            self.router.record(model_name, self._turn_latency(event), error=event.error is not None)
+                            if event.error and not streamed_text and attempt < len(candidates) - 1:
+                                logger.warning(
+                                    f"Model {model_name} failed ({event.error}); falling back to {candidates[attempt + 1]}."
+                                )
+                                break
+                        if cache_key is not None and event.final_output is not None:
+                            # The final turn's text, not the text of earlier (tool-calling) turns
+                            await self.response_cache.set(cache_key, self.mode, self.model_name, event.final_output)
+                        yield event
+                        return
+                    if isinstance(event, TextDelta):
+                        streamed_text = True
+                    yield event
+
+    async def _replay(self, text: str) -> AsyncGenerator[AgentEvent, None]:
+        """Streams a cached response as `TextDelta`s, paced like a live run."""
+        started = time.perf_counter()
+        first_token_at: Optional[float] = None
+        async with aclosing(replay_response(text)) as chunks:
+            async for chunk in chunks:
+                first_token_at = first_token_at or time.perf_counter()
+                yield TextDelta(text=chunk)
+
+        summary = RunSummary(
+            total_seconds=time.perf_counter() - started,
+            time_to_first_token=first_token_at - started if first_token_at is not None else None,
+            model_turns=0,
+            tool_calls=0,
+            model=self.model_name,
+            cached=True,
+            final_output=text,
+        )
+        logger.info(f"Replayed a cached response in {summary.total_seconds:.2f}s (model={self.model_name}, mode={self.mode})")
+        get_metrics().observe_run(summary)
+        yield summary
+
+    def _start_prefetch(self, chat_history: str | list[dict[str, str]]) -> list[asyncio.Task]:
+        if self.prefetcher is None:
+            return []
+        return self.prefetcher.start(self._docs_server, chat_history)
+
+    @staticmethod
+    def _cancel_prefetch(tasks: list[asyncio.Task]) -> None:
+        for task in tasks:
+            task.cancel()
+
+    @staticmethod
+    def _turn_latency(summary: RunSummary) -> Optional[float]:
+        """Average seconds the model spent per turn, excluding tool time."""
+        if not summary.model_turns:
+            return None
+        tool_seconds = sum(sum(times) for times in summary.tool_latency.values())
+        return max(0.0, summary.total_seconds - tool_seconds) / summary.model_turns
+
+    async def _stream_run(self, chat_history: str | list[dict[str, str]], model_name: str) -> AsyncGenerator[AgentEvent, None]:
+        """
+        Streams one run on `model_name`; see `stream_events`.
+
+        Closing the generator (or cancelling the task consuming it) cancels the run: the
+        in-flight model request and MCP tool calls are aborted and no further turns start.
+        """
+        config = self._get_run_config(model_name)
+        queue: asyncio.Queue = asyncio.Queue()
+        tracker = RunTracker(queue)
+
+        async def pump_events() -> None:
+            try:
+                result = Runner.run_streamed(
+                    starting_agent=self.agent,
+                    input=chat_history,
+                    max_turns=MAX_TURNS,
+                    hooks=tracker,
+                    run_config=config
+                )
+                async for event in result.stream_events():
+                    tracker.on_stream_event(event)
+                if result.final_output is not None:
+                    tracker.final_output = str(result.final_output)
+            except Exception as e:
+                tracker.error = e
+            finally:
+                queue.put_nowait(None)
+
+        # With routing, a model that produces nothing for too long is abandoned for a fallback
+        deadline = time.monotonic() + settings.ROUTING_FIRST_TOKEN_TIMEOUT if self.router is not None else None
+
+        pump = asyncio.create_task(pump_events())
+        cancelled = False
+        try:
+            while True:
+                if deadline is None:
+                    event = await queue.get()
+                else:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - time.monotonic()))
+                    except asyncio.TimeoutError:
+                        tracker.error = TimeoutError(
+                            f"No response from {model_name} within {settings.ROUTING_FIRST_TOKEN_TIMEOUT:.0f}s"
+                        )
+                        break
+                    if isinstance(event, (TextDelta, ToolCallStarted)):
+                        deadline = None  # The model is responding
+                if event is None:
+                    break
+                if isinstance(event, TurnCompleted):
+                    get_metrics().turn_seconds.observe(event.duration, model=model_name)
+                yield event
+        except (asyncio.CancelledError, GeneratorExit):
+            cancelled = True
+            raise
+        finally:
+            if not pump.done():
+                # The SDK cancels its run task (and with it the pending model request and
+                # tool calls) when the task iterating `stream_events()` is cancelled
+                pump.cancel()
+            if cancelled:
+                summary = tracker.summary()
+                summary.model = model_name
+                summary.cancelled = True
+                summary.aborted_tool_calls = tracker.running_tool_calls
+                self._log_summary(summary)
+                get_metrics().observe_run(summary)
+
+        summary = tracker.summary()
+        summary.model = model_name
+        self._log_summary(summary)
+        get_metrics().observe_run(summary)
+        yield summary
+
+    def _log_summary(self, summary: RunSummary) -> None:
+        if summary.cancelled:
+            logger.info(
+                f"Run cancelled after {summary.total_seconds:.2f}s (model={summary.model}): "
+                f"{summary.model_turns} model turn(s) and {summary.tool_calls - summary.aborted_tool_calls} tool call(s) "
+                f"completed, {summary.aborted_tool_calls} in-flight tool call(s) aborted, "
+                f"up to {max(0, MAX_TURNS - summary.model_turns)} remaining turn(s) skipped"
+            )
+            return
+        ttft = f"{summary.time_to_first_token:.2f}s" if summary.time_to_first_token is not None else "n/a"
+        tps = f"{summary.tokens_per_second:.1f}" if summary.tokens_per_second is not None else "n/a"
+        tools = ", ".join(
+            f"{name} x{len(times)} avg {sum(times) / len(times):.2f}s"
+            for name, times in summary.tool_latency.items()
+        ) or "none"
+        logger.info(
+            f"Run finished in {summary.total_seconds:.2f}s (model={summary.model}, ttft={ttft}, "
+            f"turns={summary.model_turns}, tokens in/out={summary.input_tokens}/{summary.output_tokens}, "
+            f"tokens/s={tps}, tools: {tools})"
+        )
 
     async def stream_agent(self, chat_history: str | list[dict[str, str]]) -> AsyncGenerator[str, None]:
         """
@@ -88,20 +463,41 @@ class AxiomAgent:
         Yields:
             String tokens of the agent's response.
         """ 
-        config = self._get_run_config()
+        async with aclosing(self.stream_events(chat_history)) as events:
+            async for event in events:
+                if isinstance(event, TextDelta):
+                    yield event.text
+                elif isinstance(event, RunSummary) and event.error:
+                    yield f"\n[Error during streaming: {event.error}]\n"
 
-        try:
-            result = Runner.run_streamed(
-                starting_agent=self.agent,
-                input=chat_history,
-                max_turns=20,
-                run_config=config
-            )
-            async for event in result.stream_events():
-                if (event.type == "raw_response_event" and 
-                    isinstance(event.data, ResponseTextDeltaEvent)):
-                    if token := event.data.delta:
-                        yield token
-        
-        except Exception as e:
-            yield f"\n[Error during streaming: {e}]\n"
\ No newline at end of file
+
+# (mode, model, ids of the MCP servers) -> agent; the agent keeps its servers alive,
+# so their ids are not reused while the entry exists
+_agents: dict[tuple[str, str, tuple[int, ...]], AxiomAgent] = {}
+
+
+def get_axiom_agent(
+    mode: str,
+    model: str,
+    prompt: str,
+    mcp_servers: Optional[list[MCPServer]] = None,
+) -> AxiomAgent:
+    """
+    Returns a process-wide `AxiomAgent` for the given mode, model and server set.
+
+    Agents hold no per-conversation state, so one instance can serve every message and
+    session that uses the same configuration. Agents are keyed on the server objects, not
+    their names, so servers started again (e.g. after a pool restart) get a new agent.
+    """
+    mcp_servers = mcp_servers or []
+    key = (mode, model, tuple(sorted(id(server) for server in mcp_servers)))
+    agent = _agents.get(key)
+    if agent is None:
+        agent = AxiomAgent(model=model, prompt=prompt, mcp_servers=mcp_servers, mode=mode)
+        _agents[key] = agent
+    return agent
+
+
+def clear_axiom_agents() -> None:
+    """Drops the shared agents, e.g. after their MCP servers were stopped."""
+    _agents.clear()
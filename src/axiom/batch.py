@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .agent import AxiomAgent
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+@dataclass
+class BatchReport:
+    """Aggregate results of a batch run."""
+    total: int = 0
+    skipped: int = 0
+    completed: int = 0
+    failed: int = 0
+    wall_seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Completed prompts per second."""
+        return self.completed / self.wall_seconds if self.wall_seconds else 0.0
+
+    def latency_percentiles(self) -> dict[str, Optional[float]]:
+        return {f"p{p}": percentile(self.latencies, p) for p in (50, 95, 99)}
+
+
+def load_prompts(input_path: Path) -> list[dict[str, Any]]:
+    """
+    Reads prompts from a JSONL file.
+
+    Each line is an object with either a `prompt` string or a `messages` list, and an
+    optional `id` (defaults to the line number).
+    """
+    prompts = []
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "prompt" not in record and "messages" not in record:
+                raise ValueError(f"Line {line_number}: expected a 'prompt' or 'messages' field.")
+            record.setdefault("id", str(line_number))
+            prompts.append(record)
+    return prompts
+
+
+def load_completed_ids(output_path: Path) -> set[str]:
+    """Returns ids that already have a successful result in `output_path`."""
+    if not output_path.is_file():
+        return set()
+    completed = set()
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A partially written last line from an interrupted run
+            if not record.get("error"):
+                completed.add(str(record["id"]))
+    return completed
+
+
+async def run_batch(
+    agent: AxiomAgent,
+    input_path: Path,
+    output_path: Path,
+    workers: int = 4,
+    resume: bool = False,
+    on_result: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> BatchReport:
+    """
+    Runs every prompt in `input_path` through `agent.run_with_summary` with bounded concurrency.
+
+    Results are appended to `output_path` as JSONL in completion order, one line per
+    prompt, so an interrupted run can be resumed with `resume=True` (prompts that
+    already have a successful result are skipped).
+
+    Args:
+        agent: The agent (and its started MCP servers) shared by all workers.
+        input_path: JSONL file of prompts (see `load_prompts`).
+        output_path: JSONL file the results are appended to.
+        workers: Maximum number of prompts running at once.
+        resume: Skip prompts that already have a successful result in `output_path`.
+        on_result: Optional callback invoked with each result record.
+
+    Returns:
+        Aggregate counts, throughput and latencies for this run.
+    """
+    prompts = load_prompts(input_path)
+    report = BatchReport(total=len(prompts))
+
+    if resume:
+        done = load_completed_ids(output_path)
+        pending = [p for p in prompts if str(p["id"]) not in done]
+        report.skipped = len(prompts) - len(pending)
+    else:
+        pending = prompts
+        output_path.unlink(missing_ok=True)
+
+    semaphore = asyncio.Semaphore(workers)
+    write_lock = asyncio.Lock()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, "a", encoding="utf-8") as output:
+
+        async def run_one(record: dict[str, Any]) -> None:
+            chat_input = record.get("messages") or [{"role": "user", "content": record["prompt"]}]
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    summary = await agent.run_with_summary(chat_input)
+                    final_output, error = summary.final_output, summary.error
+                except Exception as e:  # One failing prompt must not stop the batch
+                    logger.exception(f"Prompt '{record['id']}' failed.")
+                    final_output, error = None, f"{type(e).__name__}: {e}"
+                latency = time.perf_counter() - started
+
+            result = {"id": record["id"], "output": final_output, "error": error, "latency": round(latency, 3)}
+
+            async with write_lock:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                if error:
+                    report.failed += 1
+                else:
+                    report.completed += 1
+                    report.latencies.append(latency)
+            if on_result:
+                on_result(result)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(run_one(record) for record in pending))
+        report.wall_seconds = time.perf_counter() - started_at
+
+    return report
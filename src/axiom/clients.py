@@ -0,0 +1,71 @@
+import importlib.util
+import logging
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from .config import settings
+from .rate_limit import RateLimitedTransport, get_request_scheduler
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+# (api key, base URL) -> the client and the HTTP client it was created with
+_openai_clients: dict[tuple[str, str], tuple[AsyncOpenAI, httpx.AsyncClient]] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide HTTP client used for all model requests.
+
+    A single connection pool means keep-alive connections (and their TLS sessions) are
+    reused across messages and chat sessions. HTTP/2 is used when enabled and the `h2`
+    package is installed. With `RATE_LIMIT_ENABLED`, model requests are sent through the
+    process-wide `RequestScheduler`.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        http2 = settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        if settings.HTTP2_ENABLED and not http2:
+            logger.info("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1.")
+
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        if settings.RATE_LIMIT_ENABLED:
+            transport = RateLimitedTransport(transport, get_request_scheduler())
+        _http_client = DefaultAsyncHttpxClient(transport=transport)
+    return _http_client
+
+
+def get_openai_client(api_key: str, base_url: str) -> AsyncOpenAI:
+    """Returns a shared `AsyncOpenAI` client for the given credentials and endpoint."""
+    key = (api_key, base_url)
+    client, http_client = _openai_clients.get(key, (None, None))
+    if client is None or http_client.is_closed:
+        http_client = get_http_client()
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=http_client,
+            # Connection errors, timeouts and 5xx are retried by the SDK; throttled requests
+            # are retried by the rate-limited transport, which marks them final when it gives up
+            max_retries=2,
+        )
+        _openai_clients[key] = (client, http_client)
+    return client
+
+
+async def close_clients() -> None:
+    """Closes the shared HTTP connection pool. Call once at process shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _openai_clients.clear()
@@ -1,21 +1,20 @@
 import os
 import json
+import functools
 import logging
 from pathlib import Path
-from dotenv import load_dotenv
 
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any
 
-from dotenv import load_dotenv
 from pydantic import Field, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from agents.mcp import MCPServer, MCPServerStdio
+if TYPE_CHECKING:
+    # The agents SDK is slow to import; it is only loaded once servers are created
+    from agents.mcp import MCPServer
+    from .schema_cache import ToolSchemaCache
 
-_ = load_dotenv()
-
-# --- Setup Logging ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Entry points load `.env` into the environment and configure logging
 logger = logging.getLogger(__name__)
 
 # --- Determine Project Root ---
@@ -48,35 +47,183 @@ class Settings(BaseSettings):
         "gemini-2.5-flash-preview-04-17",
     ]
     
-    DEFAULT_AGENT_MODEL: str = os.getenv("DEFAULT_AGENT_MODEL", "gemini-2.5-flash-preview-04-17")
-    DEFAULT_ASSISTANT_MODEL: str = os.getenv("DEFAULT_ASSISTANT_MODEL", "gemini-2.0-flash")
+    DEFAULT_AGENT_MODEL: str = "gemini-2.5-flash-preview-04-17"
+    DEFAULT_ASSISTANT_MODEL: str = "gemini-2.0-flash"
+
+    # --- Model Routing (used when the model is "auto") ---
+    MODEL_TIERS: dict[str, int] = {  # Quality tier per routable model (1 simple, 2 standard, 3 complex)
+        "gemini-2.0-flash-lite": 1,
+        "gemini-2.0-flash": 2,
+        "gemini-2.5-flash-preview-04-17": 3,
+        "gemini-2.5-pro-exp-03-25": 3,
+    }
+    ROUTING_MIN_TIER: int = 1  # Raise to never route below this tier
+    ROUTING_MAX_ATTEMPTS: int = 2  # Models tried per request, including fallbacks
+    ROUTING_FIRST_TOKEN_TIMEOUT: float = 30.0  # Seconds a routed model may stay silent before falling back
+    ROUTING_RUN_TIMEOUT: float = 300.0  # Seconds for a whole non-streamed routed run
 
     # --- Agent Configuration ---
     AGENT_NAME: str = "Axiom 2.0"
     MAX_DOCS_TOKEN_LIMIT: int = 20000  # Maximum tokens to retrieve from the documentations
+
+    # --- Chat History ---
+    HISTORY_TOKEN_BUDGET: int = 32000  # Approximate tokens of history sent with each request
+    HISTORY_RECENT_TURNS: int = 4  # Most recent user turns that are always sent verbatim
+    HISTORY_SUMMARY_MODEL: str = ""  # Model that summarizes older turns (e.g. "gemini-2.0-flash-lite"); empty uses extractive summaries only
+    HISTORY_SUMMARY_MAX_TOKENS: int = 400
+
+    # --- Session Store (Chainlit chat histories) ---
+    SESSION_STORE_PATH: Optional[Path] = Field(default=PROJECT_ROOT / ".cache" / "sessions.sqlite3")  # None keeps histories in memory only
+    SESSION_LOAD_MESSAGES: int = 40  # Most recent messages loaded and kept in memory per session
+    SESSION_IDLE_SECONDS: int = 15 * 60  # Idle sessions are evicted from memory after this
+    SESSION_MAX_IN_MEMORY: int = 1000
+    SESSION_RETENTION_DAYS: float = 30  # Sessions without a message for this long are deleted from the store (0 keeps them forever)
     
+    # --- Streaming ---
+    STREAM_COALESCE_MAX_CHARS: int = 256  # Flush streamed UI chunks at this size...
+    STREAM_COALESCE_MAX_DELAY_MS: int = 50  # ...or after this delay (0 disables coalescing)
+
+    # --- HTTP Connection Pool (shared by all model requests) ---
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept open
+    HTTP2_ENABLED: bool = True  # Only used when the `h2` package is installed
+
+    # --- Model Rate Limiting (shared by all sessions) ---
+    RATE_LIMIT_ENABLED: bool = False  # Enable after setting MODEL_RATE_LIMITS to your Gemini quota tier
+    MODEL_RATE_LIMITS: dict[str, int] = {}  # Requests per minute per model, e.g. {"gemini-2.0-flash": 15} on the free tier
+    DEFAULT_RATE_LIMIT_RPM: int = 1000  # For models not listed above
+    RATE_LIMIT_BURST: int = 5  # Requests that may be sent back to back before the rate applies
+    RATE_LIMIT_MAX_RETRIES: int = 5  # Retries of throttled (429/503) requests
+    RATE_LIMIT_BACKOFF_BASE: float = 1.0  # Seconds; doubled on each retry, with full jitter
+    RATE_LIMIT_BACKOFF_MAX: float = 60.0
+
     # --- Tracing ---
     TRACING_ENABLED: bool = False
 
+    # --- Metrics ---
+    METRICS_ENABLED: bool = False  # Serve Prometheus metrics on METRICS_HOST:METRICS_PORT/metrics (Chainlit app)
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9464
+    METRICS_PROFILER_ENABLED: bool = False  # Also serve /debug/profile?seconds=N (sampling profiler, collapsed stacks)
+    PROFILER_SAMPLE_INTERVAL: float = 0.005  # Seconds between stack samples
+    EVENT_LOOP_LAG_INTERVAL: float = 0.5  # Seconds between event loop lag measurements
+
     # --- MCP Configuration ---
     MCP_CONFIG_PATH: Path = Field(default=PROJECT_ROOT / "mcp.json")
 
-# --- Instantiate Settings ---
-try:
-    settings = Settings()
-    if not settings.GOOGLE_API_KEY:
-        logger.warning("GOOGLE_API_KEY is not set. OpenAI client initialization might fail.")
-except ValidationError as e:
-    logger.error(f"Configuration validation failed: {e}")
-    raise SystemExit(f"Configuration error: {e}") from e
+    # --- MCP Server Pool ---
+    MCP_POOL_SIZES: dict[str, int] = {}  # Started instances per server name (defaults to 1)
+    MCP_MAX_CONCURRENT_CALLS: int = 8  # Maximum in-flight tool calls per server instance
+    MCP_STARTUP_TIMEOUT: float = 60.0  # Seconds to wait for each MCP server to become ready
+    MCP_SCHEMA_CACHE_PATH: Optional[Path] = Field(default=PROJECT_ROOT / ".cache" / "mcp_tools.json")  # None disables warm startup
+
+    # --- MCP Server Supervision ---
+    MCP_SUPERVISION_ENABLED: bool = True  # Health-check, restart and reap MCP server processes
+    MCP_HEALTH_CHECK_INTERVAL: float = 30.0  # Seconds between health pings
+    MCP_HEALTH_CHECK_TIMEOUT: float = 10.0  # Seconds a ping may take before the server is restarted
+    MCP_IDLE_TIMEOUT: float = 0.0  # Seconds without tool calls before a server is stopped (0, the default, keeps it running)
+    MCP_RESTART_BACKOFF_BASE: float = 1.0  # Seconds; doubled after each consecutive failed restart
+    MCP_RESTART_BACKOFF_MAX: float = 60.0
+    MCP_WARM_SPARES: list[str] = []  # Servers that keep a started spare instance for instant failover
+
+    # --- Tool Call Coalescing ---
+    SINGLE_FLIGHT_ENABLED: bool = True  # Share one MCP call between concurrent identical tool calls
+
+    # --- Tool Result Cache ---
+    TOOL_CACHE_ENABLED: bool = True
+    TOOL_CACHE_PATH: Optional[Path] = Field(default=PROJECT_ROOT / ".cache" / "tool_cache.sqlite3")  # None keeps the cache in memory only
+    TOOL_CACHE_TTLS: dict[str, int] = {  # Seconds to keep results per tool; tools not listed are never cached
+        "resolve-library-id": 24 * 60 * 60,
+        "get-library-docs": 6 * 60 * 60,
+    }
+    TOOL_CACHE_EMPTY_RESULT_TTL: int = 5 * 60  # Seconds to keep empty or "not found" results, which are often transient
+    TOOL_CACHE_MAX_MEMORY_ENTRIES: int = 256
+    TOOL_CACHE_MAX_DISK_MB: int = 256
 
+    # --- Response Cache (whole answers to repeated conversations) ---
+    RESPONSE_CACHE_ENABLED: bool = False  # Replay answers to starters and repeated questions instead of re-running the agent
+    RESPONSE_CACHE_PATH: Path = PROJECT_ROOT / ".cache" / "response_cache.sqlite3"
+    RESPONSE_CACHE_TTL: int = 24 * 60 * 60  # Seconds an answer is reused; web search results go stale
+    RESPONSE_CACHE_MAX_DISK_MB: int = 64
+    RESPONSE_CACHE_REPLAY_CHARS_PER_SECOND: int = 2000  # Pace of replayed answers (0 sends them at once)
 
-# --- MCP Server Loading Function ---
-def load_mcp_servers_from_config(config_path: Path = settings.MCP_CONFIG_PATH) -> List[MCPServer]:
+    # --- Documentation Index (local `search-docs` tool) ---
+    DOC_INDEX_ENABLED: bool = True  # Index fetched docs and give agents with context7 a `search-docs` tool
+    DOC_INDEX_PATH: Optional[Path] = Field(default=PROJECT_ROOT / ".cache" / "doc_index.sqlite3")  # None keeps the index in memory only
+    DOC_INDEX_MAX_CHUNKS: int = 10000  # Chunks kept in memory and on disk (up to ~2000 characters each); least recently used are evicted
+
+    # --- Tool Output Compaction (within a run) ---
+    TOOL_OUTPUT_COMPACTION_ENABLED: bool = True
+    TOOL_OUTPUT_COMPACT_CHARS: int = 4000  # Outputs longer than this are truncated once the model has read them
+    TOOL_OUTPUT_EXCERPT_CHARS: int = 1000  # Characters of a truncated output that stay in the input
+
+    # --- Documentation Prefetch ---
+    PREFETCH_ENABLED: bool = False  # Resolve library IDs for libraries named in the message before the model asks
+    PREFETCH_MAX_LIBRARIES: int = 3  # Libraries prefetched per message
+
+    # --- Documentation Fan-out (`fetch-docs` tool) ---
+    DOCS_FANOUT_ENABLED: bool = True  # Give agents with context7 a tool that fetches docs for several libraries at once
+    DOCS_FANOUT_MAX_LIBRARIES: int = 5  # Libraries fetched per call; MAX_DOCS_TOKEN_LIMIT is shared between them
+
+# --- Instantiate Settings (on first use) ---
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """
+    Returns the settings, loading and validating them on first use.
+
+    Loading is deferred so importing this module is cheap and does not read the
+    environment before an entry point has set it up.
+    """
+    global _settings
+    if _settings is None:
+        try:
+            _settings = Settings()
+        except ValidationError as e:
+            logger.error(f"Configuration validation failed: {e}")
+            raise SystemExit(f"Configuration error: {e}") from e
+        if not _settings.GOOGLE_API_KEY:
+            logger.warning("GOOGLE_API_KEY is not set. OpenAI client initialization might fail.")
+    return _settings
+
+
+class _LazySettings:
+    """Stands in for the `Settings` instance and loads it on first attribute access."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
+
+
+# --- MCP Server Loading Functions ---
+def _create_mcp_server(name: str, params: Dict[str, Any], schema_cache: Optional["ToolSchemaCache"]) -> "MCPServer":
+    from agents.mcp import MCPServerStdio
+
+    server_instance = MCPServerStdio(name=name, params=params)
+    if schema_cache is not None:
+        server_instance = schema_cache.wrap(server_instance, params)
+    return server_instance
+
+
+def load_mcp_server_factories(
+    config_path: Optional[Path] = None,
+    schema_cache: Optional["ToolSchemaCache"] = None,
+) -> Dict[str, Callable[[], "MCPServer"]]:
     """
     Loads MCP server configurations from the specified JSON file.
+
+    Returns:
+        A factory per server name; each call returns a new, not yet started instance.
     """
-    servers: List[MCPServer] = []
+    config_path = config_path or settings.MCP_CONFIG_PATH
+    factories: Dict[str, Callable[[], "MCPServer"]] = {}
     
     # Raise FileNotFoundError if file doesn't exist
     if not config_path.is_file():
@@ -108,17 +255,36 @@ def load_mcp_servers_from_config(config_path: Path = settings.MCP_CONFIG_PATH) -
 
             server_config = MCPServerConfig(**config_dict) 
             
-            server_instance = MCPServerStdio(
-                    name=name,
-                    params={
-                        "command": server_config.command,
-                        "args": server_config.args,
-                        "env": server_env
-                    }
-                )
-            servers.append(server_instance)
+            params = {
+                "command": server_config.command,
+                "args": server_config.args,
+                "env": server_env
+            }
+            factories[name] = functools.partial(_create_mcp_server, name, params, schema_cache)
 
         except (ValidationError, Exception) as e:
             logger.warning(f"Skipping MCP server '{name}' due to configuration error: {e}")
 
-    return servers
\ No newline at end of file
+    return factories
+
+
+def load_mcp_servers_from_config(
+    config_path: Optional[Path] = None,
+    pool_sizes: Optional[Dict[str, int]] = None,
+    schema_cache: Optional["ToolSchemaCache"] = None,
+) -> List["MCPServer"]:
+    """
+    Loads MCP server configurations from the specified JSON file.
+
+    If `pool_sizes` is given, that many instances are created for each named server
+    (servers missing from the mapping get one instance). Instances share the same name.
+
+    With a `schema_cache`, each server is wrapped so its tool list is available (from
+    the cache) before it has started, and tool calls wait until it is ready.
+    """
+    factories = load_mcp_server_factories(config_path, schema_cache)
+    return [
+        factory()
+        for name, factory in factories.items()
+        for _ in range(max(1, (pool_sizes or {}).get(name, 1)))
+    ]
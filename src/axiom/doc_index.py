@@ -0,0 +1,331 @@
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from mcp.types import CallToolResult, TextContent
+
+from agents import function_tool
+from agents.mcp import MCPServer
+
+from .config import settings
+from .mcp_proxy import MCPServerProxy
+
+logger = logging.getLogger(__name__)
+
+DOCS_TOOL_NAME = "get-library-docs"
+LIBRARY_ID_ARGUMENT = "context7CompatibleLibraryID"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+_SEPARATOR_PATTERN = re.compile(r"^-{10,}\s*$", re.MULTILINE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or the this to use using what when with you".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercases and splits text into terms, splitting camelCase and dotted names too."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def chunk_docs(text: str, max_chars: int = 2000) -> list[str]:
+    """
+    Splits a documentation dump into chunks.
+
+    context7 separates snippets with lines of dashes; those are used as chunk
+    boundaries. Longer sections are split further at blank lines (never inside a code
+    fence) so each chunk stays under about `max_chars`.
+    """
+    chunks = []
+    for section in _SEPARATOR_PATTERN.split(text):
+        section = section.strip()
+        if not section:
+            continue
+        if len(section) <= max_chars:
+            chunks.append(section)
+            continue
+
+        current: list[str] = []
+        size = 0
+        in_fence = False
+        for line in section.splitlines(keepends=True):
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+            current.append(line)
+            size += len(line)
+            if size >= max_chars and not in_fence and not line.strip():
+                chunks.append("".join(current).strip())
+                current, size = [], 0
+        if current and "".join(current).strip():
+            chunks.append("".join(current).strip())
+    return chunks
+
+
+@dataclass
+class _Chunk:
+    library: str
+    text: str
+    term_counts: Counter
+    length: int
+
+
+class DocIndex:
+    """
+    BM25 index over documentation chunks, grouped by library ID.
+
+    Library IDs include the version when context7 provides one (e.g.
+    `/vercel/next.js/v14.3.0`), so versions are indexed separately. Chunks are
+    deduplicated by content and persisted to an optional SQLite file; the in-memory
+    index is rebuilt from the most recently used stored chunks on first use.
+
+    Both the index and the file hold at most `max_chunks` chunks; beyond that, the
+    least recently added or searched-up chunks are evicted.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_chunks: int = 10000, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.max_chunks = max_chunks
+        self.k1 = k1
+        self.b = b
+
+        self._chunks: OrderedDict[str, _Chunk] = OrderedDict()  # By content hash, least recently used first
+        self._by_library: dict[str, set[str]] = defaultdict(set)
+        self._postings: dict[str, dict[str, set[str]]] = defaultdict(lambda: defaultdict(set))  # library -> term -> hashes
+        self._total_length: dict[str, int] = defaultdict(int)
+        self.evictions = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._loaded = path is None
+        self._load_lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS doc_chunks (
+                    hash TEXT PRIMARY KEY,
+                    library TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL DEFAULT 0
+                )"""
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(doc_chunks)")}
+            if "accessed_at" not in columns:  # Files written before eviction was added
+                self._conn.execute("ALTER TABLE doc_chunks ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_doc_chunks_accessed ON doc_chunks(accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def libraries(self) -> list[str]:
+        return sorted(self._by_library)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def _add_chunk(self, library: str, text: str, digest: str) -> bool:
+        if digest in self._chunks:
+            self._chunks.move_to_end(digest)
+            return False
+        terms = tokenize(text)
+        chunk = _Chunk(library=library, text=text, term_counts=Counter(terms), length=len(terms))
+        self._chunks[digest] = chunk
+        self._by_library[library].add(digest)
+        self._total_length[library] += chunk.length
+        for term in chunk.term_counts:
+            self._postings[library][term].add(digest)
+        while len(self._chunks) > self.max_chunks:
+            self._remove_chunk(next(iter(self._chunks)))
+            self.evictions += 1
+        return True
+
+    def _remove_chunk(self, digest: str) -> None:
+        chunk = self._chunks.pop(digest)
+        library = chunk.library
+        postings = self._postings[library]
+        for term in chunk.term_counts:
+            postings[term].discard(digest)
+            if not postings[term]:
+                del postings[term]
+        self._by_library[library].discard(digest)
+        self._total_length[library] -= chunk.length
+        if not self._by_library[library]:
+            del self._by_library[library], self._postings[library], self._total_length[library]
+
+    def _load_db(self) -> list[tuple[str, str, str]]:
+        with self._db_lock:
+            rows = self._connect().execute(
+                "SELECT hash, library, text FROM doc_chunks ORDER BY accessed_at DESC LIMIT ?", (self.max_chunks,)
+            ).fetchall()
+        return rows[::-1]  # Least recently used first, so the in-memory order matches
+
+    def _save_db(self, rows: list[tuple[str, str, str]]) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO doc_chunks (hash, library, text, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                [(digest, library, text, now, now) for digest, library, text in rows],
+            )
+            conn.execute(
+                "DELETE FROM doc_chunks WHERE hash IN "
+                "(SELECT hash FROM doc_chunks ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_chunks,),
+            )
+            conn.commit()
+
+    def _touch_db(self, digests: list[str]) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            conn.executemany("UPDATE doc_chunks SET accessed_at = ? WHERE hash = ?", [(time.time(), d) for d in digests])
+            conn.commit()
+
+    async def load(self) -> None:
+        """Loads persisted chunks into memory. No-op after the first call."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                rows = await asyncio.to_thread(self._load_db)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not load the documentation index: {e}")
+                return
+            for digest, library, text in rows:
+                self._add_chunk(library, text, digest)
+            logger.debug(f"Loaded {len(rows)} documentation chunks from {self.path}")
+
+    async def add(self, library: str, text: str) -> int:
+        """
+        Chunks and indexes a documentation dump for `library`.
+
+        Returns:
+            The number of new chunks (already indexed chunks are skipped).
+        """
+        await self.load()
+        new_rows = []
+        for chunk in chunk_docs(text):
+            digest = hashlib.sha256(f"{library}\n{chunk}".encode("utf-8")).hexdigest()
+            if self._add_chunk(library, chunk, digest):
+                new_rows.append((digest, library, chunk))
+
+        if new_rows and self.path is not None:
+            try:
+                await asyncio.to_thread(self._save_db, new_rows)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist documentation chunks: {e}")
+        return len(new_rows)
+
+    def _search_library(self, library: str, terms: list[str]) -> list[tuple[float, str]]:
+        digests = self._by_library[library]
+        n = len(digests)
+        average_length = self._total_length[library] / n if n else 0
+        scores: dict[str, float] = defaultdict(float)
+        for term in set(terms):
+            postings = self._postings[library].get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for digest in postings:
+                chunk = self._chunks[digest]
+                tf = chunk.term_counts[term]
+                norm = self.k1 * (1 - self.b + self.b * chunk.length / average_length) if average_length else self.k1
+                scores[digest] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return [(score, digest) for digest, score in scores.items()]
+
+    async def search(self, query: str, library: Optional[str] = None, top_k: int = 5) -> list[tuple[str, str, float]]:
+        """
+        Returns the `top_k` chunks most relevant to `query` as (library, text, score).
+
+        Args:
+            query: Free-text query.
+            library: Restrict the search to libraries whose ID starts with this value
+                (so `/vercel/next.js` matches every indexed version).
+            top_k: Maximum number of chunks to return.
+        """
+        await self.load()
+        terms = tokenize(query)
+        if not terms:
+            return []
+        prefix = library.rstrip("/") if library else None
+        libraries = [lib for lib in self._by_library if prefix is None or lib == prefix or lib.startswith(prefix + "/")]
+        scored = [hit for lib in libraries for hit in self._search_library(lib, terms)]
+        scored.sort(reverse=True)
+        hits = scored[:top_k]
+        results = [(self._chunks[d].library, self._chunks[d].text, score) for score, d in hits]
+
+        # Chunks that answer searches are kept over ones nobody looks at
+        for _, digest in hits:
+            self._chunks.move_to_end(digest)
+        if hits and self.path is not None:
+            try:
+                await asyncio.to_thread(self._touch_db, [d for _, d in hits])
+            except sqlite3.Error as e:
+                logger.warning(f"Could not update documentation chunk access times: {e}")
+        return results
+
+
+class IndexingMCPServer(MCPServerProxy):
+    """
+    MCP server wrapper that indexes every documentation result it returns.
+
+    Wrap it inside the tool result cache, so cached results are not chunked and indexed again.
+    """
+
+    def __init__(self, server: MCPServer, index: DocIndex):
+        super().__init__(server)
+        self.index = index
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        result = await self.server.call_tool(tool_name, arguments)
+        library = (arguments or {}).get(LIBRARY_ID_ARGUMENT)
+        if tool_name == DOCS_TOOL_NAME and library and not result.isError:
+            text = "\n".join(item.text for item in result.content if isinstance(item, TextContent))
+            try:
+                added = await self.index.add(library, text)
+                logger.debug(f"Indexed {added} new documentation chunks for {library}")
+            except Exception as e:
+                logger.warning(f"Failed to index documentation for {library}: {e}")
+        return result
+
+
+_doc_index: Optional[DocIndex] = None
+
+
+def get_doc_index() -> DocIndex:
+    """Returns the process-wide documentation index configured from settings."""
+    global _doc_index
+    if _doc_index is None:
+        _doc_index = DocIndex(path=settings.DOC_INDEX_PATH, max_chunks=settings.DOC_INDEX_MAX_CHUNKS)
+    return _doc_index
+
+
+@function_tool(name_override="search-docs")
+async def search_docs(query: str, library_id: Optional[str], top_k: int) -> str:
+    """
+    Searches documentation already fetched with get-library-docs and returns only the most relevant snippets.
+    Use it before fetching docs again for a library that was fetched earlier.
+
+    Args:
+        query: What to look for, e.g. "streaming responses with tool calls".
+        library_id: Context7-compatible library ID to search (e.g. "/vercel/next.js"), or null to search every indexed library.
+        top_k: Number of snippets to return (1-10).
+    """
+    index = get_doc_index()
+    hits = await index.search(query, library=library_id, top_k=max(1, min(top_k, 10)))
+    if not hits:
+        indexed = ", ".join(index.libraries()) or "none"
+        return f"No indexed documentation matches this query. Indexed libraries: {indexed}. Use get-library-docs instead."
+    return "\n\n----------------------------------------\n\n".join(f"[{library}]\n{text}" for library, text, _ in hits)
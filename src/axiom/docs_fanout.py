@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from typing import Optional
+
+from agents import FunctionTool, function_tool
+from agents.mcp import MCPServer
+
+from .config import settings
+from .prefetch import DOCS_TOOL_NAME, RESOLVE_TOOL_NAME, parse_library_ids, result_text
+
+logger = logging.getLogger(__name__)
+
+FETCH_DOCS_TOOL_NAME = "fetch-docs"
+
+_SECTION_SEPARATOR = "\n\n----------------------------------------\n\n"
+
+
+def _truncate(text: str, tokens: int) -> str:
+    """Cuts `text` to about `tokens` tokens (4 characters each), at a line boundary if possible."""
+    max_chars = tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    cut = cut.rsplit("\n", 1)[0] if "\n" in cut else cut
+    return f"{cut}\n[... truncated to fit the token budget]"
+
+
+async def _resolve(server: MCPServer, library: str) -> str:
+    if library.startswith("/"):
+        return library  # Already a Context7-compatible ID
+    result = await server.call_tool(RESOLVE_TOOL_NAME, {"libraryName": library})
+    text = result_text(result)
+    if result.isError:
+        raise RuntimeError(text or f"{RESOLVE_TOOL_NAME} failed")
+    library_ids = parse_library_ids(text)
+    if not library_ids:
+        raise LookupError("no matching Context7 library ID")
+    return library_ids[0]
+
+
+async def _fetch(server: MCPServer, library: str, topic: str, tokens: int) -> tuple[str, str]:
+    library_id = await _resolve(server, library)
+    arguments = {"context7CompatibleLibraryID": library_id, "tokens": tokens}
+    if topic:
+        arguments["topic"] = topic
+    result = await server.call_tool(DOCS_TOOL_NAME, arguments)
+    text = result_text(result)
+    if result.isError:
+        raise RuntimeError(text or f"{DOCS_TOOL_NAME} failed")
+    return library_id, text
+
+
+async def fetch_docs_concurrently(
+    server: MCPServer,
+    libraries: list[str],
+    topics: Optional[list[str]] = None,
+    tokens: Optional[int] = None,
+) -> str:
+    """
+    Resolves and fetches docs for several libraries at once and merges the results.
+
+    The token budget (capped at `MAX_DOCS_TOKEN_LIMIT`) is split evenly between the
+    libraries, and each library's docs are truncated to its share. A library that cannot
+    be resolved or fetched gets a short error note instead of failing the whole call.
+
+    Args:
+        server: The (wrapped) context7 server, so calls share its cache and coalescing.
+        libraries: Library names or Context7-compatible IDs.
+        topics: Focus topic per library, in the same order ("" for none).
+        tokens: Total token budget. Defaults to `MAX_DOCS_TOKEN_LIMIT`.
+    """
+    topics = list(topics or [])
+    requests = []
+    for i, library in enumerate(libraries):
+        library = library.strip()
+        if library and library.lower() not in (name.lower() for name, _ in requests):
+            requests.append((library, topics[i].strip() if i < len(topics) else ""))
+    requests = requests[:settings.DOCS_FANOUT_MAX_LIBRARIES]
+    if not requests:
+        return "No libraries given."
+
+    budget = min(tokens or settings.MAX_DOCS_TOKEN_LIMIT, settings.MAX_DOCS_TOKEN_LIMIT)
+    per_library = max(1, budget // len(requests))
+    results = await asyncio.gather(
+        *(_fetch(server, library, topic, per_library) for library, topic in requests),
+        return_exceptions=True,
+    )
+
+    sections = []
+    for (library, topic), result in zip(requests, results):
+        if isinstance(result, BaseException):
+            logger.debug(f"Fetching docs for '{library}' failed: {result!r}")
+            sections.append(f"[{library}]\nCould not fetch docs: {result}")
+            continue
+        library_id, text = result
+        header = f"[{library_id}, topic: {topic}]" if topic else f"[{library_id}]"
+        sections.append(f"{header}\n{_truncate(text, per_library)}")
+    return _SECTION_SEPARATOR.join(sections)
+
+
+def make_fetch_docs_tool(server: MCPServer) -> FunctionTool:
+    """Creates the `fetch-docs` tool for an agent, bound to its context7 server."""
+
+    @function_tool(name_override=FETCH_DOCS_TOOL_NAME)
+    async def fetch_docs(libraries: list[str], topics: list[str], tokens: int) -> str:
+        """
+        Resolves library IDs and fetches docs for several libraries at once, e.g. for a project using FastAPI, JWT and SQLAlchemy.
+        Use it instead of calling resolve-library-id and get-library-docs once per library.
+
+        Args:
+            libraries: Library names (e.g. "fastapi") or Context7-compatible library IDs (e.g. "/tiangolo/fastapi").
+            topics: Topic to focus on for each library, in the same order (use "" for no topic), e.g. ["authentication", ""].
+            tokens: Total tokens of documentation to return, shared between the libraries.
+        """
+        return await fetch_docs_concurrently(server, libraries, topics, tokens)
+
+    return fetch_docs
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional, Union
+
+from openai.types.responses import (
+    ResponseCompletedEvent,
+    ResponseCreatedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputItemDoneEvent,
+    ResponseTextDeltaEvent,
+)
+
+from agents import Agent, RunContextWrapper, RunHooks, Tool
+from agents.stream_events import StreamEvent
+
+
+@dataclass
+class TextDelta:
+    """A piece of the agent's response text."""
+    text: str
+    type: Literal["text_delta"] = "text_delta"
+
+
+@dataclass
+class TurnStarted:
+    """The model started streaming a new turn."""
+    turn: int
+    type: Literal["turn_started"] = "turn_started"
+
+
+@dataclass
+class TurnCompleted:
+    """The model finished a turn (its text and/or tool calls are complete)."""
+    turn: int
+    duration: float
+    input_tokens: int
+    output_tokens: int
+    type: Literal["turn_completed"] = "turn_completed"
+
+
+@dataclass
+class ToolCallStarted:
+    """A tool started running."""
+    tool_name: str
+    arguments: str
+    call_id: Optional[str] = None
+    type: Literal["tool_call_started"] = "tool_call_started"
+
+
+@dataclass
+class ToolCallCompleted:
+    """A tool finished running."""
+    tool_name: str
+    arguments: str
+    duration: float
+    output_chars: int
+    call_id: Optional[str] = None
+    type: Literal["tool_call_completed"] = "tool_call_completed"
+
+
+@dataclass
+class RunSummary:
+    """Latency and usage metrics for a whole run. Always the last event of a stream."""
+    total_seconds: float
+    time_to_first_token: Optional[float]
+    model_turns: int
+    tool_calls: int
+    tool_latency: dict[str, list[float]] = field(default_factory=dict)  # Seconds per call, by tool
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tokens_per_second: Optional[float] = None
+    error: Optional[str] = None
+    model: Optional[str] = None  # Model that produced the run
+    cancelled: bool = False  # The consumer stopped the run before it finished
+    aborted_tool_calls: int = 0  # Tool calls still running when the run was cancelled
+    cached: bool = False  # Replayed from the response cache instead of running the agent
+    final_output: Optional[str] = None  # The final response; None if the run failed or was cancelled
+    type: Literal["run_summary"] = "run_summary"
+
+
+AgentEvent = Union[TextDelta, TurnStarted, TurnCompleted, ToolCallStarted, ToolCallCompleted, RunSummary]
+
+
+class RunTracker(RunHooks[Any]):
+    """
+    Turns a streamed agent run into typed `AgentEvent`s and collects run metrics.
+
+    Text and turn boundaries come from the raw model stream (`on_stream_event`); tool
+    start and end come from the run hooks, which fire while the tool is running. Tool
+    arguments are taken from the tool calls the model emitted for the current turn.
+    """
+
+    def __init__(self, queue: asyncio.Queue):
+        self._queue = queue
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.model_turns = 0
+        self.tool_calls = 0
+        self.tool_latency: dict[str, list[float]] = defaultdict(list)
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.streamed_chars = 0
+        self.error: Optional[BaseException] = None
+        self.final_output: Optional[str] = None
+
+        self._turn_started_at = self.started_at
+        self._called: dict[str, deque[ResponseFunctionToolCall]] = defaultdict(deque)
+        self._running: dict[str, deque[tuple[Optional[ResponseFunctionToolCall], float]]] = defaultdict(deque)
+
+    def _emit(self, event: AgentEvent) -> None:
+        self._queue.put_nowait(event)
+
+    def on_stream_event(self, event: StreamEvent) -> None:
+        """Handles an event from `RunResultStreaming.stream_events()`."""
+        if event.type != "raw_response_event":
+            return
+        data = event.data
+
+        if isinstance(data, ResponseCreatedEvent):
+            self.model_turns += 1
+            self._emit(TurnStarted(turn=self.model_turns))
+
+        elif isinstance(data, ResponseTextDeltaEvent):
+            if data.delta:
+                if self.first_token_at is None:
+                    self.first_token_at = time.perf_counter()
+                self.streamed_chars += len(data.delta)
+                self._emit(TextDelta(text=data.delta))
+
+        elif isinstance(data, ResponseOutputItemDoneEvent):
+            if isinstance(data.item, ResponseFunctionToolCall):
+                self._called[data.item.name].append(data.item)
+
+        elif isinstance(data, ResponseCompletedEvent):
+            usage = data.response.usage
+            input_tokens = usage.input_tokens if usage else 0
+            output_tokens = usage.output_tokens if usage else 0
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            now = time.perf_counter()
+            self._emit(TurnCompleted(
+                turn=self.model_turns,
+                duration=now - self._turn_started_at,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            ))
+            self._turn_started_at = now
+
+    async def on_tool_start(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool) -> None:
+        call = self._called[tool.name].popleft() if self._called[tool.name] else None
+        self._running[tool.name].append((call, time.perf_counter()))
+        self.tool_calls += 1
+        self._emit(ToolCallStarted(
+            tool_name=tool.name,
+            arguments=call.arguments if call else "",
+            call_id=call.call_id if call else None,
+        ))
+
+    async def on_tool_end(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool, result: str) -> None:
+        if not self._running[tool.name]:
+            return
+        call, started_at = self._running[tool.name].popleft()
+        now = time.perf_counter()
+        self.tool_latency[tool.name].append(now - started_at)
+        # The next model turn starts once the tools are done
+        self._turn_started_at = now
+        self._emit(ToolCallCompleted(
+            tool_name=tool.name,
+            arguments=call.arguments if call else "",
+            duration=now - started_at,
+            output_chars=len(str(result)),
+            call_id=call.call_id if call else None,
+        ))
+
+    @property
+    def running_tool_calls(self) -> int:
+        return sum(len(calls) for calls in self._running.values())
+
+    def summary(self) -> RunSummary:
+        """Builds the metrics summary for the run so far."""
+        now = time.perf_counter()
+        ttft = self.first_token_at - self.started_at if self.first_token_at else None
+
+        # Fall back to a character-based estimate when the endpoint reports no usage
+        output_tokens = self.output_tokens or self.streamed_chars // 4
+        generation_seconds = now - self.first_token_at if self.first_token_at else 0
+        tokens_per_second = output_tokens / generation_seconds if generation_seconds > 0 else None
+
+        return RunSummary(
+            total_seconds=now - self.started_at,
+            time_to_first_token=ttft,
+            model_turns=self.model_turns,
+            tool_calls=self.tool_calls,
+            tool_latency=dict(self.tool_latency),
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            tokens_per_second=tokens_per_second,
+            error=str(self.error) if self.error else None,
+            final_output=self.final_output,
+        )
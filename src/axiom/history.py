@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterator, Optional
+
+from .clients import get_openai_client
+from .config import settings
+
+if TYPE_CHECKING:
+    from .session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+Message = dict[str, str]
+Summarizer = Callable[[list[Message]], Awaitable[str]]
+
+SUMMARY_PREFIX = "[Summary of earlier conversation]"
+
+_SUMMARY_INSTRUCTIONS = (
+    "Summarize this part of a conversation between a user and an AI development assistant. "
+    "Keep the user's goals, decisions, library names and versions, file names and open questions. "
+    "Do not include code unless a short snippet is essential. Be concise."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about 4 characters per token) used for budgeting."""
+    return len(text) // 4 + 1
+
+
+def _excerpt(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _extractive_text(messages: list[Message]) -> str:
+    lines = []
+    for message in messages:
+        limit = 300 if message["role"] == "user" else 600
+        lines.append(f"{message['role']}: {_excerpt(message['content'], limit)}")
+    return "\n".join(lines)
+
+
+async def extractive_summary(messages: list[Message]) -> str:
+    """Summarizes a turn by keeping the start of each message. Never calls the model."""
+    return _extractive_text(messages)
+
+
+async def model_summary(messages: list[Message]) -> str:
+    """Summarizes a turn with `settings.HISTORY_SUMMARY_MODEL`."""
+    client = get_openai_client(settings.GOOGLE_API_KEY, settings.BASE_URL)
+    transcript = "\n\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+    response = await client.chat.completions.create(
+        model=settings.HISTORY_SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": _SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": transcript},
+        ],
+        max_tokens=settings.HISTORY_SUMMARY_MAX_TOKENS,
+    )
+    return (response.choices[0].message.content or "").strip()
+
+
+class ChatHistory:
+    """
+    Chat history that keeps the prompt within a token budget.
+
+    Token counts are computed once per message as it is appended. When the history
+    exceeds `token_budget`, the most recent `recent_turns` user turns (at least the
+    current one) are sent verbatim and older turns are replaced by per-turn summaries,
+    sent as one system message. Summaries are cached by content, so each turn is
+    summarized at most once however long the session runs. Model summaries are made in
+    the background, one turn at a time; until a turn's summary is ready, its extractive
+    summary is sent instead, so summarization never delays a request.
+
+    With a `store`, messages are persisted as they are appended, only the most recent
+    `max_loaded_messages` are loaded (lazily, on first use) and kept in memory. Whole turns
+    are dropped from the front of that window and their summaries are kept, so older
+    context is still summarized into the prompt. A history
+    reloaded from the store starts at its window; turns before it are not summarized.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        recent_turns: Optional[int] = None,
+        summarizer: Optional[Summarizer] = None,
+        session_id: Optional[str] = None,
+        store: Optional["SessionStore"] = None,
+        max_loaded_messages: Optional[int] = None,
+    ):
+        self.token_budget = token_budget or settings.HISTORY_TOKEN_BUDGET
+        self.recent_turns = recent_turns if recent_turns is not None else settings.HISTORY_RECENT_TURNS
+        if summarizer is None:
+            summarizer = model_summary if settings.HISTORY_SUMMARY_MODEL else extractive_summary
+        self.summarizer = summarizer
+
+        self.session_id = session_id
+        self.store = store if session_id else None
+        self.max_loaded_messages = max_loaded_messages or settings.SESSION_LOAD_MESSAGES
+        self._loaded = self.store is None
+
+        self.messages: list[Message] = []
+        self._token_counts: list[int] = []
+        self.total_tokens = 0
+        self._summaries: dict[str, tuple[str, int]] = {}
+        # Turns dropped from memory, oldest first: (key, extractive summary) until summarized
+        self._trimmed: list[tuple[str, tuple[str, int]]] = []
+        self._pending: dict[str, list[Message]] = {}  # Turns waiting for a model summary
+        self._summary_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def _add(self, message: Message) -> None:
+        tokens = estimate_tokens(message["content"])
+        self.messages.append(message)
+        self._token_counts.append(tokens)
+        self.total_tokens += tokens
+
+    async def load(self) -> None:
+        """Loads the most recent messages from the store. No-op after the first call."""
+        if self._loaded:
+            return
+        self._loaded = True
+        messages = await self.store.load_recent(self.session_id, self.max_loaded_messages)
+        # Start at a turn boundary rather than partway through an older turn
+        while messages and messages[0]["role"] != "user":
+            messages.pop(0)
+        for message in messages:
+            self._add(message)
+
+    async def append(self, message: Message) -> None:
+        """Adds a message (e.g. {"role": "user", "content": "Hi"}) and counts its tokens."""
+        await self.load()
+        self._add(message)
+        if self.store is not None:
+            await self.store.append(self.session_id, message)
+            self._trim()
+
+    def _trim(self) -> None:
+        """Drops the oldest turns beyond `max_loaded_messages`, keeping a summary of each."""
+        # Older messages stay in the store; only a bounded window is kept in memory
+        while len(self.messages) > self.max_loaded_messages:
+            turns = self._turns()
+            if len(turns) <= 1:
+                break  # Never drop the current turn
+            _, end = turns[0]
+            turn = self.messages[:end]
+            self._trimmed.append((self._turn_key(turn), self._summarize_now(turn)))
+            del self.messages[:end]
+            self.total_tokens -= sum(self._token_counts[:end])
+            del self._token_counts[:end]
+
+    def _turns(self) -> list[tuple[int, int]]:
+        """Splits the history into (start, end) index ranges, one per user turn."""
+        starts = [i for i, m in enumerate(self.messages) if m["role"] == "user"]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        ends = starts[1:] + [len(self.messages)]
+        return list(zip(starts, ends))
+
+    @staticmethod
+    def _turn_key(turn: list[Message]) -> str:
+        return hashlib.sha256(json.dumps(turn, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _summarize_now(self, turn: list[Message]) -> tuple[str, int]:
+        """
+        Returns the turn's summary if it is ready; otherwise queues a model summary and
+        returns an extractive one for now.
+        """
+        key = self._turn_key(turn)
+        summary = self._summaries.get(key)
+        if summary is not None:
+            return summary
+        text = _extractive_text(turn)
+        if self.summarizer is extractive_summary:
+            self._summaries[key] = (text, estimate_tokens(text))
+            return self._summaries[key]
+        self._pending.setdefault(key, turn)
+        if self._summary_task is None:
+            self._summary_task = asyncio.create_task(self._summarize_pending())
+        return text, estimate_tokens(text)
+
+    async def _summarize_pending(self) -> None:
+        try:
+            while self._pending:
+                key, turn = next(iter(self._pending.items()))
+                try:
+                    summary = await self.summarizer(turn)
+                except Exception as e:
+                    logger.warning(f"History summarization failed, using an extractive summary: {e}")
+                    summary = _extractive_text(turn)
+                self._summaries[key] = (summary, estimate_tokens(summary))
+                self._pending.pop(key, None)
+        finally:
+            self._summary_task = None
+
+    async def wait_for_summaries(self) -> None:
+        """Waits until the queued model summaries are done (e.g. in tests and benchmarks)."""
+        while self._summary_task is not None:
+            await asyncio.shield(self._summary_task)
+
+    def _older_summaries(self, older: list[tuple[int, int]]) -> Iterator[tuple[str, int]]:
+        """Summaries of the given in-memory turns, then of the trimmed turns, newest first."""
+        for start, end in reversed(older):
+            yield self._summarize_now(self.messages[start:end])
+        for key, fallback in reversed(self._trimmed):
+            yield self._summaries.get(key, fallback)
+
+    async def build_input(self) -> list[Message]:
+        """
+        Returns the messages to send to the agent, compacted to fit the token budget.
+
+        Returns:
+            Recent turns verbatim, preceded by a single summary message of older turns
+            when the full history would exceed the budget.
+        """
+        await self.load()
+        if self.total_tokens <= self.token_budget and not self._trimmed:
+            return list(self.messages)
+
+        turns = self._turns()
+        if self.total_tokens <= self.token_budget:
+            recent, older = turns, []  # Only turns dropped from memory need summaries
+        else:
+            keep = max(1, self.recent_turns)  # The current turn is always sent verbatim
+            recent, older = turns[-keep:], turns[:-keep]
+
+        # Shrink the verbatim window if it alone exceeds the budget (the last turn always stays)
+        def tokens_of(turn: tuple[int, int]) -> int:
+            return sum(self._token_counts[turn[0]:turn[1]])
+
+        recent_tokens = sum(tokens_of(turn) for turn in recent)
+        while len(recent) > 1 and recent_tokens > self.token_budget:
+            recent_tokens -= tokens_of(recent[0])
+            older.append(recent.pop(0))
+
+        # Add summaries newest first until the remaining budget is used up
+        remaining = self.token_budget - recent_tokens
+        summaries: list[str] = []
+        for summary, tokens in self._older_summaries(older):
+            if tokens > remaining:
+                break
+            summaries.insert(0, summary)
+            remaining -= tokens
+
+        compacted: list[Message] = []
+        if summaries:
+            compacted.append({"role": "system", "content": SUMMARY_PREFIX + "\n\n" + "\n\n".join(summaries)})
+        for start, end in recent:
+            compacted.extend(self.messages[start:end])
+        return compacted
@@ -0,0 +1,351 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, NamedTuple, Optional
+
+from mcp import Tool as MCPTool
+from mcp.types import CallToolResult
+
+from agents.mcp import MCPServer
+
+from .config import settings, load_mcp_servers_from_config
+from .schema_cache import get_tool_schema_cache
+
+logger = logging.getLogger(__name__)
+
+
+class MCPServerHandle:
+    """
+    Owns the lifetime of a single MCP server inside a dedicated background task.
+
+    The stdio transport of an MCP server must be closed by the same task that opened it,
+    so connecting and cleaning up both happen in `_run`, no matter which task calls `stop`.
+    """
+
+    def __init__(self, server: MCPServer):
+        self.server = server
+        self._ready: Optional[asyncio.Future] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.startup_seconds: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, timeout: Optional[float] = None) -> None:
+        """
+        Starts the server process and waits until its session is initialized.
+
+        Args:
+            timeout: Seconds to wait for the server to become ready. On timeout the
+                start is aborted and `asyncio.TimeoutError` is raised.
+        """
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self._stop_event = asyncio.Event()
+        started_at = time.perf_counter()
+        self._task = asyncio.create_task(self._run(), name=f"mcp-server:{self.name}")
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Also abort when the caller is cancelled, so no server task is left behind
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            raise
+        self.startup_seconds = time.perf_counter() - started_at
+
+    async def _run(self) -> None:
+        try:
+            await self.server.connect()
+        except asyncio.CancelledError:
+            self._ready.cancel()
+            # Close whatever part of the transport was opened before the cancellation
+            try:
+                await self.server.cleanup()
+            except Exception:
+                pass
+            raise
+        except Exception as e:
+            self._ready.set_exception(e)
+            return
+
+        self._ready.set_result(None)
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self.server.cleanup()
+
+    async def stop(self) -> None:
+        """Stops the server process. Safe to call more than once."""
+        if self._task is None:
+            return
+        self._stop_event.set()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception) as e:
+            logger.debug(f"MCP Server '{self.name}' exited with: {e!r}")
+        self._task = None
+
+
+class MCPStartup(NamedTuple):
+    """Outcome of `start_mcp_servers`."""
+    handles: list[MCPServerHandle]  # Servers that started, in the original order
+    failures: dict[str, str]  # Why each server that did not start failed, by server name
+
+
+async def start_mcp_servers(
+    servers: list[MCPServer],
+    timeout: Optional[float] = None,
+) -> MCPStartup:
+    """
+    Starts MCP servers concurrently, each bounded by its own startup timeout.
+
+    Total startup time is bounded by the slowest server rather than the sum of all of
+    them, and a hung server only costs `timeout` seconds. Per-server startup latency
+    is logged as a timing report.
+
+    Args:
+        servers: The (not yet connected) servers to start.
+        timeout: Per-server startup timeout in seconds. Defaults to `settings.MCP_STARTUP_TIMEOUT`.
+
+    Returns:
+        Handles for the servers that started successfully, in the original order, and
+        the failure reason of every server that did not.
+    """
+    timeout = timeout if timeout is not None else settings.MCP_STARTUP_TIMEOUT
+    handles = [MCPServerHandle(server) for server in servers]
+    started_at = time.perf_counter()
+
+    try:
+        results = await asyncio.gather(
+            *(handle.start(timeout=timeout) for handle in handles),
+            return_exceptions=True,
+        )
+    except asyncio.CancelledError:
+        # Servers that finished connecting before the cancellation are not returned to
+        # anyone, so stop them here instead of leaving their processes behind
+        await stop_mcp_servers([handle for handle in handles if handle.is_running])
+        raise
+
+    started: list[MCPServerHandle] = []
+    failures: dict[str, str] = {}
+    for handle, result in zip(handles, results):
+        if isinstance(result, asyncio.TimeoutError):
+            failures[handle.name] = f"did not start within {timeout:.0f}s"
+            logger.error(f"MCP Server '{handle.name}' did not start within {timeout:.0f}s.")
+        elif isinstance(result, BaseException):
+            failures[handle.name] = str(result) or type(result).__name__
+            logger.error(f"Failed to start MCP Server '{handle.name}': {result}")
+        else:
+            logger.info(f"MCP Server '{handle.name}' started in {handle.startup_seconds:.2f}s.")
+            started.append(handle)
+
+    if servers:
+        logger.info(
+            f"MCP startup finished in {time.perf_counter() - started_at:.2f}s: "
+            f"{len(started)}/{len(servers)} server(s) ready."
+        )
+    return MCPStartup(started, failures)
+
+
+async def stop_mcp_servers(handles: list[MCPServerHandle]) -> None:
+    """Stops started MCP servers concurrently."""
+    await asyncio.gather(*(handle.stop() for handle in handles))
+
+
+@dataclass
+class _PoolMember:
+    server: MCPServer
+    semaphore: asyncio.Semaphore
+    in_flight: int = field(default=0)
+
+
+class PooledMCPServer(MCPServer):
+    """
+    A lease on all pooled instances of one named MCP server.
+
+    Tool calls are routed to the least busy instance and bounded by a per-instance
+    semaphore. `connect` and `cleanup` are no-ops: the pool owns the server processes.
+    """
+
+    def __init__(self, name: str, members: list[_PoolMember]):
+        self._name = name
+        self._members = members
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def connect(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self) -> list[MCPTool]:
+        if not self._members:
+            return []  # Every instance failed to start
+        return await self._members[0].server.list_tools()
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        if not self._members:
+            raise RuntimeError(f"MCP server '{self.name}' is not available.")
+        member = min(self._members, key=lambda m: m.in_flight)
+        member.in_flight += 1
+        try:
+            async with member.semaphore:
+                return await member.server.call_tool(tool_name, arguments)
+        finally:
+            member.in_flight -= 1
+
+
+class MCPServerPool:
+    """
+    Process-wide pool of started MCP servers shared by every chat session.
+
+    Servers are started once (on first use or at app startup) and kept running until
+    `shutdown` is called, so new sessions only lease lightweight `PooledMCPServer` proxies.
+    With supervision enabled, each instance is a `SupervisedMCPServer` that restarts on
+    crashes and stops while idle.
+
+    With the tool schema cache enabled, `start` returns as soon as the configuration is
+    loaded: servers finish starting in the background, their tool lists are served from
+    the cache meanwhile, and tool calls wait for their own server only.
+    """
+
+    def __init__(
+        self,
+        pool_sizes: Optional[dict[str, int]] = None,
+        max_concurrent_calls: Optional[int] = None,
+    ):
+        self.pool_sizes = pool_sizes if pool_sizes is not None else settings.MCP_POOL_SIZES
+        self.max_concurrent_calls = max_concurrent_calls or settings.MCP_MAX_CONCURRENT_CALLS
+        self._handles: list[MCPServerHandle] = []
+        self._leases: dict[str, PooledMCPServer] = {}
+        self._members: dict[str, list[_PoolMember]] = {}
+        self._startup_task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self.active_leases = 0
+
+    @property
+    def is_started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        """
+        Loads the MCP configuration and starts every configured server instance.
+
+        Safe to call concurrently and repeatedly; only the first call starts servers.
+        Configuration errors (missing file, invalid JSON) propagate to the caller.
+        """
+        async with self._start_lock:
+            if self._started:
+                return
+
+            schema_cache = get_tool_schema_cache()
+            if settings.MCP_SUPERVISION_ENABLED:
+                from .supervisor import load_supervised_mcp_servers  # The supervisor builds on this module
+
+                loaded_servers = load_supervised_mcp_servers(pool_sizes=self.pool_sizes, schema_cache=schema_cache)
+            else:
+                loaded_servers = load_mcp_servers_from_config(pool_sizes=self.pool_sizes, schema_cache=schema_cache)
+
+            if schema_cache is None:
+                self._handles, _ = await start_mcp_servers(loaded_servers)
+                self._build_leases([handle.server for handle in self._handles])
+                logger.info(
+                    f"MCP server pool ready: {len(self._handles)} instance(s) across {len(self._leases)} server(s)."
+                )
+            else:
+                self._build_leases(loaded_servers)
+                self._startup_task = asyncio.create_task(self._finish_startup(loaded_servers))
+            self._started = True
+
+    def _build_leases(self, servers: list[MCPServer]) -> None:
+        self._members = {}
+        for server in servers:
+            self._members.setdefault(server.name, []).append(
+                _PoolMember(server, asyncio.Semaphore(self.max_concurrent_calls))
+            )
+        self._leases = {name: PooledMCPServer(name, group) for name, group in self._members.items()}
+
+    async def _finish_startup(self, servers: list[MCPServer]) -> None:
+        self._handles, _ = await start_mcp_servers(servers)
+        started = {id(handle.server) for handle in self._handles}
+        # Drop instances that failed to start from the leases handed out already
+        for group in self._members.values():
+            group[:] = [member for member in group if id(member.server) in started]
+        logger.info(f"MCP server pool ready: {len(self._handles)}/{len(servers)} instance(s) started.")
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Instances, running processes and in-flight calls per server, plus supervisor counters."""
+        result = {}
+        for name, members in self._members.items():
+            stats = {"instances": len(members), "processes": 0, "in_flight": sum(m.in_flight for m in members)}
+            for member in members:
+                supervisor_stats = getattr(member.server, "stats", None)  # `SupervisedMCPServer`
+                if supervisor_stats is None:
+                    stats["processes"] += 1
+                    continue
+                member_stats = supervisor_stats()
+                stats["processes"] += int(member_stats["running"]) + int(member_stats["spare"])
+                for key in ("restarts", "crashes", "reaped"):
+                    stats[key] = stats.get(key, 0) + member_stats[key]
+            result[name] = stats
+        return result
+
+    async def lease(self, names: Optional[Iterable[str]] = None) -> list[MCPServer]:
+        """
+        Leases started servers from the pool, starting the pool first if necessary.
+
+        Args:
+            names: Server names to lease. Leases every started server if omitted.
+
+        Returns:
+            A list of `PooledMCPServer` proxies, one per server name. The lease is counted
+            in `active_leases` until `release` is called, even if the list is empty.
+        """
+        await self.start()
+        wanted = set(names) if names is not None else None
+        leased = [s for name, s in self._leases.items() if wanted is None or name in wanted]
+        self.active_leases += 1
+        return leased
+
+    def release(self) -> None:
+        """Returns a lease to the pool. The servers keep running for other sessions."""
+        self.active_leases = max(0, self.active_leases - 1)
+
+    async def shutdown(self) -> None:
+        """Stops every pooled server process."""
+        async with self._start_lock:
+            if self._startup_task is not None:
+                # Let a background startup finish so no server process is left behind
+                await self._startup_task
+                self._startup_task = None
+            if self._handles:
+                logger.info(f"Shutting down {len(self._handles)} pooled MCP server(s)...")
+            await stop_mcp_servers(self._handles)
+            self._handles = []
+            self._leases = {}
+            self._members = {}
+            self._started = False
+            self.active_leases = 0
+
+
+_mcp_pool: Optional[MCPServerPool] = None
+
+
+def get_mcp_pool() -> MCPServerPool:
+    """Returns the process-wide MCP server pool."""
+    global _mcp_pool
+    if _mcp_pool is None:
+        _mcp_pool = MCPServerPool()
+    return _mcp_pool
@@ -0,0 +1,35 @@
+from typing import Any, Optional
+
+from mcp import Tool as MCPTool
+from mcp.types import CallToolResult
+
+from agents.mcp import MCPServer
+
+
+class MCPServerProxy(MCPServer):
+    """
+    Base class for MCP server wrappers that add behaviour around a wrapped server.
+
+    Every call is delegated to the wrapped server; subclasses override the methods
+    they need (usually `call_tool`). The proxy keeps the wrapped server's name, so
+    name-based filtering keeps working on wrapped servers.
+    """
+
+    def __init__(self, server: MCPServer):
+        self.server = server
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    async def connect(self):
+        await self.server.connect()
+
+    async def cleanup(self):
+        await self.server.cleanup()
+
+    async def list_tools(self) -> list[MCPTool]:
+        return await self.server.list_tools()
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        return await self.server.call_tool(tool_name, arguments)
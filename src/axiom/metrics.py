@@ -0,0 +1,417 @@
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import threading
+from collections import Counter as StackCounter
+from typing import Callable, Iterable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .config import settings
+from .events import RunSummary
+from .mcp_pool import get_mcp_pool
+from .prefetch import get_prefetcher
+from .rate_limit import get_request_scheduler
+from .response_cache import get_response_cache
+from .singleflight import get_single_flight
+from .tool_cache import get_tool_cache
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# A sample produced at scrape time: (metric name, labels, value)
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> list[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[Sample]:
+        return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> list[Sample]:
+        return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[tuple[str, ...], list[int]] = {}  # Per bucket, the last one is +Inf
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def samples(self) -> list[Sample]:
+        samples: list[Sample] = []
+        for key, counts in self._counts.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, self._sums[key]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Metrics rendered in the Prometheus text exposition format.
+
+    Besides the registered metrics, collectors are called at scrape time to report
+    values kept elsewhere (cache counters, queue depths, ...). Samples whose name ends
+    in `_total` are exported as counters, all others as gauges.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[tuple[str, Callable[[], list[Sample]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, help: str, collector: Callable[[], list[Sample]]) -> None:
+        """Adds a function returning samples; `help` is used for each metric it reports."""
+        self._collectors.append((help, collector))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in metric.samples())
+
+        for help, collector in self._collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+                continue
+            by_name: dict[str, list[Sample]] = {}
+            for sample in samples:
+                by_name.setdefault(sample[0], []).append(sample)
+            for name, group in by_name.items():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for _, labels, value in group)
+        return "\n".join(lines) + "\n"
+
+
+# Component stats that only go up; exported as counters with a `_total` suffix
+_COUNTER_STATS = {
+    "axiom_mcp_server": {"restarts", "crashes", "reaped"},
+    "axiom_rate_limit": {"requests", "throttled"},
+    "axiom_tool_cache": {"hits", "misses", "disk_hits", "evictions"},
+    "axiom_single_flight": {"calls", "coalesced"},
+    "axiom_prefetch": {"prefetched", "hits", "model_calls", "time_saved"},
+    "axiom_response_cache": {"hits", "misses", "stores", "evictions"},
+}
+
+
+def _stats_samples(prefix: str, stats: dict[str, float], **labels: str) -> list[Sample]:
+    counters = _COUNTER_STATS.get(prefix, set())
+    return [
+        (f"{prefix}_{key}_total" if key in counters else f"{prefix}_{key}", labels, float(value))
+        for key, value in stats.items()
+        if isinstance(value, (int, float))
+    ]
+
+
+def _component_samples() -> list[Sample]:
+    samples: list[Sample] = []
+    for server, stats in get_mcp_pool().stats().items():
+        samples += _stats_samples("axiom_mcp_server", stats, server=server)
+    for model, stats in get_request_scheduler().stats().items():
+        samples += _stats_samples("axiom_rate_limit", stats, model=model)
+    # Disabled components are not reported, so scraping does not create them
+    if settings.TOOL_CACHE_ENABLED:
+        samples += _stats_samples("axiom_tool_cache", get_tool_cache().stats())
+    if settings.SINGLE_FLIGHT_ENABLED:
+        samples += _stats_samples("axiom_single_flight", get_single_flight().stats())
+    if settings.PREFETCH_ENABLED:
+        samples += _stats_samples("axiom_prefetch", get_prefetcher().stats())
+    if settings.RESPONSE_CACHE_ENABLED:
+        samples += _stats_samples("axiom_response_cache", get_response_cache().stats())
+    return samples
+
+
+class AxiomMetrics:
+    """The metrics reported by the agent and the Chainlit app."""
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        r = self.registry
+        self.runs = r.counter("axiom_runs_total", "Agent runs by model and outcome (ok, error, cancelled, cached).", ["model", "outcome"])
+        self.run_seconds = r.histogram("axiom_run_seconds", "Duration of agent runs.", ["model"])
+        self.ttft_seconds = r.histogram("axiom_time_to_first_token_seconds", "Time from run start to the first streamed token.", ["model"])
+        self.turn_seconds = r.histogram("axiom_model_turn_seconds", "Duration of single model turns.", ["model"])
+        self.model_errors = r.counter("axiom_model_errors_total", "Runs that failed with a model or agent error.", ["model"])
+        self.tokens = r.counter("axiom_tokens_total", "Tokens used, by model and direction (input, output).", ["model", "direction"])
+        self.tool_seconds = r.histogram("axiom_tool_call_seconds", "Duration of tool calls, by tool.", ["tool"])
+        self.active_sessions = r.gauge("axiom_active_sessions", "Open chat sessions.")
+        self._sessions: set[str] = set()
+        self.event_loop_lag = r.histogram("axiom_event_loop_lag_seconds", "Delay of event loop wake-ups.", buckets=LAG_BUCKETS)
+        # MCP process counts (`axiom_mcp_server_processes`), cache and queue counters
+        r.add_collector("Counters reported by Axiom components.", _component_samples)
+
+    def session_active(self, session_id: str) -> None:
+        """Counts a chat session as open. Safe to call again for a session already counted."""
+        self._sessions.add(session_id)
+        self.active_sessions.set(len(self._sessions))
+
+    def session_ended(self, session_id: str) -> None:
+        """Stops counting a chat session. Safe to call for a session not counted."""
+        self._sessions.discard(session_id)
+        self.active_sessions.set(len(self._sessions))
+
+    def observe_run(self, summary: RunSummary) -> None:
+        model = summary.model or "unknown"
+        outcome = "cancelled" if summary.cancelled else "error" if summary.error else "cached" if summary.cached else "ok"
+        self.runs.inc(model=model, outcome=outcome)
+        if summary.cached:
+            return  # Replays say nothing about model or tool latency
+        self.run_seconds.observe(summary.total_seconds, model=model)
+        if summary.error and not summary.cancelled:
+            self.model_errors.inc(model=model)
+        if summary.time_to_first_token is not None:
+            self.ttft_seconds.observe(summary.time_to_first_token, model=model)
+        self.tokens.inc(summary.input_tokens, model=model, direction="input")
+        self.tokens.inc(summary.output_tokens, model=model, direction="output")
+        for tool, durations in summary.tool_latency.items():
+            for duration in durations:
+                self.tool_seconds.observe(duration, tool=tool)
+
+
+_metrics: Optional[AxiomMetrics] = None
+
+
+def get_metrics() -> AxiomMetrics:
+    """Returns the process-wide metrics."""
+    global _metrics
+    if _metrics is None:
+        _metrics = AxiomMetrics()
+    return _metrics
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread (the event loop's, by default) from a background thread.
+
+    The result is in the collapsed-stack format (`frame;frame;frame count` per line)
+    that flame graph tools read. Sampling costs the profiled thread nothing but the GIL
+    switches, so it can run against live traffic.
+    """
+
+    def __init__(self, interval: Optional[float] = None, thread_id: Optional[int] = None):
+        self.interval = interval or settings.PROFILER_SAMPLE_INTERVAL
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: StackCounter[str] = StackCounter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, name="axiom-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stops sampling and returns the collapsed stacks, most frequent first."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class MetricsServer:
+    """
+    Minimal HTTP server for `/metrics` (and `/debug/profile` when the profiler is enabled).
+
+    Also measures event loop lag: how late a periodic sleep wakes up, which is the delay
+    every request handled by this loop sees.
+    """
+
+    def __init__(self, metrics: Optional[AxiomMetrics] = None, host: Optional[str] = None, port: Optional[int] = None):
+        self.metrics = metrics or get_metrics()
+        self.host = host or settings.METRICS_HOST
+        self.port = port or settings.METRICS_PORT
+        self._server: Optional[asyncio.Server] = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._profile_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self._lag_task = asyncio.create_task(self._measure_lag(settings.EVENT_LOOP_LAG_INTERVAL))
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            await asyncio.gather(self._lag_task, return_exceptions=True)
+            self._lag_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _measure_lag(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.metrics.event_loop_lag.observe(max(0.0, loop.time() - started - interval))
+
+    async def _profile(self, seconds: float) -> str:
+        async with self._profile_lock:  # One profile at a time
+            profiler = SamplingProfiler()
+            profiler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stacks = profiler.stop()
+            logger.info(f"Profiled the event loop for {seconds:.0f}s: {profiler.samples} samples")
+            return stacks
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            while (await asyncio.wait_for(reader.readline(), timeout=10)).strip():
+                pass  # Headers are not needed
+            method, target, *_ = request_line.decode("latin-1").split()
+            url = urlsplit(target)
+
+            if method != "GET":
+                status, body = "405 Method Not Allowed", "Method not allowed\n"
+            elif url.path == "/metrics":
+                status, body = "200 OK", self.metrics.registry.render()
+            elif url.path == "/debug/profile" and settings.METRICS_PROFILER_ENABLED:
+                seconds = float(parse_qs(url.query).get("seconds", ["10"])[0])
+                status, body = "200 OK", await self._profile(min(max(seconds, 0.1), 300.0))
+            else:
+                status, body = "404 Not Found", "Not found\n"
+
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ValueError, ConnectionError) as e:
+            logger.debug(f"Bad metrics request: {e!r}")
+        finally:
+            writer.close()
+
+
+_metrics_server: Optional[MetricsServer] = None
+
+
+def get_metrics_server() -> MetricsServer:
+    """Returns the process-wide metrics HTTP server (not started)."""
+    global _metrics_server
+    if _metrics_server is None:
+        _metrics_server = MetricsServer()
+    return _metrics_server
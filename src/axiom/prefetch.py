@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Optional
+
+from mcp.types import CallToolResult, TextContent
+
+from agents.mcp import MCPServer
+
+from .config import settings
+from .mcp_proxy import MCPServerProxy
+from .tool_cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+RESOLVE_TOOL_NAME = "resolve-library-id"
+DOCS_TOOL_NAME = "get-library-docs"
+
+_LIBRARY_ID_PATTERN = re.compile(r"Context7-compatible library ID:\s*(/[^\s`'\"]+)")
+
+# Common library names (lowercase alias -> name passed to resolve-library-id)
+KNOWN_LIBRARIES: dict[str, str] = {
+    "openai agents sdk": "openai agents sdk",
+    "agents sdk": "openai agents sdk",
+    "openai": "openai",
+    "langchain": "langchain",
+    "langgraph": "langgraph",
+    "llamaindex": "llamaindex",
+    "llama index": "llamaindex",
+    "crewai": "crewai",
+    "autogen": "autogen",
+    "pydantic ai": "pydantic ai",
+    "pydantic": "pydantic",
+    "chainlit": "chainlit",
+    "streamlit": "streamlit",
+    "gradio": "gradio",
+    "fastapi": "fastapi",
+    "flask": "flask",
+    "django": "django",
+    "sqlalchemy": "sqlalchemy",
+    "sqlmodel": "sqlmodel",
+    "celery": "celery",
+    "httpx": "httpx",
+    "pytest": "pytest",
+    "numpy": "numpy",
+    "pandas": "pandas",
+    "polars": "polars",
+    "scikit-learn": "scikit-learn",
+    "sklearn": "scikit-learn",
+    "pytorch": "pytorch",
+    "torch": "pytorch",
+    "tensorflow": "tensorflow",
+    "transformers": "transformers",
+    "hugging face": "transformers",
+    "mcp": "model context protocol",
+    "model context protocol": "model context protocol",
+    "next.js": "next.js",
+    "nextjs": "next.js",
+    "react": "react",
+    "vue": "vue",
+    "svelte": "svelte",
+    "tailwind": "tailwindcss",
+    "tailwindcss": "tailwindcss",
+    "shadcn": "shadcn/ui",
+    "prisma": "prisma",
+    "supabase": "supabase",
+    "firebase": "firebase",
+    "mongodb": "mongodb",
+    "redis": "redis",
+    "postgres": "postgresql",
+    "postgresql": "postgresql",
+    "docker": "docker",
+    "kubernetes": "kubernetes",
+    "vercel ai sdk": "vercel ai sdk",
+    "uv": "uv",
+}
+
+_KNOWN_LIBRARIES_PATTERN = re.compile(
+    r"(?<![\w.-])(" + "|".join(re.escape(alias) for alias in sorted(KNOWN_LIBRARIES, key=len, reverse=True)) + r")(?![\w-])",
+    re.IGNORECASE,
+)
+
+
+def extract_libraries(text: str, limit: Optional[int] = None) -> list[str]:
+    """
+    Returns library names mentioned in `text`, in order of first mention.
+
+    Names are spelled as the user wrote them unless they are an alias, since the model
+    usually passes the user's spelling to `resolve-library-id` (and the cache key
+    depends on it).
+    """
+    names: list[str] = []
+    for match in _KNOWN_LIBRARIES_PATTERN.finditer(text):
+        alias = match.group(1).lower()
+        name = match.group(1) if KNOWN_LIBRARIES[alias] == alias else KNOWN_LIBRARIES[alias]
+        if name.lower() not in (n.lower() for n in names):
+            names.append(name)
+        if limit is not None and len(names) >= limit:
+            break
+    return names
+
+
+def parse_library_ids(text: str) -> list[str]:
+    """Returns the Context7-compatible library IDs listed in a `resolve-library-id` result."""
+    return _LIBRARY_ID_PATTERN.findall(text)
+
+
+def result_text(result: CallToolResult) -> str:
+    return "\n".join(item.text for item in result.content if isinstance(item, TextContent))
+
+
+class DocPrefetcher:
+    """
+    Resolves the IDs of libraries named in a message before the model asks.
+
+    Prefetch calls go through the same wrapped server as the model's calls, so their
+    results land in the tool result cache (and identical in-flight calls are shared).
+    Calls the model makes later are matched against recent prefetches to report the
+    hit rate and the time saved.
+
+    Only `resolve-library-id` is prefetched: its arguments are the library name, which
+    the model's own call reproduces. A `get-library-docs` call also carries the topic
+    and token count the model picks, so a guessed prefetch would rarely share its
+    cache key and would only add an upstream fetch.
+    """
+
+    def __init__(
+        self,
+        max_libraries: Optional[int] = None,
+        window_seconds: float = 600.0,
+    ):
+        self.max_libraries = max_libraries or settings.PREFETCH_MAX_LIBRARIES
+        self.window_seconds = window_seconds
+
+        self._recent: dict[str, tuple[float, Optional[float]]] = {}  # Key -> (started, finished)
+        self._tasks: set[asyncio.Task] = set()
+
+        self.prefetched = 0
+        self.hits = 0
+        self.model_calls = 0
+        self.time_saved = 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Prefetch counters; `hit_rate` is the share of prefetched calls the model used."""
+        return {
+            "prefetched": self.prefetched,
+            "hits": self.hits,
+            "model_calls": self.model_calls,
+            "hit_rate": self.hits / self.prefetched if self.prefetched else 0.0,
+            "time_saved": self.time_saved,
+        }
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        for key in [k for k, (started, _) in self._recent.items() if started < cutoff]:
+            del self._recent[key]
+
+    async def _call(self, server: MCPServer, tool_name: str, arguments: dict[str, Any]) -> Optional[CallToolResult]:
+        key = make_cache_key(tool_name, arguments)
+        if key in self._recent:
+            return None  # Prefetched recently; the result is already cached
+        started = time.monotonic()
+        self._recent[key] = (started, None)
+        self.prefetched += 1
+        try:
+            result = await server.call_tool(tool_name, arguments)
+        except Exception:
+            self._recent.pop(key, None)
+            raise
+        if key in self._recent:  # Not already claimed by a model call while it ran
+            self._recent[key] = (started, time.monotonic())
+        return result
+
+    async def _prefetch_library(self, server: MCPServer, library: str) -> None:
+        try:
+            await self._call(server, RESOLVE_TOOL_NAME, {"libraryName": library})
+        except Exception as e:
+            logger.debug(f"Prefetch for '{library}' failed: {e}")
+
+    def start(self, server: MCPServer, chat_history: str | list[dict[str, str]]) -> list[asyncio.Task]:
+        """
+        Starts resolving the libraries named in the last user message.
+
+        Returns:
+            The prefetch tasks, one per library; cancel them if the run is cancelled.
+        """
+        if isinstance(chat_history, str):
+            text = chat_history
+        else:
+            text = next((m["content"] for m in reversed(chat_history) if m.get("role") == "user"), "")
+        self._expire()
+
+        libraries = extract_libraries(text, limit=self.max_libraries)
+        tasks = []
+        for library in libraries:
+            task = asyncio.create_task(self._prefetch_library(server, library))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            tasks.append(task)
+        if libraries:
+            logger.debug(f"Prefetching library IDs for: {', '.join(libraries)}")
+        return tasks
+
+    def observe(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> None:
+        """Records a call made by the model, counting it as a hit if it was prefetched."""
+        if tool_name != RESOLVE_TOOL_NAME:
+            return
+        self.model_calls += 1
+        entry = self._recent.pop(make_cache_key(tool_name, arguments), None)
+        if entry is None:
+            return
+        started, finished = entry
+        self.hits += 1
+        # A finished prefetch saves its whole duration; one still running saves the time it has run
+        self.time_saved += (finished if finished is not None else time.monotonic()) - started
+
+
+class PrefetchTrackingMCPServer(MCPServerProxy):
+    """MCP server wrapper that reports the model's tool calls to a `DocPrefetcher`."""
+
+    def __init__(self, server: MCPServer, prefetcher: DocPrefetcher):
+        super().__init__(server)
+        self.prefetcher = prefetcher
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self.prefetcher.observe(tool_name, arguments)
+        return await self.server.call_tool(tool_name, arguments)
+
+
+_prefetcher: Optional[DocPrefetcher] = None
+
+
+def get_prefetcher() -> DocPrefetcher:
+    """Returns the process-wide documentation prefetcher."""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = DocPrefetcher()
+    return _prefetcher
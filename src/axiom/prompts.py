@@ -19,6 +19,8 @@ You have access to docs and code of 2000+ libraries, frameworks, and tools that
 Understand the user request and then follow this process:
 1. Use `resolve-library-id` tool to accurately identify the library IDs and then fetch docs using `get-library-docs` tool (limited to **5000 tokens**). Analyze the results thoroughly.
 2. If the initial 5000 tokens are insufficient to complete your response, **incrementally increase** the token context **up to 20,000 tokens**. Refine your search queries based on previous results to get better results.
+    *   If the `search-docs` tool is available, use it first for libraries whose docs were already fetched: it searches every fetched doc and returns only the relevant snippets. Fetch again only if it finds nothing useful.
+    *   If the `fetch-docs` tool is available and the project uses several libraries, use it to resolve and fetch docs for all of them in one call instead of one library at a time.
 3. Keep iterating until you have all the necessary code/docs to complete your response.
 4. If you still don't get the necessary context/code, even after multiple iterations, use `tavily-search` tool to search the web with appropriate search queries and other parameters. **REMEMBER:** This should be your last option.
 5. You can use `tavily-extract` tool to extract the content of urls from results that you think will help you complete your project.
@@ -55,6 +57,8 @@ Follow these steps when fulfilling user request:
 
 1. Use `resolve-library-id` tool to accurately identify the library IDs and then fetch docs using `get-library-docs` tool (limited to **5000 tokens**).
 2. If the initial 5000 tokens are insufficient, **incrementally increase** the token context **up to 20,000 tokens**. Refine your search queries based previous results to get the necessary details.
+   If the `search-docs` tool is available, use it first for libraries whose docs were already fetched; it returns only the relevant snippets. Fetch again only if it finds nothing useful.
+   If the `fetch-docs` tool is available and the question involves several libraries, use it to fetch docs for all of them in one call.
 3. Keep iterating until you have all the necessary code/docs to complete your response.
 4. The `resolve-library-id` tool returns library IDs, try with similar IDs if the actual ID didn't give correct results.
 5. Provide a clear and complete response to the user.
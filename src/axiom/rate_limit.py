@@ -0,0 +1,288 @@
+import asyncio
+import contextvars
+import email.utils
+import json
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Session the current model request is made for; requests are queued fairly per session
+current_session_id: contextvars.ContextVar[str] = contextvars.ContextVar("current_session_id", default="default")
+
+RETRYABLE_STATUS_CODES = {429, 503}
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `capacity`.
+
+    The rate adapts to the endpoint: it is halved (down to `min_fraction` of the
+    configured rate) whenever a request is throttled, and grows back gradually with
+    each successful request. `pause` blocks the bucket entirely, e.g. for Retry-After.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_fraction: float = 0.1):
+        self.max_rate = rate
+        self.min_rate = rate * min_fraction
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def refund(self) -> None:
+        """Returns a token that was acquired but not used."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def pause(self, seconds: float) -> None:
+        """Hands out no tokens for `seconds` and slows the rate down."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0
+        self._paused_until = max(self._paused_until, now + seconds)
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self) -> None:
+        """Recovers the rate gradually after throttling."""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+@dataclass
+class _SchedulerStats:
+    requests: int = 0
+    throttled: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class _ModelQueue:
+    """Requests waiting for one model's bucket, grouped by session for round-robin."""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.sessions: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.stats = _SchedulerStats()
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for waiters in self.sessions.values() for future in waiters if not future.done())
+
+    def next_waiter(self) -> Optional[asyncio.Future]:
+        """Pops the next pending request, taking one from each session in turn."""
+        while self.sessions:
+            session_id, waiters = next(iter(self.sessions.items()))
+            future = waiters.popleft()
+            if waiters:
+                self.sessions.move_to_end(session_id)
+            else:
+                del self.sessions[session_id]
+            if not future.done():
+                return future
+        return None
+
+
+class RequestScheduler:
+    """
+    Process-wide scheduler for model requests.
+
+    Each model has a token bucket sized from `MODEL_RATE_LIMITS` (requests per minute).
+    Requests waiting for a bucket are served round-robin across sessions, so one busy
+    session cannot starve the others. Throttled requests pause the model's bucket for
+    every session and are retried with exponential backoff and jitter, honouring the
+    endpoint's Retry-After header.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, int]] = None,
+        default_rpm: Optional[int] = None,
+        burst: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+    ):
+        self.limits = settings.MODEL_RATE_LIMITS if limits is None else limits
+        self.default_rpm = default_rpm or settings.DEFAULT_RATE_LIMIT_RPM
+        self.burst = burst or settings.RATE_LIMIT_BURST
+        self.max_retries = settings.RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or settings.RATE_LIMIT_BACKOFF_BASE
+        self.backoff_max = backoff_max or settings.RATE_LIMIT_BACKOFF_MAX
+        self._queues: dict[str, _ModelQueue] = {}
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            rpm = self.limits.get(model, self.default_rpm)
+            queue = _ModelQueue(TokenBucket(rate=rpm / 60, capacity=min(self.burst, rpm)))
+            self._queues[model] = queue
+        return queue
+
+    async def _dispatch(self, queue: _ModelQueue) -> None:
+        while queue.depth:
+            await queue.bucket.acquire()
+            future = queue.next_waiter()
+            if future is None:
+                queue.bucket.refund()
+                break
+            future.set_result(None)
+        queue.dispatcher = None
+
+    async def acquire(self, model: str, session_id: Optional[str] = None) -> float:
+        """
+        Waits for this session's turn to send a request to `model`.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        queue = self._queue(model)
+        session_id = session_id or current_session_id.get()
+        future = asyncio.get_running_loop().create_future()
+        queue.sessions.setdefault(session_id, deque()).append(future)
+        if queue.dispatcher is None:
+            queue.dispatcher = asyncio.create_task(self._dispatch(queue))
+
+        started = time.monotonic()
+        await future
+        waited = time.monotonic() - started
+        queue.stats.requests += 1
+        queue.stats.total_wait += waited
+        queue.stats.max_wait = max(queue.stats.max_wait, waited)
+        return waited
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))  # Full jitter
+
+    def on_throttled(self, model: str, delay: float) -> None:
+        queue = self._queue(model)
+        queue.stats.throttled += 1
+        queue.bucket.pause(delay)
+
+    def on_success(self, model: str) -> None:
+        self._queue(model).bucket.on_success()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Queue depth, wait times and throttling counts per model."""
+        result = {}
+        for model, queue in self._queues.items():
+            stats = queue.stats
+            result[model] = {
+                "queue_depth": queue.depth,
+                "requests": stats.requests,
+                "throttled": stats.throttled,
+                "avg_wait": stats.total_wait / stats.requests if stats.requests else 0.0,
+                "max_wait": stats.max_wait,
+                "current_rpm": queue.bucket.rate * 60,
+            }
+        return result
+
+
+def parse_retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Reads the delay from `retry-after-ms` or `retry-after` (seconds or an HTTP date)."""
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _request_model(request: httpx.Request) -> Optional[str]:
+    if request.method != "POST":
+        return None
+    try:
+        body = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return None
+    model = body.get("model") if isinstance(body, dict) else None
+    return model if isinstance(model, str) else None
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends model requests through a `RequestScheduler`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, scheduler: RequestScheduler):
+        self.transport = transport
+        self.scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model = _request_model(request)
+        if model is None:
+            return await self.transport.handle_async_request(request)
+
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(model)
+            response = await self.transport.handle_async_request(request)
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                self.scheduler.on_success(model)
+                return response
+
+            # Pause the model for every session, not just this request
+            delay = self.scheduler.backoff(attempt, parse_retry_after(response.headers))
+            self.scheduler.on_throttled(model, delay)
+            if attempt >= self.scheduler.max_retries:
+                # Already retried here; keep the OpenAI SDK from retrying it again
+                response.headers["x-should-retry"] = "false"
+                return response
+
+            await response.aclose()
+            logger.warning(
+                f"Model '{model}' returned {response.status_code}; retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{self.scheduler.max_retries})."
+            )
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+_scheduler: Optional[RequestScheduler] = None
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Returns the process-wide model request scheduler configured from settings."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RequestScheduler()
+    return _scheduler
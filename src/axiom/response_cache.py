@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from typing_extensions import AsyncGenerator
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Normalized starter prompts; a user message matching one of them ignores case
+_starter_prompts: set[str] = set()
+
+
+def _normalize_text(text: str) -> str:
+    """
+    Collapses whitespace and drops trailing punctuation ("What is X?" == "What is X").
+
+    Case is kept, since it matters in code identifiers (`Client` vs `client`).
+    """
+    return " ".join(text.split()).rstrip(" ?!.")
+
+
+def register_starter_prompts(prompts: Iterable[str]) -> None:
+    """Registers canned prompts (e.g. UI starters) that should match regardless of case."""
+    _starter_prompts.update(_normalize_text(prompt).casefold() for prompt in prompts)
+
+
+def normalize_conversation(chat_history: str | list[dict[str, Any]]) -> list[list[str]]:
+    """Reduces a model input to its (role, normalized text) pairs."""
+    if isinstance(chat_history, str):
+        chat_history = [{"role": "user", "content": chat_history}]
+    conversation = []
+    for message in chat_history:
+        if not isinstance(message, dict):
+            continue
+        role = str(message.get("role", ""))
+        text = _normalize_text(str(message.get("content") or ""))
+        if role == "user" and text.casefold() in _starter_prompts:
+            text = text.casefold()
+        conversation.append([role, text])
+    return conversation
+
+
+def make_response_key(mode: str, model: str, prompt: str, chat_history: str | list[dict[str, Any]]) -> str:
+    """
+    Builds the cache key for a response.
+
+    The key covers the mode, the model and the system prompt's hash (so editing a
+    prompt starts a fresh set of entries), plus the normalized conversation.
+    """
+    prompt_version = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    payload = json.dumps([mode, model, prompt_version, normalize_conversation(chat_history)], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Final agent responses, stored in SQLite and keyed by `make_response_key`.
+
+    Entries expire `ttl` seconds after they were written, and the store is trimmed to
+    `max_disk_bytes` by evicting the least recently used entries.
+    """
+
+    def __init__(self, path: Path, ttl: float, max_disk_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit/miss counters for the cache."""
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores, "evictions": self.evictions}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    mode TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache(accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            conn = self._connect()
+            row = conn.execute("SELECT expires_at, response FROM response_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[0] <= now:
+                conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[1]
+
+    def _disk_set(self, key: str, mode: str, model: str, response: str) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            now = time.time()
+            size = len(response.encode("utf-8"))
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, mode, model, response, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, mode, model, response, size, now + self.ttl, now),
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+            while total > self.max_disk_bytes:
+                row = conn.execute("SELECT key, size FROM response_cache ORDER BY accessed_at LIMIT 1").fetchone()
+                if row is None:
+                    break
+                conn.execute("DELETE FROM response_cache WHERE key = ?", (row[0],))
+                total -= row[1]
+                self.evictions += 1
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for a key, or None on a miss."""
+        try:
+            response = await asyncio.to_thread(self._disk_get, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+            response = None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    async def set(self, key: str, mode: str, model: str, response: str) -> None:
+        """Stores a response under `key` for `ttl` seconds."""
+        if self.ttl <= 0 or not response:
+            return
+        try:
+            await asyncio.to_thread(self._disk_set, key, mode, model, response)
+            self.stores += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+
+async def replay_response(
+    text: str,
+    chars_per_second: Optional[float] = None,
+    chunk_chars: int = 24,
+) -> AsyncGenerator[str, None]:
+    """
+    Streams a cached response in small chunks, paced like a live model response.
+
+    Args:
+        text: The response to stream.
+        chars_per_second: Replay speed. Defaults to `settings.RESPONSE_CACHE_REPLAY_CHARS_PER_SECOND`;
+            0 yields the whole text at once.
+        chunk_chars: Approximate chunk size; chunks end at whitespace where possible.
+    """
+    chars_per_second = chars_per_second if chars_per_second is not None else settings.RESPONSE_CACHE_REPLAY_CHARS_PER_SECOND
+    if chars_per_second <= 0:
+        yield text
+        return
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    position = 0
+    while position < len(text):
+        end = position + chunk_chars
+        if end < len(text):
+            space = text.find(" ", end)
+            end = space + 1 if 0 <= space < end + chunk_chars else end
+        yield text[position:end]
+        position = end
+        # Pace against the start time so slow consumers do not make the replay slower still
+        delay = started + position / chars_per_second - loop.time()
+        if delay > 0 and position < len(text):
+            await asyncio.sleep(delay)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide response cache configured from settings."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            path=settings.RESPONSE_CACHE_PATH,
+            ttl=settings.RESPONSE_CACHE_TTL,
+            max_disk_bytes=settings.RESPONSE_CACHE_MAX_DISK_MB * 1024 * 1024,
+        )
+    return _response_cache
@@ -0,0 +1,119 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Model name that enables routing in `AxiomAgent`
+AUTO_MODEL = "auto"
+
+TIER_SIMPLE = 1
+TIER_STANDARD = 2
+TIER_COMPLEX = 3
+
+_COMPLEX_PATTERN = re.compile(
+    r"\b(implement|refactor|architect\w*|design|debug|optimi[sz]e|migrate|build|deploy|"
+    r"step[- ]by[- ]step|trade-?offs?|compare|explain why|production|scal(?:e|able|ing))\b",
+    re.IGNORECASE,
+)
+_ERROR_PATTERN = re.compile(r"Traceback \(most recent call last\)|\bat \S+:\d+|Error:|Exception", re.IGNORECASE)
+
+SIMPLE_MAX_CHARS = 160
+COMPLEX_MIN_CHARS = 1500
+
+
+def classify_request(chat_history: str | list[dict[str, str]]) -> int:
+    """
+    Estimates the quality tier a request needs from its last user message.
+
+    This is a cheap heuristic (no model call): short plain questions are `TIER_SIMPLE`;
+    code, stack traces, long prompts and build/design/debug requests are `TIER_COMPLEX`;
+    everything else is `TIER_STANDARD`.
+    """
+    if isinstance(chat_history, str):
+        text, turns = chat_history, 1
+    else:
+        user_messages = [m["content"] for m in chat_history if m.get("role") == "user"]
+        text, turns = (user_messages[-1] if user_messages else ""), len(user_messages)
+
+    if "```" in text or len(text) >= COMPLEX_MIN_CHARS or _COMPLEX_PATTERN.search(text) or _ERROR_PATTERN.search(text):
+        return TIER_COMPLEX
+    if len(text) <= SIMPLE_MAX_CHARS and turns <= 3:
+        return TIER_SIMPLE
+    return TIER_STANDARD
+
+
+@dataclass
+class ModelStats:
+    """Exponentially weighted latency and error rate observed for one model."""
+    latency: Optional[float] = None  # Seconds per model turn
+    error_rate: float = 0.0
+    requests: int = 0
+    errors: int = 0
+
+
+class ModelRouter:
+    """
+    Picks the model for each request from `MODEL_TIERS`.
+
+    Every model whose tier meets the request's tier (and `ROUTING_MIN_TIER`) is a
+    candidate. Candidates are ordered by observed latency, penalized by their recent
+    error rate; models without observations are assumed slower the higher their tier,
+    so cheap models are tried first. The first candidate is used and the next ones are
+    fallbacks.
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[dict[str, int]] = None,
+        min_tier: Optional[int] = None,
+        smoothing: float = 0.2,
+        error_penalty: float = 4.0,
+    ):
+        self.tiers = tiers or settings.MODEL_TIERS
+        self.min_tier = min_tier or settings.ROUTING_MIN_TIER
+        self.smoothing = smoothing
+        self.error_penalty = error_penalty
+        self.stats: dict[str, ModelStats] = {model: ModelStats() for model in self.tiers}
+
+    def _score(self, model: str) -> float:
+        stats = self.stats[model]
+        latency = stats.latency if stats.latency is not None else 2.0 * self.tiers[model]
+        return latency * (1 + self.error_penalty * stats.error_rate)
+
+    def route(self, chat_history: str | list[dict[str, str]]) -> list[str]:
+        """
+        Returns the models to try for a request, preferred model first.
+        """
+        tier = max(classify_request(chat_history), self.min_tier)
+        candidates = [model for model, model_tier in self.tiers.items() if model_tier >= tier]
+        if not candidates:
+            # Nothing configured at this tier; use the most capable models available
+            top = max(self.tiers.values())
+            candidates = [model for model, model_tier in self.tiers.items() if model_tier == top]
+        candidates.sort(key=self._score)
+        logger.debug(f"Routing tier {tier} request to {candidates[0]} (fallbacks: {candidates[1:]})")
+        return candidates
+
+    def record(self, model: str, latency: Optional[float], error: bool) -> None:
+        """Updates a model's latency (seconds per model turn) and error rate."""
+        stats = self.stats.setdefault(model, ModelStats())
+        stats.requests += 1
+        stats.errors += int(error)
+        stats.error_rate += self.smoothing * (float(error) - stats.error_rate)
+        if latency is not None and not error:
+            stats.latency = latency if stats.latency is None else stats.latency + self.smoothing * (latency - stats.latency)
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Returns the process-wide model router, so latency observations are shared."""
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from mcp import Tool as MCPTool
+from mcp.types import CallToolResult
+
+from agents.mcp import MCPServer
+
+from .config import settings
+from .mcp_proxy import MCPServerProxy
+
+logger = logging.getLogger(__name__)
+
+
+def make_schema_key(name: str, params: dict[str, Any]) -> str:
+    """
+    Builds the cache key for a server from its name and launch parameters.
+
+    The command and args carry the package version (e.g. `tavily-mcp@0.1.2`), so any
+    change to the server's configuration or version produces a new key.
+    """
+    payload = json.dumps({"name": name, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolSchemaCache:
+    """
+    `list_tools` results of MCP servers, persisted to a JSON file.
+
+    Only entries for servers in the current configuration are written back, so entries
+    for removed or changed servers are dropped on the next save.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._active_keys: set[str] = set()
+        try:
+            self._entries: dict[str, list[dict[str, Any]]] = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable MCP tool schema cache {path}: {e}")
+            self._entries = {}
+
+    def get(self, key: str) -> Optional[list[MCPTool]]:
+        entry = self._entries.get(key)
+        return [MCPTool.model_validate(tool) for tool in entry] if entry is not None else None
+
+    def set(self, key: str, tools: list[MCPTool]) -> None:
+        entry = [tool.model_dump(mode="json", exclude_none=True) for tool in tools]
+        if self._entries.get(key) == entry:
+            return
+        self._entries[key] = entry
+        self._save()
+
+    def _save(self) -> None:
+        with self._lock:
+            entries = {key: value for key, value in self._entries.items() if key in self._active_keys}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(entries), encoding="utf-8")
+                tmp_path.replace(self.path)
+            except OSError as e:
+                logger.warning(f"Could not write the MCP tool schema cache: {e}")
+
+    def wrap(self, server: MCPServer, params: dict[str, Any]) -> "SchemaCachedMCPServer":
+        """Wraps a server configured with `params` so its tool list is served from the cache."""
+        key = make_schema_key(server.name, params)
+        self._active_keys.add(key)
+        return SchemaCachedMCPServer(server, self, key)
+
+
+class SchemaCachedMCPServer(MCPServerProxy):
+    """
+    MCP server wrapper that can be used before the server has finished starting.
+
+    Until the server is connected, `list_tools` answers from the schema cache (if the
+    server has been seen before) and `call_tool` waits for the connection. Once
+    connected, the tool list fetched at startup is served from memory and saved to the
+    cache. If the server fails to start, it reports no tools and its calls fail.
+    """
+
+    def __init__(self, server: MCPServer, cache: ToolSchemaCache, key: str):
+        super().__init__(server)
+        self.cache = cache
+        self.key = key
+        self._ready = asyncio.Event()
+        self._tools: Optional[list[MCPTool]] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set() and self._error is None
+
+    async def connect(self):
+        self._error = None
+        try:
+            await self.server.connect()
+            self._tools = await self.server.list_tools()
+        except BaseException as e:
+            # Also covers cancellation when the startup times out
+            self._error = e
+            self._ready.set()
+            raise
+        self.cache.set(self.key, self._tools)
+        self._ready.set()
+
+    async def cleanup(self):
+        self._error = RuntimeError("the server was stopped")
+        self._ready.set()
+        await self.server.cleanup()
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> None:
+        """Waits until the server is connected; raises if it failed to start."""
+        timeout = timeout if timeout is not None else settings.MCP_STARTUP_TIMEOUT
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        if self._error is not None:
+            raise RuntimeError(f"MCP server '{self.name}' is not available: {self._error!r}")
+
+    async def list_tools(self) -> list[MCPTool]:
+        if not self._ready.is_set():
+            cached = self.cache.get(self.key)
+            if cached is not None:
+                return cached
+            await asyncio.wait_for(self._ready.wait(), settings.MCP_STARTUP_TIMEOUT)
+        if self._error is not None:
+            return []
+        return list(self._tools)
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        await self.wait_ready()
+        return await self.server.call_tool(tool_name, arguments)
+
+
+_schema_cache: Optional[ToolSchemaCache] = None
+
+
+def get_tool_schema_cache() -> Optional[ToolSchemaCache]:
+    """Returns the process-wide tool schema cache, or None if `MCP_SCHEMA_CACHE_PATH` is unset."""
+    global _schema_cache
+    if _schema_cache is None and settings.MCP_SCHEMA_CACHE_PATH:
+        _schema_cache = ToolSchemaCache(settings.MCP_SCHEMA_CACHE_PATH)
+    return _schema_cache
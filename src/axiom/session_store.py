@@ -0,0 +1,184 @@
+import abc
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .config import settings
+from .history import ChatHistory, Message
+
+logger = logging.getLogger(__name__)
+
+_PRUNE_INTERVAL_SECONDS = 60 * 60
+
+
+class SessionStore(abc.ABC):
+    """Persistent storage for chat messages, keyed by session id."""
+
+    @abc.abstractmethod
+    async def append(self, session_id: str, message: Message) -> None:
+        """Appends one message to a session."""
+        pass
+
+    @abc.abstractmethod
+    async def load_recent(self, session_id: str, limit: int) -> list[Message]:
+        """Returns the last `limit` messages of a session, oldest first."""
+        pass
+
+    @abc.abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """Deletes every message of a session."""
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    `SessionStore` backed by a SQLite file.
+
+    Messages are appended one row at a time and read back newest-first with a limit,
+    so neither operation depends on the length of the session. WAL mode lets several
+    UI worker processes share the same file. Sessions without a new message for
+    `max_age_seconds` are deleted when the file is opened and at most hourly after that.
+    """
+
+    def __init__(self, path: Path, max_age_seconds: Optional[float] = None):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id)")
+            self._conn.commit()
+        if self.max_age_seconds and time.time() - self._pruned_at >= _PRUNE_INTERVAL_SECONDS:
+            self._prune(self._conn)
+        return self._conn
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Deletes sessions whose newest message is older than `max_age_seconds`."""
+        now = time.time()
+        self._pruned_at = now
+        deleted = conn.execute(
+            "DELETE FROM messages WHERE session_id IN "
+            "(SELECT session_id FROM messages GROUP BY session_id HAVING MAX(created_at) < ?)",
+            (now - self.max_age_seconds,),
+        ).rowcount
+        conn.commit()
+        if deleted:
+            logger.info(f"Deleted {deleted} message(s) of expired sessions from the session store.")
+
+    def _append(self, session_id: str, message: Message) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, message["role"], message["content"], time.time()),
+            )
+            conn.commit()
+
+    def _load_recent(self, session_id: str, limit: int) -> list[Message]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, limit),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def _delete(self, session_id: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.commit()
+
+    async def append(self, session_id: str, message: Message) -> None:
+        await asyncio.to_thread(self._append, session_id, message)
+
+    async def load_recent(self, session_id: str, limit: int) -> list[Message]:
+        return await asyncio.to_thread(self._load_recent, session_id, limit)
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._delete, session_id)
+
+
+class SessionManager:
+    """
+    Keeps the chat histories of active sessions in memory and evicts idle ones.
+
+    Histories are write-through to the `SessionStore`, so an evicted session is
+    rebuilt lazily from its most recent messages the next time it is used. Without a
+    store, eviction loses the history: `evict` then keeps the session, and only idle or
+    capacity eviction drops it.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        idle_seconds: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+    ):
+        self.store = store
+        self.idle_seconds = idle_seconds or settings.SESSION_IDLE_SECONDS
+        self.max_sessions = max_sessions or settings.SESSION_MAX_IN_MEMORY
+        self._sessions: OrderedDict[str, tuple[float, ChatHistory]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_history(self, session_id: str) -> ChatHistory:
+        """Returns the history for a session, creating it (lazily loaded) if needed."""
+        self._evict_idle()
+        entry = self._sessions.pop(session_id, None)
+        history = entry[1] if entry else ChatHistory(session_id=session_id, store=self.store)
+        self._sessions[session_id] = (time.monotonic(), history)
+
+        while len(self._sessions) > self.max_sessions:
+            evicted_id, _ = self._sessions.popitem(last=False)
+            logger.debug(f"Evicted session '{evicted_id}' from memory (capacity).")
+        return history
+
+    def evict(self, session_id: str) -> None:
+        """Drops a session from memory. Its messages stay in the store."""
+        if self.store is None:
+            return  # It could not be reloaded (e.g. after a reconnect)
+        self._sessions.pop(session_id, None)
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if last_used > cutoff:
+                break
+            self._sessions.popitem(last=False)
+            logger.debug(f"Evicted idle session '{session_id}' from memory.")
+
+
+_session_manager: Optional[SessionManager] = None
+
+
+def get_session_manager() -> SessionManager:
+    """Returns the process-wide session manager configured from settings."""
+    global _session_manager
+    if _session_manager is None:
+        store = None
+        if settings.SESSION_STORE_PATH:
+            store = SQLiteSessionStore(settings.SESSION_STORE_PATH, max_age_seconds=settings.SESSION_RETENTION_DAYS * 24 * 60 * 60)
+        _session_manager = SessionManager(store=store)
+    return _session_manager
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from mcp.types import CallToolResult
+
+from agents.mcp import MCPServer
+
+from .mcp_proxy import MCPServerProxy
+from .tool_cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller starts the call; callers arriving while it runs await the same
+    future and receive the same result (or exception). The shared call is only
+    cancelled when every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, tuple[asyncio.Future, list[int]]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        entry = self._in_flight.get(key)
+        if entry is None:
+            future = asyncio.ensure_future(func())
+            entry = (future, [0])
+            self._in_flight[key] = entry
+            future.add_done_callback(lambda _, entry=entry: self._forget(key, entry))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        future, waiters = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if waiters[0] == 1 and not future.done():
+                # Forget the call now so a caller arriving before the done callback runs starts a new one
+                self._forget(key, entry)
+                future.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _forget(self, key: str, entry: tuple[asyncio.Future, list[int]]) -> None:
+        """Removes `entry` from the in-flight calls unless a newer call has replaced it."""
+        if self._in_flight.get(key) is entry:
+            del self._in_flight[key]
+
+
+class CoalescingMCPServer(MCPServerProxy):
+    """MCP server wrapper that shares one call between concurrent identical tool calls."""
+
+    def __init__(self, server: MCPServer, single_flight: SingleFlight):
+        super().__init__(server)
+        self.single_flight = single_flight
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        key = f"{self.name}:{make_cache_key(tool_name, arguments)}"
+        return await self.single_flight.do(key, lambda: self.server.call_tool(tool_name, arguments))
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Returns the process-wide single-flight group for MCP tool calls."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,92 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from typing_extensions import AsyncGenerator
+
+from .config import settings
+
+
+async def coalesce_tokens(
+    stream: AsyncIterator[str],
+    max_chars: Optional[int] = None,
+    max_delay: Optional[float] = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Groups small streamed tokens into larger chunks.
+
+    A chunk is flushed as soon as it holds `max_chars` characters or its first token
+    has waited `max_delay` seconds, whichever comes first, so a stalled stream (e.g.
+    while a tool runs) never holds back text that was already generated.
+
+    Args:
+        stream: The token stream to coalesce (e.g. `AxiomAgent.stream_agent(...)`).
+        max_chars: Flush threshold in characters. Defaults to `settings.STREAM_COALESCE_MAX_CHARS`.
+        max_delay: Flush window in seconds. Defaults to `settings.STREAM_COALESCE_MAX_DELAY_MS`.
+
+    Yields:
+        The same text as `stream`, in fewer and larger chunks.
+    """
+    max_chars = max_chars if max_chars is not None else settings.STREAM_COALESCE_MAX_CHARS
+    max_delay = max_delay if max_delay is not None else settings.STREAM_COALESCE_MAX_DELAY_MS / 1000
+
+    if max_chars <= 1 or max_delay <= 0:
+        try:
+            async for token in stream:
+                yield token
+        finally:
+            await _aclose(stream)
+        return
+
+    loop = asyncio.get_running_loop()
+    iterator = stream.__aiter__()
+    buffer: list[str] = []
+    buffered_chars = 0
+    deadline = 0.0
+    pending: Optional[asyncio.Future] = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+            if not done:
+                # The time window elapsed before the next token arrived
+                yield "".join(buffer)
+                buffer.clear()
+                buffered_chars = 0
+                continue
+
+            try:
+                token = pending.result()
+            except StopAsyncIteration:
+                pending = None
+                break
+            pending = None
+
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer.append(token)
+            buffered_chars += len(token)
+
+            if buffered_chars >= max_chars:
+                yield "".join(buffer)
+                buffer.clear()
+                buffered_chars = 0
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        # Close the source right away so a stopped consumer also stops the agent run
+        await _aclose(iterator)
+
+
+async def _aclose(stream: AsyncIterator[str]) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        await aclose()
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+import anyio
+from mcp import Tool as MCPTool
+from mcp.client.session import ClientSession
+from mcp.types import CallToolResult
+
+from agents.mcp import MCPServer
+
+from .config import settings, load_mcp_server_factories
+from .mcp_pool import MCPServerHandle
+from .mcp_proxy import MCPServerProxy
+from .schema_cache import ToolSchemaCache
+
+logger = logging.getLogger(__name__)
+
+# Raised by the stdio transport once the server process has exited
+_TRANSPORT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+
+def _client_session(server: MCPServer) -> Optional[ClientSession]:
+    while isinstance(server, MCPServerProxy):
+        server = server.server
+    return getattr(server, "session", None)
+
+
+class SupervisedMCPServer(MCPServerProxy):
+    """
+    An MCP server kept running by a supervisor task.
+
+    Each process runs in its own `MCPServerHandle`, created from `factory`. The
+    supervisor pings the server every `health_interval` seconds and replaces it when a
+    ping fails or times out; tool calls that hit a dead process trigger the same restart
+    and are retried once on the new process. Consecutive failed restarts back off
+    exponentially. A server without tool calls for `idle_timeout` seconds is stopped and
+    started again by the next call, while `list_tools` keeps answering from the last
+    listing. With `warm_spare`, a second started instance is kept to replace a crashed
+    one without waiting for a cold start.
+
+    `connect` only succeeds if the first start does; servers that never started are
+    not retried.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], MCPServer],
+        health_interval: Optional[float] = None,
+        health_timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        warm_spare: bool = False,
+    ):
+        super().__init__(factory())
+        self.factory = factory
+        self.health_interval = health_interval or settings.MCP_HEALTH_CHECK_INTERVAL
+        self.health_timeout = health_timeout or settings.MCP_HEALTH_CHECK_TIMEOUT
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings.MCP_IDLE_TIMEOUT
+        self.warm_spare = warm_spare
+
+        self._handle: Optional[MCPServerHandle] = None
+        self._spare: Optional[MCPServerHandle] = None
+        self._starting: Optional[asyncio.Task] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._spare_task: Optional[asyncio.Task] = None
+        self._stopping: set[asyncio.Task] = set()
+        self._stopped = True
+        self._tools: Optional[list[MCPTool]] = None
+        self._failures = 0  # Consecutive crashes or failed restarts
+        self._in_flight = 0
+        self._last_used = time.monotonic()
+
+        self.restarts = 0
+        self.crashes = 0
+        self.reaped = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._handle is not None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "restarts": self.restarts,
+            "crashes": self.crashes,
+            "reaped": self.reaped,
+            "spare": self._spare is not None,
+        }
+
+    async def connect(self):
+        self._stopped = False
+        self._starting = asyncio.create_task(self._launch(self.server))
+        try:
+            await self._starting
+        except BaseException:
+            self._stopped = True
+            raise
+        finally:
+            self._starting = None
+        self._monitor = asyncio.create_task(self._supervise(), name=f"mcp-supervisor:{self.name}")
+
+    async def cleanup(self):
+        self._stopped = True
+        tasks = [task for task in (self._monitor, self._starting, self._spare_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        handles = [handle for handle in (self._handle, self._spare) if handle is not None]
+        self._handle = self._spare = None
+        await asyncio.gather(*(handle.stop() for handle in handles), *self._stopping)
+
+    async def _launch(self, server: MCPServer) -> None:
+        handle = MCPServerHandle(server)
+        await handle.start(timeout=settings.MCP_STARTUP_TIMEOUT)
+        self.server, self._handle = server, handle
+        self._last_used = time.monotonic()
+        if self.warm_spare and self._spare is None and self._spare_task is None:
+            self._spare_task = asyncio.create_task(self._start_spare())
+
+    async def _start_spare(self) -> None:
+        handle = MCPServerHandle(self.factory())
+        try:
+            await handle.start(timeout=settings.MCP_STARTUP_TIMEOUT)
+            self._spare = handle
+        except Exception as e:
+            logger.warning(f"Could not start a spare for MCP server '{self.name}': {e}")
+        finally:
+            self._spare_task = None
+
+    async def _take_spare(self) -> bool:
+        spare, self._spare = self._spare, None
+        if spare is None:
+            return False
+        if spare.is_running and await self._ping(spare.server):
+            self.server, self._handle = spare.server, spare
+            self._spare_task = asyncio.create_task(self._start_spare())
+            return True
+        self._stop_in_background(spare)
+        return False
+
+    def _backoff(self) -> float:
+        # The first restart after a crash is immediate; repeated failures back off
+        if self._failures <= 1:
+            return 0.0
+        return min(settings.MCP_RESTART_BACKOFF_MAX, settings.MCP_RESTART_BACKOFF_BASE * 2 ** (self._failures - 2))
+
+    async def _restart(self) -> None:
+        try:
+            while not self._stopped:
+                if await self._take_spare():
+                    logger.info(f"MCP server '{self.name}' switched to its warm spare.")
+                    self.restarts += 1
+                    return
+                delay = self._backoff()
+                if delay:
+                    await asyncio.sleep(delay)
+                started_at = time.perf_counter()
+                try:
+                    await self._launch(self.factory())
+                except Exception as e:
+                    self._failures += 1
+                    logger.warning(f"Restart of MCP server '{self.name}' failed: {e}")
+                    continue
+                self.restarts += 1
+                logger.info(f"MCP server '{self.name}' restarted in {time.perf_counter() - started_at:.2f}s.")
+                return
+        finally:
+            self._starting = None
+
+    def _stop_in_background(self, handle: MCPServerHandle) -> None:
+        task = asyncio.create_task(handle.stop())
+        self._stopping.add(task)
+        task.add_done_callback(self._stopping.discard)
+
+    def _crashed(self, handle: MCPServerHandle, reason: str) -> None:
+        """Replaces a dead server process, unless that already happened."""
+        if self._handle is not handle:
+            return
+        logger.warning(f"MCP server '{self.name}' is unhealthy ({reason}); restarting it.")
+        self.crashes += 1
+        self._failures += 1
+        self._handle = None
+        self._stop_in_background(handle)
+        if self._starting is None and not self._stopped:
+            self._starting = asyncio.create_task(self._restart())
+
+    async def _reap(self, handle: MCPServerHandle) -> None:
+        idle = time.monotonic() - self._last_used
+        logger.info(f"Stopping MCP server '{self.name}' after {idle:.0f}s without tool calls.")
+        self.reaped += 1
+        self._handle = None
+        spare, self._spare = self._spare, None
+        await asyncio.gather(*(h.stop() for h in (handle, spare) if h is not None))
+
+    async def _ping(self, server: MCPServer) -> bool:
+        session = _client_session(server)
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), self.health_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _supervise(self) -> None:
+        while not self._stopped:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self._check()
+            except Exception:
+                # A failed check must not end supervision; try again on the next interval
+                logger.exception(f"Health check of MCP server '{self.name}' failed unexpectedly.")
+
+    async def _check(self) -> None:
+        """Reaps an idle server, or restarts one whose process exited or stopped answering pings."""
+        handle = self._handle
+        if handle is None or self._starting is not None:
+            return
+        if self.idle_timeout and not self._in_flight and time.monotonic() - self._last_used > self.idle_timeout:
+            await self._reap(handle)
+        elif not handle.is_running:
+            self._crashed(handle, "process exited")
+        elif not await self._ping(handle.server):
+            self._crashed(handle, "health ping failed")
+        else:
+            self._failures = 0
+
+    async def _acquire(self) -> MCPServerHandle:
+        """Returns the running server, (re)starting it first if it is down or reaped."""
+        while self._handle is None:
+            if self._stopped:
+                raise RuntimeError(f"MCP server '{self.name}' is not running.")
+            if self._starting is None:
+                self._starting = asyncio.create_task(self._restart())
+            try:
+                await asyncio.wait_for(asyncio.shield(self._starting), settings.MCP_STARTUP_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"MCP server '{self.name}' did not restart in time.") from None
+            except asyncio.CancelledError:
+                if self._stopped and not asyncio.current_task().cancelling():
+                    raise RuntimeError(f"MCP server '{self.name}' was stopped.") from None
+                raise
+            except Exception as e:
+                raise RuntimeError(f"MCP server '{self.name}' is not available: {e}") from e
+        return self._handle
+
+    async def list_tools(self) -> list[MCPTool]:
+        handle = self._handle
+        if handle is None:
+            if self._tools is not None:
+                return list(self._tools)  # Reaped or restarting: the last listing is still valid
+            if self._starting is not None:
+                return await self.server.list_tools()  # First start; the schema cache may answer
+            handle = await self._acquire()
+        try:
+            self._tools = await handle.server.list_tools()
+        except _TRANSPORT_ERRORS:
+            self._crashed(handle, "connection closed")
+            if self._tools is None:
+                raise
+        return list(self._tools)
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self._in_flight += 1
+        try:
+            handle = await self._acquire()
+            try:
+                return await handle.server.call_tool(tool_name, arguments)
+            except _TRANSPORT_ERRORS:
+                # The process died under this call; retry once on its replacement
+                self._crashed(handle, "connection closed")
+                handle = await self._acquire()
+                return await handle.server.call_tool(tool_name, arguments)
+        finally:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+
+def load_supervised_mcp_servers(
+    pool_sizes: Optional[dict[str, int]] = None,
+    schema_cache: Optional[ToolSchemaCache] = None,
+) -> list[SupervisedMCPServer]:
+    """
+    Like `load_mcp_servers_from_config`, but every instance is a `SupervisedMCPServer`.
+    """
+    factories = load_mcp_server_factories(schema_cache=schema_cache)
+    return [
+        SupervisedMCPServer(factory, warm_spare=name in settings.MCP_WARM_SPARES)
+        for name, factory in factories.items()
+        for _ in range(max(1, (pool_sizes or {}).get(name, 1)))
+    ]
@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from mcp.types import CallToolResult, TextContent
+
+from agents.mcp import MCPServer
+
+from .config import settings
+from .mcp_proxy import MCPServerProxy
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: Any) -> Any:
+    """Normalizes tool arguments so equivalent calls share a cache key."""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+# Arguments matched case-insensitively upstream, so "FastAPI" and "fastapi" share a key
+_CASE_INSENSITIVE_ARGUMENTS: dict[str, set[str]] = {"resolve-library-id": {"libraryName"}}
+
+
+def make_cache_key(tool_name: str, arguments: Optional[dict[str, Any]]) -> str:
+    """Builds a cache key from the tool name and its normalized arguments."""
+    arguments = dict(arguments or {})
+    for name in _CASE_INSENSITIVE_ARGUMENTS.get(tool_name, ()):
+        if isinstance(arguments.get(name), str):
+            arguments[name] = arguments[name].lower()
+    payload = json.dumps([tool_name, _normalize(arguments)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Replies Context7 sends when it has nothing for a query, e.g. "No libraries found matching ..."
+_EMPTY_RESULT_PATTERN = re.compile(
+    r"\b(no (libraries|documentation|results|matches)\b.{0,40}\b(found|available)|not found)\b",
+    re.IGNORECASE,
+)
+
+
+def is_empty_result(result: CallToolResult) -> bool:
+    """Returns True if a tool result has no text or only says nothing was found."""
+    text = "".join(item.text for item in result.content if isinstance(item, TextContent)).strip()
+    return not text or (len(text) < 500 and _EMPTY_RESULT_PATTERN.search(text) is not None)
+
+
+class ToolResultCache:
+    """
+    Two-level cache for MCP tool results.
+
+    Results live in an in-memory LRU backed by an optional SQLite store, so they survive
+    restarts and are shared by every process using the same file. Only tools with a TTL
+    in `ttls` are cached; empty results are kept for at most `empty_result_ttl`. The disk
+    store is trimmed to `max_disk_bytes` by evicting the least recently used entries.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttls: Optional[dict[str, float]] = None,
+        empty_result_ttl: float = 5 * 60,
+        max_memory_entries: int = 256,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.path = path
+        self.ttls = ttls or {}
+        self.empty_result_ttl = empty_result_ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return self.ttls.get(tool_name, 0) > 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit/miss counters for the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+        }
+
+    # --- In-memory LRU ---
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    # --- SQLite store ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS tool_cache (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_cache_accessed ON tool_cache(accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[tuple[float, str]]:
+        with self._db_lock:
+            conn = self._connect()
+            row = conn.execute("SELECT expires_at, value FROM tool_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[0] <= now:
+                conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE tool_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0], row[1]
+
+    def _disk_set(self, key: str, tool_name: str, value: str, expires_at: float) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            now = time.time()
+            size = len(value.encode("utf-8"))
+            conn.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, tool, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, tool_name, value, size, expires_at, now),
+            )
+            conn.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (now,))
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tool_cache").fetchone()[0]
+            while total > self.max_disk_bytes:
+                row = conn.execute("SELECT key, size FROM tool_cache ORDER BY accessed_at LIMIT 1").fetchone()
+                if row is None:
+                    break
+                conn.execute("DELETE FROM tool_cache WHERE key = ?", (row[0],))
+                total -= row[1]
+                self.evictions += 1
+            conn.commit()
+
+    # --- Public API ---
+    async def get(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> Optional[str]:
+        """Returns the cached (serialized) result for a tool call, or None on a miss."""
+        key = make_cache_key(tool_name, arguments)
+        value = self._memory_get(key)
+
+        if value is None and self.path is not None:
+            try:
+                entry = await asyncio.to_thread(self._disk_get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Tool cache read failed: {e}")
+                entry = None
+            if entry is not None:
+                expires_at, value = entry
+                self._memory_set(key, value, expires_at)
+                self.disk_hits += 1
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, tool_name: str, arguments: Optional[dict[str, Any]], value: str, empty: bool = False) -> None:
+        """Stores a serialized tool result using the tool's TTL, capped at `empty_result_ttl` if `empty`."""
+        ttl = self.ttls.get(tool_name, 0)
+        if empty:
+            ttl = min(ttl, self.empty_result_ttl)
+        if ttl <= 0:
+            return
+        key = make_cache_key(tool_name, arguments)
+        expires_at = time.time() + ttl
+        self._memory_set(key, value, expires_at)
+
+        if self.path is not None:
+            try:
+                await asyncio.to_thread(self._disk_set, key, tool_name, value, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"Tool cache write failed: {e}")
+
+
+class CachedMCPServer(MCPServerProxy):
+    """MCP server wrapper that answers repeated tool calls from a `ToolResultCache`."""
+
+    def __init__(self, server: MCPServer, cache: ToolResultCache):
+        super().__init__(server)
+        self.cache = cache
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        if not self.cache.is_cacheable(tool_name):
+            return await self.server.call_tool(tool_name, arguments)
+
+        cached = await self.cache.get(tool_name, arguments)
+        if cached is not None:
+            return CallToolResult.model_validate_json(cached)
+
+        result = await self.server.call_tool(tool_name, arguments)
+        if not result.isError:
+            await self.cache.set(tool_name, arguments, result.model_dump_json(), empty=is_empty_result(result))
+        return result
+
+
+_tool_cache: Optional[ToolResultCache] = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Returns the process-wide tool result cache configured from settings."""
+    global _tool_cache
+    if _tool_cache is None:
+        _tool_cache = ToolResultCache(
+            path=settings.TOOL_CACHE_PATH,
+            ttls=settings.TOOL_CACHE_TTLS,
+            empty_result_ttl=settings.TOOL_CACHE_EMPTY_RESULT_TTL,
+            max_memory_entries=settings.TOOL_CACHE_MAX_MEMORY_ENTRIES,
+            max_disk_bytes=settings.TOOL_CACHE_MAX_DISK_MB * 1024 * 1024,
+        )
+    return _tool_cache
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional
+
+from agents import OpenAIChatCompletionsModel, TResponseInputItem, function_tool
+from agents.items import TResponseStreamEvent
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPAND_TOOL_NAME = "expand-tool-output"
+
+
+class ToolOutputStore:
+    """
+    Keeps full tool outputs out of band, addressed by a short content hash.
+
+    An LRU bounded by total characters, so long sessions cannot grow it without limit.
+    """
+
+    def __init__(self, max_chars: int = 20_000_000):
+        self.max_chars = max_chars
+        self._outputs: OrderedDict[str, str] = OrderedDict()
+        self._chars = 0
+
+    @staticmethod
+    def make_ref(output: str) -> str:
+        return hashlib.sha256(output.encode("utf-8")).hexdigest()[:12]
+
+    def put(self, output: str) -> str:
+        ref = self.make_ref(output)
+        if ref in self._outputs:
+            self._outputs.move_to_end(ref)
+            return ref
+        self._outputs[ref] = output
+        self._chars += len(output)
+        while self._chars > self.max_chars and len(self._outputs) > 1:
+            _, evicted = self._outputs.popitem(last=False)
+            self._chars -= len(evicted)
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        output = self._outputs.get(ref)
+        if output is not None:
+            self._outputs.move_to_end(ref)
+        return output
+
+
+def _is_model_output(item: Any) -> bool:
+    return isinstance(item, dict) and (item.get("type") == "function_call" or item.get("role") == "assistant")
+
+
+def compact_tool_outputs(
+    items: list[TResponseInputItem],
+    store: ToolOutputStore,
+    max_chars: int,
+    excerpt_chars: int,
+) -> tuple[list[TResponseInputItem], int]:
+    """
+    Shrinks the tool outputs in a model input.
+
+    Outputs the model has not seen yet (those after its last tool call or message) are
+    left intact. Older outputs are compacted: repeated payloads keep only their latest
+    copy, and outputs longer than `max_chars` are stored in `store` and replaced by an
+    excerpt with a reference the model can pass to `expand-tool-output`.
+
+    Returns:
+        The compacted input and the number of characters removed.
+    """
+    last_model_output = max((i for i, item in enumerate(items) if _is_model_output(item)), default=-1)
+    tool_names = {
+        item.get("call_id"): item.get("name")
+        for item in items
+        if isinstance(item, dict) and item.get("type") == "function_call"
+    }
+
+    # Index of the last occurrence of each payload, so duplicates can point to it
+    latest: dict[str, int] = {}
+    for i, item in enumerate(items):
+        if isinstance(item, dict) and item.get("type") == "function_call_output" and isinstance(item.get("output"), str):
+            latest[item["output"]] = i
+
+    compacted: list[TResponseInputItem] = []
+    removed = 0
+    for i, item in enumerate(items):
+        output = item.get("output") if isinstance(item, dict) and item.get("type") == "function_call_output" else None
+        if not isinstance(output, str) or i > last_model_output:
+            compacted.append(item)
+            continue
+
+        tool = tool_names.get(item.get("call_id")) or "tool"
+        if latest[output] != i and len(output) > excerpt_chars:
+            stub = f"[Same output as the later {tool} call {items[latest[output]].get('call_id')}]"
+        elif len(output) > max_chars:
+            ref = store.put(output)
+            stub = (
+                f"{output[:excerpt_chars]}\n\n[... {tool} output truncated: showing {excerpt_chars} of "
+                f"{len(output)} characters. Call {EXPAND_TOOL_NAME} with ref \"{ref}\" to read the rest.]"
+            )
+        else:
+            compacted.append(item)
+            continue
+
+        removed += len(output) - len(stub)
+        compacted.append({**item, "output": stub})
+    return compacted, removed
+
+
+class CompactingChatCompletionsModel(OpenAIChatCompletionsModel):
+    """
+    `OpenAIChatCompletionsModel` that compacts earlier tool outputs before every turn.
+
+    The SDK resends the run's whole input (including every tool output) on each model
+    turn; this keeps large outputs the model has already read from being resent in full.
+    """
+
+    def __init__(self, *args: Any, store: ToolOutputStore, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.store = store
+        self.max_chars = settings.TOOL_OUTPUT_COMPACT_CHARS
+        self.excerpt_chars = settings.TOOL_OUTPUT_EXCERPT_CHARS
+
+    def _compact(self, input: str | list[TResponseInputItem]) -> str | list[TResponseInputItem]:
+        if isinstance(input, str):
+            return input
+        compacted, removed = compact_tool_outputs(input, self.store, self.max_chars, self.excerpt_chars)
+        if removed:
+            logger.debug(f"Compacted tool outputs in the model input: {removed} characters removed.")
+        return compacted
+
+    async def get_response(self, system_instructions, input, *args: Any, **kwargs: Any):
+        return await super().get_response(system_instructions, self._compact(input), *args, **kwargs)
+
+    def stream_response(self, system_instructions, input, *args: Any, **kwargs: Any) -> AsyncIterator[TResponseStreamEvent]:
+        return super().stream_response(system_instructions, self._compact(input), *args, **kwargs)
+
+
+_tool_output_store: Optional[ToolOutputStore] = None
+
+
+def get_tool_output_store() -> ToolOutputStore:
+    """Returns the process-wide store of compacted tool outputs."""
+    global _tool_output_store
+    if _tool_output_store is None:
+        _tool_output_store = ToolOutputStore()
+    return _tool_output_store
+
+
+@function_tool(name_override=EXPAND_TOOL_NAME)
+async def expand_tool_output(ref: str, start: int, max_chars: int) -> str:
+    """
+    Returns part of a tool output that was truncated earlier in this conversation.
+
+    Args:
+        ref: The reference shown in the truncated output.
+        start: Character offset to start reading from (0 for the beginning).
+        max_chars: Maximum number of characters to return (up to 20000).
+    """
+    output = get_tool_output_store().get(ref)
+    if output is None:
+        return f"No stored output with ref \"{ref}\". Call the original tool again instead."
+    start = max(0, start)
+    end = start + max(1, min(max_chars, 20000))
+    remaining = len(output) - end
+    suffix = f"\n\n[{remaining} more characters; continue from start={end}.]" if remaining > 0 else ""
+    return output[start:end] + suffix
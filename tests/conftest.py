@@ -0,0 +1,4 @@
+import os
+
+# Settings are validated on first use; the tests never call the model
+os.environ.setdefault("GOOGLE_API_KEY", "test")
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from src.axiom.batch import load_completed_ids, run_batch
+from src.axiom.events import RunSummary
+
+
+class StubAgent:
+    """Answers each prompt after a short delay; "fail" and "crash" prompts error."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.prompts: list[str] = []
+
+    async def run_with_summary(self, chat_history):
+        prompt = chat_history[-1]["content"]
+        self.prompts.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.running -= 1
+        if prompt == "crash":
+            raise RuntimeError("connection reset")
+        if prompt == "fail":
+            return RunSummary(total_seconds=0.02, time_to_first_token=None, model_turns=1, tool_calls=0, error="All models failed.")
+        return RunSummary(total_seconds=0.02, time_to_first_token=None, model_turns=1, tool_calls=0, final_output=f"answer to {prompt}")
+
+
+def _write_prompts(path, prompts):
+    path.write_text("".join(json.dumps(prompt) + "\n" for prompt in prompts))
+
+
+def _read_results(path):
+    return {record["id"]: record for record in map(json.loads, path.read_text().splitlines())}
+
+
+def test_prompts_run_with_bounded_concurrency(tmp_path):
+    input_path, output_path = tmp_path / "prompts.jsonl", tmp_path / "results.jsonl"
+    _write_prompts(input_path, [{"prompt": f"q{i}"} for i in range(10)])
+    agent = StubAgent()
+
+    report = asyncio.run(run_batch(agent, input_path, output_path, workers=3))
+
+    assert agent.max_running == 3
+    assert (report.total, report.completed, report.failed) == (10, 10, 0)
+    assert len(report.latencies) == 10
+
+
+def test_failed_prompts_are_recorded_without_stopping_the_batch(tmp_path):
+    input_path, output_path = tmp_path / "prompts.jsonl", tmp_path / "results.jsonl"
+    _write_prompts(input_path, [
+        {"id": "a", "prompt": "hello"},
+        {"id": "b", "prompt": "fail"},
+        {"id": "c", "prompt": "crash"},
+        {"id": "d", "messages": [{"role": "user", "content": "earlier"}, {"role": "assistant", "content": "reply"}, {"role": "user", "content": "follow-up"}]},
+    ])
+
+    report = asyncio.run(run_batch(StubAgent(), input_path, output_path, workers=2))
+
+    results = _read_results(output_path)
+    assert (report.completed, report.failed) == (2, 2)
+    assert set(results["a"]) == {"id", "output", "error", "latency"}
+    assert (results["a"]["output"], results["a"]["error"]) == ("answer to hello", None)
+    assert (results["b"]["output"], results["b"]["error"]) == (None, "All models failed.")
+    assert (results["c"]["output"], results["c"]["error"]) == (None, "RuntimeError: connection reset")
+    assert results["d"]["output"] == "answer to follow-up"
+
+
+def test_resume_skips_prompts_that_already_succeeded(tmp_path):
+    input_path, output_path = tmp_path / "prompts.jsonl", tmp_path / "results.jsonl"
+    _write_prompts(input_path, [{"prompt": "hello"}, {"prompt": "fail"}])
+    asyncio.run(run_batch(StubAgent(), input_path, output_path))
+    with open(output_path, "a") as f:
+        f.write('{"id": "3", "out')  # Interrupted while writing
+
+    agent = StubAgent()
+    report = asyncio.run(run_batch(agent, input_path, output_path, resume=True))
+
+    assert agent.prompts == ["fail"]
+    assert (report.skipped, report.failed) == (1, 1)
+    assert load_completed_ids(output_path) == {"1"}
@@ -0,0 +1,32 @@
+import pytest
+
+from cli import MarkdownStream
+
+
+def _completed(text: str) -> str:
+    return text[:MarkdownStream._split_completed(text)]
+
+
+@pytest.mark.parametrize(
+    "text, completed",
+    [
+        # A paragraph is complete once the next block starts
+        ("para one\n\npara two\n", "para one\n\n"),
+        ("para one\n\n", ""),
+        # ... and the next block's first line is finished, since it could still turn out to be a list item
+        ("para one\n\npara t", ""),
+        # Loose lists stay whole until a block after them starts
+        ("1. a\n\n2. b\n\nText\n", "1. a\n\n2. b\n\n"),
+        ("- a\n\n  continued\n\n- b\n", ""),
+        # Code inside a list item does not end the list
+        ("- a\n\n  ```py\n  x\n\n  y\n  ```\n\nDone\n", "- a\n\n  ```py\n  x\n\n  y\n  ```\n\n"),
+        # A closed top-level fence is complete right away; blank lines inside it are not boundaries
+        ("```py\nx\n\ny\n```\nafter", "```py\nx\n\ny\n```\n"),
+        ("```py\nx\n\ny\n", ""),
+        ("Intro\n```\ncode\n```\n", "Intro\n```\ncode\n```\n"),
+        # Indented code blocks continue across blank lines
+        ("# H\n\n    code\n\n    more\n\nText\n", "# H\n\n    code\n\n    more\n\n"),
+    ],
+)
+def test_split_completed(text, completed):
+    assert _completed(text) == completed
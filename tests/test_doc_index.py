@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Optional
+
+from mcp.types import CallToolResult, TextContent
+
+from src.axiom import agent as agent_module
+from src.axiom.agent import AxiomAgent
+from src.axiom.doc_index import DocIndex, chunk_docs, tokenize
+from src.axiom.mcp_proxy import MCPServerProxy
+from src.axiom.tool_cache import ToolResultCache
+
+SEPARATOR = "\n\n----------------------------------------\n\n"
+
+
+class DocsServer(MCPServerProxy):
+    def __init__(self, docs: str):
+        super().__init__(None)
+        self.docs = docs
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "context7"
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self.calls += 1
+        return CallToolResult(content=[TextContent(type="text", text=self.docs)])
+
+
+def test_tokenize_splits_identifiers_and_drops_stopwords():
+    assert tokenize("How to use useEffect in the App.tsx file") == ["effect", "app", "tsx", "file"]
+
+
+def test_chunks_follow_separators_and_split_long_sections_outside_code():
+    assert chunk_docs(f"first{SEPARATOR}second\n") == ["first", "second"]
+
+    paragraph = "word " * 30
+    code = "```py\n" + "x = 1\n\n" * 10 + "```\n"
+    chunks = chunk_docs(f"{paragraph}\n\n{code}\n{paragraph}\n\n{paragraph}", max_chars=100)
+    assert all(chunk.count("```") % 2 == 0 for chunk in chunks)
+    assert any(code.strip() in chunk for chunk in chunks)
+    assert len(chunks) >= 3
+
+
+def test_bm25_ranks_the_most_relevant_chunk_first():
+    docs = SEPARATOR.join([
+        "Routing: define routes in the app directory. Dynamic routes use brackets.",
+        "Caching: fetch requests are cached by default.",
+        "Middleware runs before routes are matched.",
+    ])
+
+    async def main():
+        index = DocIndex()
+        await index.add("/vercel/next.js/v14.3.0", docs)
+        await index.add("/facebook/react", "Routes are not part of React itself.")
+        return (
+            await index.search("dynamic routes", top_k=2),
+            await index.search("routes", library="/vercel/next.js"),
+            await index.search("the"),
+        )
+
+    ranked, next_only, stopwords = asyncio.run(main())
+    assert ranked[0][1].startswith("Routing:")
+    assert ranked[0][2] > ranked[1][2]
+    assert {library for library, _, _ in next_only} == {"/vercel/next.js/v14.3.0"}
+    assert stopwords == []
+
+
+def test_duplicate_chunks_are_indexed_once():
+    async def main():
+        index = DocIndex()
+        return await index.add("/lib", f"a chunk{SEPARATOR}another"), await index.add("/lib", "a chunk"), len(index)
+
+    assert asyncio.run(main()) == (2, 0, 2)
+
+
+def test_least_recently_used_chunks_are_evicted(tmp_path):
+    path = tmp_path / "index.sqlite3"
+
+    async def main():
+        index = DocIndex(path=path, max_chunks=2)
+        await index.add("/lib", "alpha routing")
+        await index.add("/lib", "beta caching")
+        await index.search("alpha")  # "beta caching" is now the least recently used
+        await index.add("/lib", "gamma streaming")
+        texts = [text for _, text, _ in await index.search("alpha beta gamma routing caching streaming")]
+
+        reloaded = DocIndex(path=path, max_chunks=2)
+        reloaded_texts = [text for _, text, _ in await reloaded.search("alpha beta gamma routing caching streaming")]
+        return index, texts, reloaded_texts
+
+    index, texts, reloaded_texts = asyncio.run(main())
+    assert index.evictions == 1
+    assert sorted(texts) == ["alpha routing", "gamma streaming"]
+    assert sorted(reloaded_texts) == ["alpha routing", "gamma streaming"]
+
+
+def test_cached_docs_are_not_indexed_again(monkeypatch):
+    index = DocIndex()
+    added = []
+    original_add = index.add
+
+    async def add(library, text):
+        added.append(library)
+        return await original_add(library, text)
+
+    index.add = add
+    monkeypatch.setattr(agent_module, "get_doc_index", lambda: index)
+    server = DocsServer("Routing: define routes in the app directory.")
+    agent = AxiomAgent(
+        mcp_servers=[server], api_key="test", base_url="http://127.0.0.1:9/",
+        tool_cache=ToolResultCache(ttls={"get-library-docs": 60}),
+    )
+    [wrapped] = agent.agent.mcp_servers
+    arguments = {"context7CompatibleLibraryID": "/vercel/next.js", "topic": "routing"}
+
+    async def main():
+        await wrapped.call_tool("get-library-docs", arguments)
+        await wrapped.call_tool("get-library-docs", arguments)
+
+    asyncio.run(main())
+    assert server.calls == 1
+    assert added == ["/vercel/next.js"]
+    assert len(index) == 1
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+from mcp.types import CallToolResult, TextContent
+
+from src.axiom.config import settings
+from src.axiom.docs_fanout import fetch_docs_concurrently
+
+
+class FakeContext7:
+    """Answers resolve-library-id and get-library-docs like the context7 server."""
+
+    name = "context7"
+
+    def __init__(self, unknown: tuple[str, ...] = (), delay: float = 0.0):
+        self.unknown = unknown
+        self.delay = delay
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self.calls.append((tool_name, arguments))
+        await asyncio.sleep(self.delay)
+        if tool_name == "resolve-library-id":
+            library = arguments["libraryName"]
+            if library in self.unknown:
+                return CallToolResult(content=[TextContent(type="text", text="No libraries found.")])
+            text = f"- Title: {library}\n- Context7-compatible library ID: /org/{library}\n"
+        else:
+            text = f"docs for {arguments['context7CompatibleLibraryID']} ({arguments.get('topic', '')})\n" + "line\n" * 5000
+        return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+def test_fetches_libraries_concurrently_and_splits_the_budget():
+    server = FakeContext7(delay=0.1)
+    started = time.perf_counter()
+    result = asyncio.run(fetch_docs_concurrently(server, ["fastapi", "sqlalchemy"], ["auth", ""], tokens=1000))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.35  # Two libraries, each resolve + fetch, in about two round trips
+    assert "[/org/fastapi, topic: auth]" in result
+    assert "[/org/sqlalchemy]" in result
+    docs_calls = [arguments for name, arguments in server.calls if name == "get-library-docs"]
+    assert {call["tokens"] for call in docs_calls} == {500}
+    assert docs_calls[0]["topic"] == "auth" and "topic" not in docs_calls[1]
+    for section in result.split("----------------------------------------"):
+        assert len(section) <= 500 * 4 + 100  # Truncated to the library's share
+
+
+def test_duplicate_and_known_ids_are_not_resolved_again():
+    server = FakeContext7()
+    asyncio.run(fetch_docs_concurrently(server, ["FastAPI", "fastapi", "/vercel/next.js"], []))
+    resolved = [arguments["libraryName"] for name, arguments in server.calls if name == "resolve-library-id"]
+    assert resolved == ["FastAPI"]
+
+
+def test_a_failed_library_does_not_fail_the_call():
+    server = FakeContext7(unknown=("nosuchlib",))
+    result = asyncio.run(fetch_docs_concurrently(server, ["nosuchlib", "fastapi"], []))
+    assert "[nosuchlib]\nCould not fetch docs: no matching Context7 library ID" in result
+    assert "docs for /org/fastapi" in result
+
+
+def test_libraries_are_capped_and_empty_input_is_reported():
+    server = FakeContext7()
+    libraries = [f"lib{i}" for i in range(settings.DOCS_FANOUT_MAX_LIBRARIES + 3)]
+    asyncio.run(fetch_docs_concurrently(server, libraries, []))
+    assert sum(name == "get-library-docs" for name, _ in server.calls) == settings.DOCS_FANOUT_MAX_LIBRARIES
+    assert asyncio.run(fetch_docs_concurrently(server, [" "], [])) == "No libraries given."
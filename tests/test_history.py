@@ -0,0 +1,120 @@
+import asyncio
+
+from src.axiom.config import settings
+from src.axiom.history import SUMMARY_PREFIX, ChatHistory, extractive_summary
+from src.axiom.session_store import SessionStore
+
+
+class InMemoryStore(SessionStore):
+    def __init__(self):
+        self.sessions: dict[str, list[dict[str, str]]] = {}
+
+    async def append(self, session_id, message):
+        self.sessions.setdefault(session_id, []).append(message)
+
+    async def load_recent(self, session_id, limit):
+        return list(self.sessions.get(session_id, [])[-limit:])
+
+    async def delete(self, session_id):
+        self.sessions.pop(session_id, None)
+
+
+def _turn(user: str, assistant: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+
+
+async def _fill(history: ChatHistory, messages: list[dict[str, str]]) -> None:
+    for message in messages:
+        await history.append(message)
+
+
+def test_history_under_budget_is_sent_unchanged():
+    async def main():
+        history = ChatHistory(token_budget=1000, recent_turns=2, summarizer=extractive_summary)
+        await _fill(history, _turn("hi", "hello") + [{"role": "user", "content": "how are you"}])
+        return history, await history.build_input()
+
+    history, built = asyncio.run(main())
+    assert built == history.messages
+
+
+def test_older_turns_are_summarized_newest_first_within_the_budget():
+    async def main():
+        history = ChatHistory(token_budget=250, recent_turns=1, summarizer=extractive_summary)
+        await _fill(history, _turn("a" * 200, "a" * 200) + _turn("b" * 200, "b" * 200))
+        await history.append({"role": "user", "content": "c" * 400})
+        return await history.build_input()
+
+    built = asyncio.run(main())
+    assert [message["role"] for message in built] == ["system", "user"]
+    assert built[0]["content"].startswith(SUMMARY_PREFIX)
+    assert "b" * 200 in built[0]["content"]
+    assert "a" * 200 not in built[0]["content"]  # Did not fit in the remaining budget
+    assert built[1]["content"] == "c" * 400
+
+
+def test_current_turn_is_kept_with_zero_recent_turns():
+    async def main():
+        history = ChatHistory(token_budget=60, recent_turns=0, summarizer=extractive_summary)
+        await _fill(history, _turn("a" * 200, "a" * 200))
+        await history.append({"role": "user", "content": "current question"})
+        return await history.build_input()
+
+    built = asyncio.run(main())
+    assert built[-1] == {"role": "user", "content": "current question"}
+
+
+def test_model_summaries_are_made_in_the_background():
+    calls = []
+
+    async def summarizer(messages):
+        calls.append(messages)
+        return "model summary"
+
+    async def main():
+        history = ChatHistory(token_budget=300, recent_turns=1, summarizer=summarizer)
+        await _fill(history, _turn("question", "a" * 2000))
+        await history.append({"role": "user", "content": "next"})
+        first = await history.build_input()
+        await history.wait_for_summaries()
+        second = await history.build_input()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first[0]["content"].startswith(f"{SUMMARY_PREFIX}\n\nuser: question")  # Extractive until the model summary is ready
+    assert second[0]["content"] == f"{SUMMARY_PREFIX}\n\nmodel summary"
+    assert len(calls) == 1
+
+
+
+def test_summaries_are_extractive_unless_a_summary_model_is_set(monkeypatch):
+    assert ChatHistory().summarizer is extractive_summary
+    monkeypatch.setattr(settings, "HISTORY_SUMMARY_MODEL", "gemini-2.0-flash-lite")
+    assert ChatHistory().summarizer is not extractive_summary
+
+
+def test_turns_trimmed_from_memory_are_still_summarized():
+    async def main():
+        store = InMemoryStore()
+        history = ChatHistory(
+            token_budget=10_000, summarizer=extractive_summary,
+            session_id="s", store=store, max_loaded_messages=4,
+        )
+        await _fill(history, _turn("first", "one") + _turn("second", "two") + _turn("third", "three"))
+        return history, await history.build_input()
+
+    history, built = asyncio.run(main())
+    assert len(history.messages) == 4
+    assert built[0]["role"] == "system" and "user: first" in built[0]["content"]
+    assert built[1:] == _turn("second", "two") + _turn("third", "three")
+
+
+def test_reloaded_history_starts_at_a_user_turn():
+    async def main():
+        store = InMemoryStore()
+        await _fill(ChatHistory(session_id="s", store=store), _turn("first", "one") + _turn("second", "two"))
+        reloaded = ChatHistory(session_id="s", store=store, max_loaded_messages=3)
+        await reloaded.load()
+        return reloaded.messages
+
+    assert asyncio.run(main()) == _turn("second", "two")
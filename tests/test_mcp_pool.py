@@ -0,0 +1,181 @@
+import asyncio
+from typing import Any, Optional
+
+import pytest
+from agents.mcp import MCPServer
+from mcp.types import CallToolResult, TextContent
+
+from src.axiom import mcp_pool
+from src.axiom.config import settings
+from src.axiom.mcp_pool import MCPServerPool, PooledMCPServer, start_mcp_servers
+
+
+class FakeServer(MCPServer):
+    def __init__(self, name: str, connect_delay: float = 0.0, error: Optional[Exception] = None, call_delay: float = 0.0):
+        self._name = name
+        self.connect_delay = connect_delay
+        self.error = error
+        self.call_delay = call_delay
+        self.connected = False
+        self.calls = 0
+        self.running_calls = 0
+        self.max_running_calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def connect(self):
+        await asyncio.sleep(self.connect_delay)
+        if self.error is not None:
+            raise self.error
+        self.connected = True
+
+    async def cleanup(self):
+        self.connected = False
+
+    async def list_tools(self):
+        return []
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self.calls += 1
+        self.running_calls += 1
+        self.max_running_calls = max(self.max_running_calls, self.running_calls)
+        try:
+            await asyncio.sleep(self.call_delay)
+        finally:
+            self.running_calls -= 1
+        return CallToolResult(content=[TextContent(type="text", text=f"{self.name}:{tool_name}")])
+
+
+def test_servers_start_concurrently_and_failures_are_reported():
+    servers = [
+        FakeServer("ok", connect_delay=0.1),
+        FakeServer("broken", error=RuntimeError("exited with status 3")),
+        FakeServer("hung", connect_delay=10),
+    ]
+
+    async def main():
+        started = asyncio.get_running_loop().time()
+        result = await start_mcp_servers(servers, timeout=1)
+        return result, asyncio.get_running_loop().time() - started
+
+    (handles, failures), elapsed = asyncio.run(main())
+    assert [handle.name for handle in handles] == ["ok"]
+    assert failures == {"broken": "exited with status 3", "hung": "did not start within 1s"}
+    assert elapsed < 2.0
+    assert not servers[2].connected
+
+
+def test_cancelled_startup_stops_servers_that_already_connected():
+    fast, slow = FakeServer("fast"), FakeServer("slow", connect_delay=10)
+
+    async def main():
+        task = asyncio.create_task(start_mcp_servers([fast, slow], timeout=30))
+        await asyncio.sleep(0.1)
+        assert fast.connected
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert not fast.connected and not slow.connected
+
+
+@pytest.fixture
+def configured(monkeypatch):
+    """Makes the pool load the fake servers in `servers` instead of the MCP config."""
+    servers: list[FakeServer] = []
+    loads = []
+
+    def load(pool_sizes=None, schema_cache=None):
+        loads.append(pool_sizes)
+        return list(servers)
+
+    monkeypatch.setattr(mcp_pool, "load_mcp_servers_from_config", load)
+    monkeypatch.setattr(mcp_pool, "get_tool_schema_cache", lambda: None)
+    monkeypatch.setattr(settings, "MCP_SUPERVISION_ENABLED", False)
+    return servers, loads
+
+
+def test_lease_starts_the_pool_once_and_counts_leases(configured):
+    servers, loads = configured
+    servers += [FakeServer("context7"), FakeServer("github")]
+
+    async def main():
+        pool = MCPServerPool()
+        first = await pool.lease()
+        second = await pool.lease(["context7"])
+        leases = pool.active_leases
+        connected = all(server.connected for server in servers)
+        pool.release()
+        pool.release()
+        pool.release()  # More releases than leases do not go negative
+        return first, second, leases, connected, pool.active_leases
+
+    first, second, leases, connected, after_release = asyncio.run(main())
+    assert len(loads) == 1
+    assert [server.name for server in first] == ["context7", "github"]
+    assert [server.name for server in second] == ["context7"]
+    assert all(isinstance(server, PooledMCPServer) for server in first)
+    assert connected
+    assert (leases, after_release) == (2, 0)
+
+
+def test_an_empty_lease_is_still_counted(configured):
+    async def main():
+        pool = MCPServerPool()
+        leased = await pool.lease()
+        return leased, pool.active_leases
+
+    assert asyncio.run(main()) == ([], 1)
+
+
+def test_calls_go_to_the_least_busy_instance(configured):
+    servers, _ = configured
+    servers += [FakeServer("context7", call_delay=0.1), FakeServer("context7", call_delay=0.1)]
+
+    async def main():
+        pool = MCPServerPool(pool_sizes={"context7": 2})
+        [lease] = await pool.lease()
+        await asyncio.gather(*(lease.call_tool("get-library-docs", {}) for _ in range(4)))
+
+    asyncio.run(main())
+    assert [server.calls for server in servers] == [2, 2]
+
+
+def test_calls_per_instance_are_bounded(configured):
+    servers, _ = configured
+    servers.append(FakeServer("context7", call_delay=0.02))
+
+    async def main():
+        pool = MCPServerPool(max_concurrent_calls=2)
+        [lease] = await pool.lease()
+        await asyncio.gather(*(lease.call_tool("get-library-docs", {}) for _ in range(6)))
+
+    asyncio.run(main())
+    assert servers[0].calls == 6
+    assert servers[0].max_running_calls == 2
+
+
+def test_shutdown_stops_the_servers_and_allows_a_restart(configured):
+    servers, loads = configured
+    servers.append(FakeServer("context7"))
+
+    async def main():
+        pool = MCPServerPool()
+        await pool.lease()
+        await pool.shutdown()
+        stopped = (pool.is_started, servers[0].connected, pool.active_leases)
+        await pool.lease()
+        return stopped, pool.is_started
+
+    stopped, restarted = asyncio.run(main())
+    assert stopped == (False, False, 0)
+    assert restarted and len(loads) == 2
+
+
+def test_a_server_without_started_instances_is_unavailable():
+    lease = PooledMCPServer("context7", [])
+    assert asyncio.run(lease.list_tools()) == []
+    with pytest.raises(RuntimeError, match="not available"):
+        asyncio.run(lease.call_tool("get-library-docs", {}))
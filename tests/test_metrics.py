@@ -0,0 +1,74 @@
+from src.axiom.events import RunSummary
+from src.axiom.metrics import AxiomMetrics, MetricsRegistry, _stats_samples
+
+
+def _lines(text: str) -> list[str]:
+    return text.strip().splitlines()
+
+
+def test_renders_counters_gauges_and_labels():
+    registry = MetricsRegistry()
+    runs = registry.counter("runs_total", "Runs.", ["model"])
+    sessions = registry.gauge("sessions", "Sessions.")
+    runs.inc(model='gem"ini')
+    runs.inc(2, model='gem"ini')
+    sessions.set(3)
+
+    assert _lines(registry.render()) == [
+        "# HELP runs_total Runs.",
+        "# TYPE runs_total counter",
+        'runs_total{model="gem\\"ini"} 3',
+        "# HELP sessions Sessions.",
+        "# TYPE sessions gauge",
+        "sessions 3",
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value)
+
+    lines = _lines(registry.render())
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 6.05" in lines
+    assert "latency_seconds_count 4" in lines
+
+
+def test_collector_samples_are_typed_by_suffix():
+    registry = MetricsRegistry()
+    registry.add_collector("Cache stats.", lambda: _stats_samples("axiom_tool_cache", {"hits": 4, "memory_entries": 2}))
+
+    lines = _lines(registry.render())
+    assert "# TYPE axiom_tool_cache_hits_total counter" in lines
+    assert "axiom_tool_cache_hits_total 4" in lines
+    assert "# TYPE axiom_tool_cache_memory_entries gauge" in lines
+
+
+def test_failing_collector_is_skipped():
+    registry = MetricsRegistry()
+    registry.gauge("up", "Up.").set(1)
+    registry.add_collector("Broken.", lambda: 1 / 0)
+    assert _lines(registry.render())[-1] == "up 1"
+
+
+def test_cached_runs_are_counted_without_latency():
+    metrics = AxiomMetrics()
+    metrics.observe_run(RunSummary(total_seconds=0.0, time_to_first_token=None, model_turns=0, tool_calls=0, model="m", cached=True))
+    metrics.observe_run(RunSummary(total_seconds=2.0, time_to_first_token=0.5, model_turns=1, tool_calls=0, model="m"))
+
+    assert ("axiom_runs_total", {"model": "m", "outcome": "cached"}, 1.0) in metrics.runs.samples()
+    assert ("axiom_run_seconds_count", {"model": "m"}, 1) in metrics.run_seconds.samples()
+
+
+def test_active_sessions_do_not_drift_on_repeated_events():
+    metrics = AxiomMetrics()
+    metrics.session_active("a")
+    metrics.session_ended("a")
+    metrics.session_ended("a")  # A disconnect, then the real end
+    metrics.session_active("b")
+    metrics.session_active("b")  # Counted again on each message
+    assert metrics.active_sessions.samples() == [("axiom_active_sessions", {}, 1)]
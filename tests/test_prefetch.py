@@ -0,0 +1,109 @@
+import asyncio
+import json
+from typing import Any, Optional
+
+from agents import RunContextWrapper
+from mcp.types import CallToolResult, TextContent
+
+from src.axiom import agent as agent_module
+from src.axiom.agent import AxiomAgent
+from src.axiom.config import settings
+from src.axiom.docs_fanout import FETCH_DOCS_TOOL_NAME
+from src.axiom.mcp_proxy import MCPServerProxy
+from src.axiom.prefetch import DocPrefetcher, PrefetchTrackingMCPServer, extract_libraries, parse_library_ids
+from src.axiom.tool_cache import ToolResultCache
+
+RESOLVED = "- Title: React\n- Context7-compatible library ID: /facebook/react\n- Description: UI library"
+
+
+class DocsServer(MCPServerProxy):
+    def __init__(self, delay: float = 0.0, error: Optional[Exception] = None):
+        super().__init__(None)
+        self.delay = delay
+        self.error = error
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    @property
+    def name(self) -> str:
+        return "context7"
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self.calls.append((tool_name, arguments))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        text = RESOLVED if tool_name == "resolve-library-id" else "React docs"
+        return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
+def test_libraries_are_extracted_in_order_of_mention():
+    assert extract_libraries("Use FastAPI with SQLAlchemy and fastapi again") == ["FastAPI", "SQLAlchemy"]
+    assert extract_libraries("nextjs app with tailwind") == ["next.js", "tailwindcss"]
+    assert extract_libraries("react, vue and svelte", limit=2) == ["react", "vue"]
+    assert extract_libraries("a reactive uv-like tool") == []
+
+
+def test_library_ids_are_parsed_from_resolve_results():
+    text = RESOLVED + "\n\n- Title: Preact\n- Context7-compatible library ID: /preactjs/preact"
+    assert parse_library_ids(text) == ["/facebook/react", "/preactjs/preact"]
+
+
+def test_prefetched_calls_used_by_the_model_are_hits():
+    server = DocsServer(delay=0.01)
+    prefetcher = DocPrefetcher(max_libraries=3)
+    tracked = PrefetchTrackingMCPServer(server, prefetcher)
+
+    async def main():
+        tasks = prefetcher.start(server, [{"role": "user", "content": "How do I use react with fastapi?"}])
+        await asyncio.gather(*tasks)
+        await asyncio.gather(*prefetcher.start(server, "react again"))  # Prefetched recently; not repeated
+        await tracked.call_tool("resolve-library-id", {"libraryName": "react"})
+        await tracked.call_tool("resolve-library-id", {"libraryName": "django"})
+        await tracked.call_tool("get-library-docs", {"context7CompatibleLibraryID": "/facebook/react"})
+
+    asyncio.run(main())
+    stats = prefetcher.stats()
+    assert [arguments["libraryName"] for _, arguments in server.calls[:2]] == ["react", "fastapi"]
+    assert len(server.calls) == 5
+    assert (stats["prefetched"], stats["hits"], stats["model_calls"]) == (2, 1, 2)
+    assert stats["hit_rate"] == 0.5
+    assert stats["time_saved"] > 0
+
+
+def test_failed_prefetches_are_forgotten():
+    server = DocsServer(error=RuntimeError("server crashed"))
+    prefetcher = DocPrefetcher()
+
+    async def main():
+        await asyncio.gather(*prefetcher.start(server, "react"))
+        prefetcher.observe("resolve-library-id", {"libraryName": "react"})
+
+    asyncio.run(main())
+    assert (prefetcher.prefetched, prefetcher.hits, prefetcher.model_calls) == (1, 0, 1)
+
+
+def test_fetch_docs_tool_calls_are_not_counted_as_model_calls(monkeypatch):
+    monkeypatch.setattr(settings, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(settings, "DOCS_FANOUT_ENABLED", True)
+    monkeypatch.setattr(settings, "DOC_INDEX_ENABLED", False)
+    prefetcher = DocPrefetcher()
+    monkeypatch.setattr(agent_module, "get_prefetcher", lambda: prefetcher)
+    server = DocsServer()
+    agent = AxiomAgent(
+        mcp_servers=[server], api_key="test", base_url="http://127.0.0.1:9/",
+        tool_cache=ToolResultCache(ttls={"resolve-library-id": 60}),
+    )
+    [tracked] = agent.agent.mcp_servers
+    [fetch_docs] = [tool for tool in agent.agent.tools if tool.name == FETCH_DOCS_TOOL_NAME]
+
+    async def main():
+        arguments = json.dumps({"libraries": ["react"], "topics": [""], "tokens": 1000})
+        output = await fetch_docs.on_invoke_tool(RunContextWrapper(context=None), arguments)
+        await tracked.call_tool("resolve-library-id", {"libraryName": "react"})
+        return output
+
+    output = asyncio.run(main())
+    assert "React docs" in output
+    assert isinstance(tracked, PrefetchTrackingMCPServer)
+    assert prefetcher.model_calls == 1
+    assert [tool_name for tool_name, _ in server.calls] == ["resolve-library-id", "get-library-docs"]
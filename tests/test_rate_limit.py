@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import httpx
+
+from src.axiom.rate_limit import TokenBucket, parse_retry_after
+
+
+def test_bucket_allows_a_burst_up_to_capacity():
+    async def main():
+        bucket = TokenBucket(rate=1.0, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) < 0.1
+
+
+def test_bucket_waits_for_a_refill_when_empty():
+    async def main():
+        bucket = TokenBucket(rate=20.0, capacity=1)
+        await bucket.acquire()
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.04
+
+
+def test_pause_blocks_and_halves_the_rate():
+    async def main():
+        bucket = TokenBucket(rate=10.0, capacity=5)
+        bucket.pause(0.1)
+        assert bucket.rate == 5.0
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.1
+
+
+def test_rate_stays_above_the_floor_and_recovers():
+    bucket = TokenBucket(rate=10.0, capacity=1, min_fraction=0.2)
+    for _ in range(10):
+        bucket.pause(0)
+    assert bucket.rate == 2.0
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 10.0
+
+
+def test_refund_is_capped_at_capacity():
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    bucket.refund()
+    assert bucket.tokens == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "1500"})) == 1.5
+    assert parse_retry_after(httpx.Headers({"retry-after": "2"})) == 2.0
+    assert parse_retry_after(httpx.Headers({})) is None
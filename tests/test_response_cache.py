@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+
+from src.axiom import response_cache
+from src.axiom.response_cache import ResponseCache, make_response_key, register_starter_prompts, replay_response
+
+
+def _key(chat_history, mode="Agent", model="model", prompt="prompt"):
+    return make_response_key(mode, model, prompt, chat_history)
+
+
+@pytest.fixture(autouse=True)
+def no_starters(monkeypatch):
+    monkeypatch.setattr(response_cache, "_starter_prompts", set())
+
+
+def test_key_ignores_whitespace_and_trailing_punctuation():
+    assert _key("What is  FastAPI?") == _key("What is FastAPI")
+    assert _key("hi") == _key([{"role": "user", "content": "hi"}])
+
+
+def test_key_keeps_case():
+    assert _key("use Client") != _key("use client")
+
+
+def test_key_ignores_case_for_starter_prompts():
+    register_starter_prompts(["How to use Autogen?"])
+    assert _key("how to use autogen") == _key("How to use Autogen?")
+    # Only whole user messages matching a starter ignore case
+    assert _key([{"role": "assistant", "content": "how to use autogen"}]) != _key(
+        [{"role": "assistant", "content": "How to use Autogen"}]
+    )
+
+
+def test_key_covers_mode_model_and_prompt():
+    base = _key("hi")
+    assert _key("hi", mode="Assistant") != base
+    assert _key("hi", model="other") != base
+    assert _key("hi", prompt="edited prompt") != base
+
+
+def test_cache_round_trip_and_expiry(tmp_path):
+    async def main():
+        cache = ResponseCache(tmp_path / "responses.sqlite3", ttl=0.2)
+        await cache.set("key", "Agent", "model", "answer")
+        hit = await cache.get("key")
+        time.sleep(0.25)
+        expired = await cache.get("key")
+        return cache, hit, expired
+
+    cache, hit, expired = asyncio.run(main())
+    assert hit == "answer"
+    assert expired is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "stores": 1, "evictions": 0}
+
+
+def test_cache_evicts_least_recently_used_over_the_size_limit(tmp_path):
+    async def main():
+        cache = ResponseCache(tmp_path / "responses.sqlite3", ttl=60, max_disk_bytes=250)
+        await cache.set("old", "Agent", "model", "a" * 100)
+        await cache.set("used", "Agent", "model", "b" * 100)
+        await cache.get("old")  # Now more recently used than "used"
+        await cache.set("new", "Agent", "model", "c" * 100)
+        return cache, [await cache.get(key) is not None for key in ("old", "used", "new")]
+
+    cache, present = asyncio.run(main())
+    assert present == [True, False, True]
+    assert cache.evictions == 1
+
+
+def test_replay_streams_the_whole_text():
+    async def main(chars_per_second):
+        return [chunk async for chunk in replay_response("word " * 40, chars_per_second=chars_per_second, chunk_chars=24)]
+
+    chunks = asyncio.run(main(100_000))
+    assert "".join(chunks) == "word " * 40
+    assert len(chunks) > 1
+    assert asyncio.run(main(0)) == ["word " * 40]
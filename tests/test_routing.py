@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.axiom import agent as agent_module
+from src.axiom.agent import AxiomAgent
+from src.axiom.events import RunSummary, TextDelta
+from src.axiom.routing import TIER_COMPLEX, TIER_SIMPLE, ModelRouter, classify_request
+
+
+def _summary(model: str, error: str = None, final_output: str = None) -> RunSummary:
+    return RunSummary(total_seconds=0.1, time_to_first_token=None, model_turns=1, tool_calls=0,
+                      model=model, error=error, final_output=final_output)
+
+
+def _agent() -> tuple[AxiomAgent, ModelRouter]:
+    router = ModelRouter(tiers={"fast": 1, "slow": 2})
+    return AxiomAgent(model="auto", router=router, api_key="test", base_url="http://127.0.0.1:9/"), router
+
+
+def _fake_stream_run(runs: dict[str, list]):
+    """Replaces `AxiomAgent._stream_run` with canned events per model."""
+    started = []
+
+    async def stream_run(chat_history, model_name):
+        started.append(model_name)
+        for event in runs[model_name]:
+            yield event
+
+    return stream_run, started
+
+
+async def _collect(agent: AxiomAgent, prompt: str) -> list:
+    return [event async for event in agent.stream_events([{"role": "user", "content": prompt}])]
+
+
+def test_requests_are_classified_by_the_tier_they_need():
+    assert classify_request("What is FastAPI?") == TIER_SIMPLE
+    assert classify_request("Refactor this module to use dependency injection") == TIER_COMPLEX
+    assert classify_request([{"role": "user", "content": "Traceback (most recent call last):\n..."}]) == TIER_COMPLEX
+
+
+def test_router_prefers_fast_models_and_penalizes_errors():
+    router = ModelRouter(tiers={"fast": 1, "slow": 2})
+    assert router.route("hi") == ["fast", "slow"]
+    router.record("fast", 1.0, error=False)
+    router.record("slow", 1.5, error=False)
+    assert router.route("hi") == ["fast", "slow"]
+    router.record("fast", None, error=True)
+    assert router.route("hi") == ["slow", "fast"]
+    assert router.route("Design a scalable architecture") == ["slow"]
+
+
+def test_stream_falls_back_after_an_error_before_any_text():
+    agent, router = _agent()
+    agent._stream_run, started = _fake_stream_run({
+        "fast": [_summary("fast", error="503 Service Unavailable")],
+        "slow": [TextDelta(text="answer"), _summary("slow", final_output="answer")],
+    })
+
+    events = asyncio.run(_collect(agent, "hi"))
+
+    assert started == ["fast", "slow"]
+    assert [type(event) for event in events] == [TextDelta, RunSummary]
+    assert (events[-1].model, events[-1].error) == ("slow", None)
+    assert (router.stats["fast"].errors, router.stats["slow"].errors) == (1, 0)
+
+
+def test_stream_does_not_fall_back_after_text_was_streamed():
+    agent, router = _agent()
+    agent._stream_run, started = _fake_stream_run({
+        "fast": [TextDelta(text="partial "), _summary("fast", error="connection reset")],
+        "slow": [TextDelta(text="answer"), _summary("slow", final_output="answer")],
+    })
+
+    events = asyncio.run(_collect(agent, "hi"))
+
+    assert started == ["fast"]
+    assert [type(event) for event in events] == [TextDelta, RunSummary]
+    assert events[-1].error == "connection reset"
+
+
+def test_stream_returns_the_last_error_when_every_model_fails():
+    agent, _ = _agent()
+    agent._stream_run, started = _fake_stream_run({
+        "fast": [_summary("fast", error="503")],
+        "slow": [_summary("slow", error="429")],
+    })
+
+    events = asyncio.run(_collect(agent, "hi"))
+
+    assert started == ["fast", "slow"]
+    assert [(event.model, event.error) for event in events] == [("slow", "429")]
+
+
+def test_blocking_run_falls_back_after_an_error(monkeypatch):
+    agent, router = _agent()
+    tried = []
+
+    class FakeRunner:
+        @staticmethod
+        async def run(starting_agent, input, hooks, run_config):
+            model = run_config.model.model
+            tried.append(model)
+            if model == "fast":
+                raise RuntimeError("503 Service Unavailable")
+            return SimpleNamespace(raw_responses=[], final_output="answer")
+
+    monkeypatch.setattr(agent_module, "Runner", FakeRunner)
+    summary = asyncio.run(agent.run_with_summary([{"role": "user", "content": "hi"}]))
+
+    assert tried == ["fast", "slow"]
+    assert (summary.model, summary.final_output, summary.error) == ("slow", "answer", None)
+    assert router.stats["fast"].errors == 1
@@ -0,0 +1,132 @@
+import asyncio
+import json
+from typing import Any, Optional
+
+import pytest
+from agents.mcp import MCPServer
+from mcp import Tool as MCPTool
+from mcp.types import CallToolResult, TextContent
+
+from src.axiom import mcp_pool
+from src.axiom.config import settings
+from src.axiom.mcp_pool import MCPServerPool
+from src.axiom.schema_cache import ToolSchemaCache, make_schema_key
+
+PARAMS = {"command": "npx", "args": ["-y", "@upstash/context7-mcp@1.0.6"]}
+
+
+def _tool(name: str) -> MCPTool:
+    return MCPTool(name=name, description=f"The {name} tool", inputSchema={"type": "object", "properties": {}})
+
+
+class FakeServer(MCPServer):
+    def __init__(self, name: str = "context7", connect_delay: float = 0.0, error: Optional[Exception] = None):
+        self._name = name
+        self.connect_delay = connect_delay
+        self.error = error
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def connect(self):
+        await asyncio.sleep(self.connect_delay)
+        if self.error is not None:
+            raise self.error
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self) -> list[MCPTool]:
+        return [_tool("resolve-library-id"), _tool("get-library-docs")]
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self.calls += 1
+        return CallToolResult(content=[TextContent(type="text", text=tool_name)])
+
+
+def _warm_cache(path, params=PARAMS) -> None:
+    """Writes a cache file as a previous run would have, with an older tool list."""
+    cache = ToolSchemaCache(path)
+    cache.wrap(FakeServer(), params)
+    cache.set(make_schema_key("context7", params), [_tool("resolve-library-id")])
+
+
+def test_cached_tools_are_listed_before_the_server_has_started(tmp_path):
+    path = tmp_path / "tools.json"
+    _warm_cache(path)
+
+    async def main():
+        server = ToolSchemaCache(path).wrap(FakeServer(connect_delay=0.2), PARAMS)
+        connecting = asyncio.create_task(server.connect())
+        await asyncio.sleep(0)
+        listed_early = [tool.name for tool in await asyncio.wait_for(server.list_tools(), 0.1)]
+        result = await server.call_tool("get-library-docs", {})  # Waits for the connection
+        await connecting
+        return listed_early, result, [tool.name for tool in await server.list_tools()]
+
+    listed_early, result, listed_live = asyncio.run(main())
+    assert listed_early == ["resolve-library-id"]
+    assert result.content[0].text == "get-library-docs"
+    assert listed_live == ["resolve-library-id", "get-library-docs"]
+    # The live tool list replaces the cached one
+    assert [tool["name"] for tool in next(iter(json.loads(path.read_text()).values()))] == listed_live
+
+
+@pytest.mark.parametrize("cached_params", [None, {**PARAMS, "args": ["-y", "@upstash/context7-mcp@1.0.5"]}])
+def test_missing_or_stale_entries_wait_for_the_live_server(tmp_path, cached_params):
+    path = tmp_path / "tools.json"
+    if cached_params is not None:
+        _warm_cache(path, cached_params)  # Written for another version of the server
+
+    async def main():
+        server = ToolSchemaCache(path).wrap(FakeServer(connect_delay=0.05), PARAMS)
+        connecting = asyncio.create_task(server.connect())
+        tools = await server.list_tools()
+        await connecting
+        return [tool.name for tool in tools]
+
+    assert asyncio.run(main()) == ["resolve-library-id", "get-library-docs"]
+    assert len(json.loads(path.read_text())) == 1  # The stale entry is dropped
+
+
+def test_a_server_that_failed_to_start_has_no_tools(tmp_path):
+    path = tmp_path / "tools.json"
+    _warm_cache(path)
+
+    async def main():
+        server = ToolSchemaCache(path).wrap(FakeServer(error=RuntimeError("exited with status 1")), PARAMS)
+        with pytest.raises(RuntimeError):
+            await server.connect()
+        with pytest.raises(RuntimeError, match="not available"):
+            await server.call_tool("get-library-docs", {})
+        return await server.list_tools()
+
+    assert asyncio.run(main()) == []
+
+
+def test_instances_that_fail_to_start_are_dropped_from_handed_out_leases(monkeypatch, tmp_path):
+    schema_cache = ToolSchemaCache(tmp_path / "tools.json")
+    healthy, broken = FakeServer(connect_delay=0.05), FakeServer(error=RuntimeError("exited with status 1"))
+
+    def load(pool_sizes=None, schema_cache=None):
+        return [schema_cache.wrap(broken, PARAMS), schema_cache.wrap(healthy, PARAMS)]
+
+    monkeypatch.setattr(mcp_pool, "load_mcp_servers_from_config", load)
+    monkeypatch.setattr(mcp_pool, "get_tool_schema_cache", lambda: schema_cache)
+    monkeypatch.setattr(settings, "MCP_SUPERVISION_ENABLED", False)
+
+    async def main():
+        pool = MCPServerPool(pool_sizes={"context7": 2})
+        [lease] = await pool.lease()  # Returns before the servers have started
+        instances_before = pool.stats()["context7"]["instances"]
+        await pool._startup_task
+        results = [await lease.call_tool("resolve-library-id", {}) for _ in range(3)]
+        await pool.shutdown()
+        return instances_before, results
+
+    instances_before, results = asyncio.run(main())
+    assert instances_before == 2
+    assert healthy.calls == 3 and broken.calls == 0
+    assert all(not result.isError for result in results)
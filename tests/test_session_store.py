@@ -0,0 +1,82 @@
+import asyncio
+
+from src.axiom import session_store
+from src.axiom.session_store import SessionManager, SQLiteSessionStore
+
+DAY = 24 * 60 * 60
+
+
+def _turn(user: str, assistant: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+
+
+async def _append(store: SQLiteSessionStore, session_id: str, messages: list[dict[str, str]]) -> None:
+    for message in messages:
+        await store.append(session_id, message)
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    path = tmp_path / "sessions.sqlite3"
+
+    async def main():
+        store = SQLiteSessionStore(path)
+        await _append(store, "a", _turn("first", "one") + _turn("second", "two"))
+        await _append(store, "b", _turn("other", "session"))
+        await store.delete("b")
+
+        reopened = SQLiteSessionStore(path)
+        return await reopened.load_recent("a", 3), await reopened.load_recent("a", 10), await reopened.load_recent("b", 10)
+
+    recent, everything, deleted = asyncio.run(main())
+    assert recent == [{"role": "assistant", "content": "one"}] + _turn("second", "two")
+    assert everything == _turn("first", "one") + _turn("second", "two")
+    assert deleted == []
+
+
+def test_sessions_past_retention_are_deleted(monkeypatch, tmp_path):
+    now = [1_000_000.0]
+    monkeypatch.setattr(session_store.time, "time", lambda: now[0])
+    path = tmp_path / "sessions.sqlite3"
+
+    async def main():
+        store = SQLiteSessionStore(path, max_age_seconds=3 * DAY)
+        await _append(store, "old", _turn("old", "session"))
+        await _append(store, "active", _turn("started", "early"))
+        now[0] += 2 * DAY
+        await _append(store, "active", _turn("still", "going"))
+        now[0] += 2 * DAY
+
+        # Reopening the file (e.g. a restart) prunes it
+        reopened = SQLiteSessionStore(path, max_age_seconds=3 * DAY)
+        return await reopened.load_recent("old", 10), await reopened.load_recent("active", 10)
+
+    old, active = asyncio.run(main())
+    assert old == []
+    assert active == _turn("started", "early") + _turn("still", "going")
+
+
+def test_evicted_session_is_reloaded_from_the_store(tmp_path):
+    async def main():
+        manager = SessionManager(store=SQLiteSessionStore(tmp_path / "sessions.sqlite3"))
+        history = manager.get_history("s")
+        await history.load()
+        for message in _turn("first", "one") + _turn("second", "two"):
+            await history.append(message)
+
+        manager.evict("s")
+        evicted = len(manager)
+        reloaded = manager.get_history("s")
+        await reloaded.load()
+        return history, reloaded, evicted
+
+    history, reloaded, evicted = asyncio.run(main())
+    assert evicted == 0
+    assert reloaded is not history
+    assert reloaded.messages == _turn("first", "one") + _turn("second", "two")
+
+
+def test_sessions_without_a_store_are_not_evicted():
+    manager = SessionManager()
+    history = manager.get_history("s")
+    manager.evict("s")
+    assert manager.get_history("s") is history
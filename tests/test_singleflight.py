@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from src.axiom.singleflight import SingleFlight
+
+
+class Call:
+    """A call that counts how often it starts and blocks until released."""
+
+    def __init__(self, result: str = "result"):
+        self.result = result
+        self.started = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.result
+
+
+def test_concurrent_calls_share_one_call():
+    async def main():
+        group, call = SingleFlight(), Call()
+        waiters = [asyncio.create_task(group.do("key", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        call.release.set()
+        return group, call, await asyncio.gather(*waiters)
+
+    group, call, results = asyncio.run(main())
+    assert results == ["result"] * 3
+    assert call.started == 1
+    assert (group.calls, group.coalesced, group.stats()["in_flight"]) == (1, 2, 0)
+
+
+def test_errors_are_shared_and_not_remembered():
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("server crashed")
+
+    async def succeeding():
+        return "retried"
+
+    async def main():
+        group = SingleFlight()
+        results = await asyncio.gather(group.do("key", failing), group.do("key", failing), return_exceptions=True)
+        return results, await group.do("key", succeeding)
+
+    results, retried = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == "retried"
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    async def main():
+        group, call = SingleFlight(), Call()
+        first = asyncio.create_task(group.do("key", call))
+        second = asyncio.create_task(group.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        call.release.set()
+        return call, await second, first.cancelled()
+
+    call, result, first_cancelled = asyncio.run(main())
+    assert first_cancelled
+    assert result == "result"
+    assert (call.started, call.cancelled) == (1, 0)
+
+
+def test_cancelling_the_last_waiter_cancels_the_call():
+    async def main():
+        group, call = SingleFlight(), Call()
+        waiter = asyncio.create_task(group.do("key", call))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        return group, call
+
+    group, call = asyncio.run(main())
+    assert call.cancelled == 1
+    assert group.stats()["in_flight"] == 0
+
+
+def test_caller_arriving_after_the_last_waiter_is_cancelled_starts_a_new_call():
+    async def fresh():
+        return "fresh"
+
+    async def main():
+        group, dying = SingleFlight(), Call()
+        waiter = asyncio.create_task(group.do("key", dying))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # The cancelled call's done callbacks have not run yet; call inline so none run before `do`
+        return dying, await group.do("key", fresh), group
+
+    dying, result, group = asyncio.run(main())
+    assert result == "fresh"
+    assert dying.cancelled == 1
+    assert group.calls == 2
+    assert group.stats()["in_flight"] == 0
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ("agents", "openai", "mcp", "chainlit")
+
+
+def test_importing_the_cli_does_not_load_heavy_dependencies():
+    code = (
+        "import sys, cli\n"
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
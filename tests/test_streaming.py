@@ -0,0 +1,57 @@
+import asyncio
+
+from src.axiom.streaming import coalesce_tokens
+
+
+async def _tokens(*tokens: str, delay: float = 0.0):
+    for token in tokens:
+        if delay:
+            await asyncio.sleep(delay)
+        yield token
+
+
+async def _collect(stream) -> list[str]:
+    return [chunk async for chunk in stream]
+
+
+def test_coalesces_tokens_up_to_max_chars():
+    chunks = asyncio.run(_collect(coalesce_tokens(_tokens(*"abcdefghijkl"), max_chars=5, max_delay=1.0)))
+    assert "".join(chunks) == "abcdefghijkl"
+    assert chunks == ["abcde", "fghij", "kl"]
+
+
+def test_flushes_when_the_stream_stalls():
+    async def stalled():
+        yield "a"
+        await asyncio.sleep(0.2)
+        yield "b"
+
+    chunks = asyncio.run(_collect(coalesce_tokens(stalled(), max_chars=100, max_delay=0.02)))
+    assert chunks == ["a", "b"]
+
+
+def test_passes_tokens_through_when_disabled():
+    chunks = asyncio.run(_collect(coalesce_tokens(_tokens("a", "b", "c"), max_chars=1, max_delay=1.0)))
+    assert chunks == ["a", "b", "c"]
+
+
+def test_closing_the_consumer_closes_the_source():
+    closed = False
+
+    async def source():
+        nonlocal closed
+        try:
+            while True:
+                yield "token "
+                await asyncio.sleep(0)
+        finally:
+            closed = True
+
+    async def main():
+        stream = coalesce_tokens(source(), max_chars=12, max_delay=1.0)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(main()) == "token token "
+    assert closed
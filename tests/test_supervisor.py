@@ -0,0 +1,184 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+import anyio
+import pytest
+from agents.mcp import MCPServer
+from mcp import Tool as MCPTool
+from mcp.types import CallToolResult, TextContent
+
+from src.axiom.config import settings
+from src.axiom.supervisor import SupervisedMCPServer
+
+
+class FakeSession:
+    def __init__(self, process: "FakeProcess"):
+        self.process = process
+
+    async def send_ping(self):
+        if self.process.dead:
+            raise anyio.ClosedResourceError()
+
+
+class FakeProcess(MCPServer):
+    """One server process; `dead` makes pings and calls fail like an exited process."""
+
+    def __init__(self, number: int, fail_start: bool = False):
+        self.number = number
+        self.fail_start = fail_start
+        self.dead = False
+        self.running = False
+        self.session = FakeSession(self)
+
+    @property
+    def name(self) -> str:
+        return "context7"
+
+    async def connect(self):
+        if self.fail_start:
+            raise RuntimeError("exited with status 1")
+        self.running = True
+
+    async def cleanup(self):
+        self.running = False
+
+    async def list_tools(self) -> list[MCPTool]:
+        return [MCPTool(name="get-library-docs", inputSchema={"type": "object"})]
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        if self.dead:
+            raise anyio.ClosedResourceError()
+        return CallToolResult(content=[TextContent(type="text", text=str(self.number))])
+
+
+class Factory:
+    """Creates numbered processes; the first `failures` starts after `fail_after` fail."""
+
+    def __init__(self, fail_after: int = 0, failures: int = 0):
+        self.processes: list[FakeProcess] = []
+        self.fail_after = fail_after
+        self.failures = failures
+
+    def __call__(self) -> FakeProcess:
+        number = len(self.processes)
+        self.processes.append(FakeProcess(number, fail_start=self.fail_after <= number < self.fail_after + self.failures))
+        return self.processes[-1]
+
+
+async def _wait_until(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def _served_by(server: SupervisedMCPServer) -> int:
+    result = await server.call_tool("get-library-docs", {})
+    return int(result.content[0].text)
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "MCP_RESTART_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(settings, "MCP_RESTART_BACKOFF_MAX", 0.03)
+
+
+def test_a_crashed_server_is_restarted():
+    factory = Factory()
+
+    async def main():
+        server = SupervisedMCPServer(factory, health_interval=0.01, health_timeout=0.1)
+        await server.connect()
+        first = await _served_by(server)
+        factory.processes[0].dead = True
+        await _wait_until(lambda: server.restarts == 1)
+        second = await _served_by(server)
+        await server.cleanup()
+        return server, first, second
+
+    server, first, second = asyncio.run(main())
+    assert (first, second) == (0, 1)
+    assert server.crashes == 1
+    assert not any(process.running for process in factory.processes)
+
+
+def test_a_call_that_hits_a_dead_process_is_retried_on_its_replacement():
+    factory = Factory()
+
+    async def main():
+        server = SupervisedMCPServer(factory, health_interval=60)
+        await server.connect()
+        factory.processes[0].dead = True
+        served_by = await _served_by(server)
+        await server.cleanup()
+        return server, served_by
+
+    server, served_by = asyncio.run(main())
+    assert served_by == 1
+    assert (server.crashes, server.restarts) == (1, 1)
+
+
+def test_failed_restarts_back_off_and_reset_once_healthy():
+    factory = Factory(fail_after=1, failures=3)
+    delays = []
+
+    async def main():
+        server = SupervisedMCPServer(factory, health_interval=0.01, health_timeout=0.1)
+        backoff = server._backoff
+        server._backoff = lambda: delays.append(backoff()) or delays[-1]
+        await server.connect()
+        factory.processes[0].dead = True
+        await _wait_until(lambda: server.restarts == 1)
+        await _wait_until(lambda: server._failures == 0)  # The next healthy check resets the backoff
+        served_by = await _served_by(server)
+        await server.cleanup()
+        return server, served_by
+
+    server, served_by = asyncio.run(main())
+    assert delays == [0.0, 0.01, 0.02, 0.03]  # Immediate, then doubling up to the maximum
+    assert served_by == 4
+    assert server.crashes == 1
+
+
+def test_an_idle_server_is_reaped_and_restarted_by_the_next_call():
+    factory = Factory()
+
+    async def main():
+        server = SupervisedMCPServer(factory, health_interval=0.01, idle_timeout=0.05)
+        await server.connect()
+        await server.list_tools()
+        await _wait_until(lambda: server.reaped == 1)
+        reaped = (server.is_running, factory.processes[0].running)
+        tools = await server.list_tools()  # From the last listing; does not start the server
+        started_before_call = len(factory.processes)
+        served_by = await _served_by(server)
+        await server.cleanup()
+        return server, reaped, tools, started_before_call, served_by
+
+    server, reaped, tools, started_before_call, served_by = asyncio.run(main())
+    assert reaped == (False, False)
+    assert [tool.name for tool in tools] == ["get-library-docs"]
+    assert started_before_call == 1
+    assert served_by == 1
+    assert server.crashes == 0
+
+
+def test_a_crashed_server_is_replaced_by_its_warm_spare():
+    factory = Factory()
+
+    async def main():
+        server = SupervisedMCPServer(factory, health_interval=0.01, health_timeout=0.1, warm_spare=True)
+        await server.connect()
+        await _wait_until(lambda: server.stats()["spare"])
+        factory.processes[0].dead = True
+        await _wait_until(lambda: server.restarts == 1)
+        served_by = await _served_by(server)
+        await _wait_until(lambda: server.stats()["spare"])  # A new spare replaces the promoted one
+        await server.cleanup()
+        return served_by
+
+    served_by = asyncio.run(main())
+    assert served_by == 1
+    assert len(factory.processes) == 3
+    assert not any(process.running for process in factory.processes)
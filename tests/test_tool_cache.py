@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any, Optional
+
+from mcp.types import CallToolResult, TextContent
+
+from src.axiom import tool_cache
+from src.axiom.mcp_proxy import MCPServerProxy
+from src.axiom.tool_cache import CachedMCPServer, ToolResultCache, make_cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class DocsServer(MCPServerProxy):
+    def __init__(self, reply: str):
+        super().__init__(None)
+        self.reply = reply
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "context7"
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict[str, Any]]) -> CallToolResult:
+        self.calls += 1
+        return CallToolResult(content=[TextContent(type="text", text=self.reply)])
+
+
+def test_equivalent_arguments_share_a_key():
+    key = make_cache_key("get-library-docs", {"context7CompatibleLibraryID": "/vercel/next.js", "topic": "routing", "tokens": 5000})
+    assert key == make_cache_key("get-library-docs", {"tokens": 5000, "topic": "  routing ", "context7CompatibleLibraryID": "/vercel/next.js"})
+    assert key == make_cache_key("get-library-docs", {"context7CompatibleLibraryID": "/vercel/next.js", "topic": "routing", "tokens": 5000, "folders": None})
+    assert key != make_cache_key("get-library-docs", {"context7CompatibleLibraryID": "/vercel/next.js", "topic": "caching", "tokens": 5000})
+    assert make_cache_key("resolve-library-id", {"libraryName": "FastAPI"}) == make_cache_key("resolve-library-id", {"libraryName": "fastapi"})
+    assert make_cache_key("get-library-docs", {"topic": "Routing"}) != make_cache_key("get-library-docs", {"topic": "routing"})
+
+
+def test_entries_expire_after_their_ttl(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    cache = ToolResultCache(path=tmp_path / "cache.sqlite3", ttls={"resolve-library-id": 60})
+
+    async def main():
+        await cache.set("resolve-library-id", {"libraryName": "react"}, "result")
+        await cache.set("get-library-docs", {"topic": "hooks"}, "uncached")
+        fresh = await cache.get("resolve-library-id", {"libraryName": "react"})
+        uncached = await cache.get("get-library-docs", {"topic": "hooks"})
+        clock.now += 61
+        return fresh, uncached, await cache.get("resolve-library-id", {"libraryName": "react"})
+
+    assert asyncio.run(main()) == ("result", None, None)
+
+
+def test_memory_is_lru_bounded_and_backed_by_disk(tmp_path):
+    cache = ToolResultCache(path=tmp_path / "cache.sqlite3", ttls={"resolve-library-id": 60}, max_memory_entries=2)
+
+    async def main():
+        for name in ("a", "b", "c"):
+            await cache.set("resolve-library-id", {"libraryName": name}, name)
+        return await cache.get("resolve-library-id", {"libraryName": "a"})
+
+    assert asyncio.run(main()) == "a"
+    assert cache.disk_hits == 1
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_memory_only_cache_evicts_least_recently_used():
+    cache = ToolResultCache(ttls={"resolve-library-id": 60}, max_memory_entries=2)
+
+    async def main():
+        await cache.set("resolve-library-id", {"libraryName": "a"}, "a")
+        await cache.set("resolve-library-id", {"libraryName": "b"}, "b")
+        await cache.get("resolve-library-id", {"libraryName": "a"})
+        await cache.set("resolve-library-id", {"libraryName": "c"}, "c")
+        return [await cache.get("resolve-library-id", {"libraryName": name}) for name in ("a", "b", "c")]
+
+    assert asyncio.run(main()) == ["a", None, "c"]
+
+
+def test_disk_store_evicts_least_recently_used_entries(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    cache = ToolResultCache(path=tmp_path / "cache.sqlite3", ttls={"get-library-docs": 600}, max_memory_entries=1, max_disk_bytes=2500)
+
+    async def main():
+        for topic in ("a", "b"):
+            clock.now += 1
+            await cache.set("get-library-docs", {"topic": topic}, topic * 1000)
+        clock.now += 1
+        await cache.get("get-library-docs", {"topic": "a"})  # Disk hit; "b" is now the oldest
+        clock.now += 1
+        await cache.set("get-library-docs", {"topic": "c"}, "c" * 1000)
+        clock.now += 1
+        return [await cache.get("get-library-docs", {"topic": topic}) for topic in ("b", "a")]
+
+    assert asyncio.run(main()) == [None, "a" * 1000]
+    assert cache.evictions == 1
+
+
+def test_not_found_results_get_a_short_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    cache = ToolResultCache(ttls={"resolve-library-id": 24 * 60 * 60}, empty_result_ttl=60)
+    found = CachedMCPServer(DocsServer("Available Libraries:\n- Title: React\n- Context7-compatible library ID: /facebook/react"), cache)
+    missing = CachedMCPServer(DocsServer("No libraries found matching your query."), cache)
+
+    async def main():
+        await found.call_tool("resolve-library-id", {"libraryName": "react"})
+        await missing.call_tool("resolve-library-id", {"libraryName": "reactt"})
+        await missing.call_tool("resolve-library-id", {"libraryName": "reactt"})
+        clock.now += 61
+        await found.call_tool("resolve-library-id", {"libraryName": "react"})
+        await missing.call_tool("resolve-library-id", {"libraryName": "reactt"})
+
+    asyncio.run(main())
+    assert found.server.calls == 1
+    assert missing.server.calls == 2
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import re
+
+from agents import RunContextWrapper
+
+from src.axiom import tool_outputs
+from src.axiom.tool_outputs import ToolOutputStore, compact_tool_outputs, expand_tool_output
+
+
+def _call(call_id: str, name: str = "get-library-docs") -> dict:
+    return {"type": "function_call", "call_id": call_id, "name": name, "arguments": "{}"}
+
+
+def _output(call_id: str, output: str) -> dict:
+    return {"type": "function_call_output", "call_id": call_id, "output": output}
+
+
+def _compact(items, store=None):
+    return compact_tool_outputs(items, store or ToolOutputStore(), max_chars=100, excerpt_chars=20)
+
+
+def _expand(ref: str, start: int = 0, max_chars: int = 20000) -> str:
+    arguments = json.dumps({"ref": ref, "start": start, "max_chars": max_chars})
+    return asyncio.run(expand_tool_output.on_invoke_tool(RunContextWrapper(context=None), arguments))
+
+
+def test_outputs_the_model_has_not_seen_stay_whole():
+    docs = "d" * 500
+    items = [{"role": "user", "content": "hi"}, _call("1"), _call("2"), _output("1", docs), _output("2", docs)]
+
+    compacted, removed = _compact(items)
+
+    assert compacted == items
+    assert removed == 0
+
+
+def test_seen_long_outputs_are_truncated_and_stored():
+    docs = "".join(f"line {i}\n" for i in range(100))
+    store = ToolOutputStore()
+    items = [{"role": "user", "content": "hi"}, _call("1"), _output("1", docs), _call("2"), _output("2", "short")]
+
+    compacted, removed = _compact(items, store)
+
+    stub = compacted[2]["output"]
+    ref = re.search(r'ref "(\w+)"', stub).group(1)
+    assert stub.startswith(docs[:20])
+    assert f"get-library-docs output truncated: showing 20 of {len(docs)} characters" in stub
+    assert store.get(ref) == docs
+    assert removed == len(docs) - len(stub)
+    assert compacted[3:] == items[3:]  # The latest output is unseen
+
+
+def test_short_seen_outputs_are_kept():
+    items = [_call("1"), _output("1", "short result"), _call("2")]
+    assert _compact(items) == (items, 0)
+
+
+def test_repeated_outputs_keep_only_the_latest_copy():
+    docs = "d" * 50
+    items = [_call("1"), _output("1", docs), _call("2"), _output("2", docs), _call("3"), _output("3", docs)]
+
+    compacted, _ = _compact(items)
+
+    assert compacted[1]["output"] == "[Same output as the later get-library-docs call 3]"
+    assert compacted[3]["output"] == "[Same output as the later get-library-docs call 3]"
+    assert compacted[5]["output"] == docs
+
+
+def test_truncated_outputs_can_be_expanded(monkeypatch):
+    store = ToolOutputStore()
+    monkeypatch.setattr(tool_outputs, "_tool_output_store", store)
+    ref = store.put("abcdefghij")
+
+    assert _expand(ref) == "abcdefghij"
+    assert _expand(ref, start=2, max_chars=3) == "cde\n\n[5 more characters; continue from start=5.]"
+    assert _expand("missing") == 'No stored output with ref "missing". Call the original tool again instead.'
+
+
+def test_store_evicts_least_recently_used_outputs():
+    store = ToolOutputStore(max_chars=10)
+    first, second = store.put("aaaa"), store.put("bbbb")
+    store.get(first)
+    third = store.put("cccc")
+
+    assert (store.get(first), store.get(second), store.get(third)) == ("aaaa", None, "cccc")